@@ -0,0 +1,272 @@
+from typing import Dict, Iterable, NamedTuple, Union
+
+from columnar import ADJUSTMENTS, CLAIM_LEVEL, CLAIMS, PROVIDER_ADJUSTMENTS, SERVICES, TRANSACTION_SETS
+from transaction_set_builder import TransactionSet
+
+# float amounts are compared to the cent, integer cents exactly
+TOLERANCE = 0.005
+
+Tables = Dict[str, Dict[str, 'numpy.ndarray']]
+
+
+class OutOfBalance(NamedTuple):
+    """The rows that do not balance, each table a dictionary of column arrays.
+
+    Attributes:
+        transaction_sets: BPR02 `amount_paid` against the CLP04 `paid_amount` of its claims
+            less its PLB adjustments (`expected`).
+        claims: CLP03 `charge_amount` less every CAS adjustment of the claim and its service
+            lines (`expected`) against CLP04 `paid_amount`.
+        services: SVC02 `charge_amount` less the line's CAS adjustments (`expected`) against
+            SVC03 `paid_amount`.
+
+    Every table also has a `difference` column, the paid amount less the expected one.
+    """
+    transaction_sets: Dict[str, 'numpy.ndarray']
+    claims: Dict[str, 'numpy.ndarray']
+    services: Dict[str, 'numpy.ndarray']
+
+    @property
+    def is_balanced(self) -> bool:
+        return not any(len(next(iter(table.values()))) for table in self)
+
+
+def balance(transaction_sets: Union[TransactionSet, Iterable[TransactionSet]]) -> OutOfBalance:
+    """Checks the payment, claim and service line balancing rules of built transaction sets.
+
+    Balance each ST/SE transaction set on its own (`TransactionSetBuilder.build_all`),
+    the BPR of a merged `build` only covers its last transaction set.
+
+    Args:
+        transaction_sets (Union[TransactionSet, Iterable[TransactionSet]]): The transaction sets.
+
+    Returns:
+        OutOfBalance: The rows that do not balance. Keys are positions in the
+        transaction sets, in their claims and in the service lines of all claims.
+    """
+
+    return check_balance(gather_amounts(transaction_sets))
+
+
+def gather_amounts(transaction_sets: Union[TransactionSet, Iterable[TransactionSet]]) -> Tables:
+    """Collects the amounts the balancing rules need into NumPy arrays.
+
+    The arrays use the table and column names of `columnar.TABLES`, so
+    `check_balance` also accepts the `to_arrays()` of a `columnar.ColumnarTables`.
+    Amounts built inside `elements.dollars.money_in_cents` are gathered as
+    int64 cents (missing amounts as 0), others as float64 dollars. If any
+    amount is in dollars, all of them are gathered as dollars.
+    Needs the optional numpy package.
+    """
+
+    import numpy
+
+    if isinstance(transaction_sets, TransactionSet):
+        transaction_sets = [transaction_sets]
+
+    amount_paid = []
+    claim_transaction_sets, claim_markers, claim_charges, claim_payments = [], [], [], []
+    service_claims, service_charges, service_payments = [], [], []
+    adjustment_claims, adjustment_services, adjustment_amounts = [], [], []
+    provider_adjustment_transaction_sets, provider_adjustment_amounts = [], []
+
+    for transaction_set_id, transaction_set in enumerate(transaction_sets):
+        financial_information = transaction_set.financial_information
+        amount_paid.append(financial_information.amount_paid if financial_information else None)
+
+        for claim_loop in transaction_set.claims:
+            claim_id = len(claim_charges)
+            claim = claim_loop.claim
+            claim_transaction_sets.append(transaction_set_id)
+            claim_markers.append(claim.marker)
+            claim_charges.append(claim.charge_amount)
+            claim_payments.append(claim.paid_amount)
+
+            for adjustment in claim_loop.adjustments:
+                adjustment_claims.append(claim_id)
+                adjustment_services.append(CLAIM_LEVEL)
+                adjustment_amounts.append(adjustment.total_amount)
+
+            for service_loop in claim_loop.services:
+                service_id = len(service_charges)
+                service_claims.append(claim_id)
+                service_charges.append(service_loop.service.charge_amount)
+                service_payments.append(service_loop.service.paid_amount)
+
+                for adjustment in service_loop.adjustments:
+                    adjustment_claims.append(claim_id)
+                    adjustment_services.append(service_id)
+                    adjustment_amounts.append(adjustment.total_amount)
+
+        for provider_adjustment in transaction_set.provider_adjustments:
+            for segment in provider_adjustment.adjustments:
+                for amount in segment.adjustment_amount:
+                    provider_adjustment_transaction_sets.append(transaction_set_id)
+                    provider_adjustment_amounts.append(amount)
+
+    keys = numpy.int64
+    cents = _in_cents(
+        amount_paid, claim_charges, claim_payments, service_charges, adjustment_amounts, provider_adjustment_amounts
+    )
+    return {
+        TRANSACTION_SETS: {
+            'transaction_set_id': numpy.arange(len(amount_paid), dtype=keys),
+            'amount_paid': _amounts(numpy, amount_paid, cents),
+        },
+        CLAIMS: {
+            'claim_id': numpy.arange(len(claim_charges), dtype=keys),
+            'transaction_set_id': numpy.array(claim_transaction_sets, dtype=keys),
+            'marker': numpy.array(claim_markers, dtype=numpy.str_),
+            'charge_amount': _amounts(numpy, claim_charges, cents),
+            'paid_amount': _amounts(numpy, claim_payments, cents),
+        },
+        SERVICES: {
+            'service_id': numpy.arange(len(service_charges), dtype=keys),
+            'claim_id': numpy.array(service_claims, dtype=keys),
+            'charge_amount': _amounts(numpy, service_charges, cents),
+            'paid_amount': _amounts(numpy, service_payments, cents),
+        },
+        ADJUSTMENTS: {
+            'claim_id': numpy.array(adjustment_claims, dtype=keys),
+            'service_id': numpy.array(adjustment_services, dtype=keys),
+            'amount': _amounts(numpy, adjustment_amounts, cents),
+        },
+        PROVIDER_ADJUSTMENTS: {
+            'transaction_set_id': numpy.array(provider_adjustment_transaction_sets, dtype=keys),
+            'amount': _amounts(numpy, provider_adjustment_amounts, cents),
+        },
+    }
+
+
+def check_balance(tables: Tables) -> OutOfBalance:
+    """Checks every transaction set, claim and service line at once on column arrays.
+
+    The adjustments are summed per claim, per service line and per transaction
+    set with `numpy.bincount`, so the cost is a few array passes whatever the
+    number of lines. Missing amounts count as zero. When every amount column is
+    integer cents the sums are int64 reductions and rows balance exactly;
+    otherwise amounts are float dollars compared to the cent.
+
+    Args:
+        tables (Tables): Column arrays as returned by `gather_amounts` or
+            `columnar.ColumnarTables.to_arrays`.
+
+    Returns:
+        OutOfBalance: The rows that do not balance.
+    """
+
+    import numpy
+
+    transaction_sets = tables[TRANSACTION_SETS]
+    claims = tables[CLAIMS]
+    services = tables[SERVICES]
+    adjustments = tables[ADJUSTMENTS]
+    provider_adjustments = tables[PROVIDER_ADJUSTMENTS]
+
+    amount_columns = (
+        transaction_sets['amount_paid'], claims['charge_amount'], claims['paid_amount'],
+        services['charge_amount'], services['paid_amount'], adjustments['amount'], provider_adjustments['amount'],
+    )
+    if not all(numpy.issubdtype(column.dtype, numpy.integer) for column in amount_columns):
+        transaction_sets, claims, services, adjustments, provider_adjustments = (
+            _in_dollars(numpy, table) for table in (transaction_sets, claims, services, adjustments, provider_adjustments)
+        )
+
+    # BPR02 = sum of CLP04 - sum of PLB adjustments
+    size = len(transaction_sets['transaction_set_id'])
+    claims_paid = _sum_by(numpy, claims['transaction_set_id'], claims['paid_amount'], size)
+    provider_adjusted = _sum_by(numpy, provider_adjustments['transaction_set_id'], provider_adjustments['amount'], size)
+    transaction_set_rows = _out_of_balance(
+        numpy, transaction_sets['amount_paid'], claims_paid - provider_adjusted,
+        transaction_set_id=transaction_sets['transaction_set_id'],
+        amount_paid=transaction_sets['amount_paid'],
+    )
+
+    # CLP04 = CLP03 - claim and service line CAS adjustments
+    size = len(claims['claim_id'])
+    claim_adjusted = _sum_by(numpy, adjustments['claim_id'], adjustments['amount'], size)
+    claim_rows = _out_of_balance(
+        numpy, claims['paid_amount'], numpy.nan_to_num(claims['charge_amount']) - claim_adjusted,
+        claim_id=claims['claim_id'],
+        transaction_set_id=claims['transaction_set_id'],
+        marker=claims['marker'],
+        charge_amount=claims['charge_amount'],
+        adjustment_amount=claim_adjusted,
+        paid_amount=claims['paid_amount'],
+    )
+
+    # SVC03 = SVC02 - service line CAS adjustments
+    size = len(services['service_id'])
+    service_adjusted = _sum_by(numpy, adjustments['service_id'], adjustments['amount'], size)
+    service_rows = _out_of_balance(
+        numpy, services['paid_amount'], numpy.nan_to_num(services['charge_amount']) - service_adjusted,
+        service_id=services['service_id'],
+        claim_id=services['claim_id'],
+        charge_amount=services['charge_amount'],
+        adjustment_amount=service_adjusted,
+        paid_amount=services['paid_amount'],
+    )
+
+    return OutOfBalance(transaction_set_rows, claim_rows, service_rows)
+
+
+def _sum_by(numpy, keys, amounts, size: int):
+    # rows without a parent (e.g. claim-level adjustments when summing per service line) have a negative key
+    linked = keys >= 0
+    if numpy.issubdtype(amounts.dtype, numpy.integer):
+        # bincount sums in float64, add.at keeps the cents exact
+        totals = numpy.zeros(size, dtype=numpy.int64)
+        numpy.add.at(totals, keys[linked], amounts[linked])
+        return totals
+
+    totals = numpy.bincount(keys[linked], weights=numpy.nan_to_num(amounts[linked]), minlength=size)
+    return totals[:size].astype(numpy.float64, copy=False)
+
+
+def _out_of_balance(numpy, paid, expected, **columns) -> Dict[str, 'numpy.ndarray']:
+    if numpy.issubdtype(paid.dtype, numpy.integer):
+        difference = paid - expected
+        rows = difference != 0
+    else:
+        difference = numpy.round(numpy.nan_to_num(paid) - expected, 2)
+        rows = numpy.abs(difference) > TOLERANCE
+        expected = numpy.round(expected, 2)
+
+    selected = {name: values[rows] for name, values in columns.items()}
+    selected['expected'] = expected[rows]
+    selected['difference'] = difference[rows]
+    return selected
+
+
+def _in_cents(*columns) -> bool:
+    # amounts parsed in cents are ints, in dollars floats; cents only if no amount is a float
+    found = False
+    for values in columns:
+        for value in values:
+            if value is not None:
+                if type(value) is not int:
+                    return False
+                found = True
+    return found
+
+
+def _in_dollars(numpy, table: Dict[str, 'numpy.ndarray']) -> Dict[str, 'numpy.ndarray']:
+    # integer cents columns (e.g. in tables mixing both) are compared as dollars with the rest
+    return {
+        name: values / 100 if name in _AMOUNT_COLUMNS and numpy.issubdtype(values.dtype, numpy.integer) else values
+        for name, values in table.items()
+    }
+
+
+_AMOUNT_COLUMNS = {'amount_paid', 'charge_amount', 'paid_amount', 'amount'}
+
+
+def _amounts(numpy, values: list, cents: bool):
+    if cents:
+        return numpy.array([0 if value is None else value for value in values], dtype=numpy.int64)
+    # cents among dollars, e.g. from segments built in both modes, are converted rather than mixed in
+    return numpy.array([value / 100 if type(value) is int else value for value in values], dtype=numpy.float64)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,244 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from edi_to_json import transaction_set_to_json
+from json_to_edi import json_to_edi
+from segment_parser import SegmentParser
+from segment_reader import read_segments, read_tokens
+from transaction_set_builder import TransactionSet, TransactionSetBuilder
+
+# next to this module, so the benchmark runs from any working directory
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'EDI835input.txt')
+DEFAULT_CLAIMS = (100, 1000, 10000)
+DEFAULT_REPEAT = 3
+RESULTS_VERSION = 1
+
+_HEADER_NUMBER = 'LX'
+_TRANSACTION_SET_TRAILER = 'SE'
+
+
+class Workload:
+    """The input of every stage for one file size, each prepared once and outside the timings.
+
+    The file is the sample file with its LX loop (claim, patient, service line,
+    date and adjustment) repeated `claims` times in one transaction set.
+    """
+
+    def __init__(self, claims: int, sample_file: str = SAMPLE_FILE):
+        with open(sample_file, 'r') as f:
+            lines = f.read().strip().split('\n')
+
+        first = next(i for i, line in enumerate(lines) if line.startswith(_HEADER_NUMBER + '*'))
+        last = next(i for i, line in enumerate(lines) if line.startswith(_TRANSACTION_SET_TRAILER + '*'))
+
+        self.claims = claims
+        self.text = '\n'.join(lines[:first] + lines[first:last] * claims + lines[last:]) + '\n'
+        self.segments: List[str] = list(read_segments(io.StringIO(self.text)))
+        self.tokens: List[List[str]] = list(read_tokens(io.StringIO(self.text)))
+
+        self._transaction_set: Optional[TransactionSet] = None
+        self._json: Optional[str] = None
+
+    @property
+    def transaction_set(self) -> TransactionSet:
+        if self._transaction_set is None:
+            self._transaction_set = TransactionSetBuilder().build(iter(self.tokens))
+        return self._transaction_set
+
+    @property
+    def json(self) -> str:
+        if self._json is None:
+            self._json = transaction_set_to_json(self.transaction_set)
+        return self._json
+
+
+def _read(workload: Workload):
+    for _ in read_tokens(io.StringIO(workload.text)):
+        pass
+
+
+def _parse(workload: Workload):
+    parse = SegmentParser().parse
+    for segment in workload.segments:
+        parse(segment)
+
+
+def _build(workload: Workload):
+    TransactionSetBuilder().build(iter(workload.tokens))
+
+
+def _edi_to_json(workload: Workload):
+    transaction_set_to_json(workload.transaction_set)
+
+
+def _json_to_edi(workload: Workload):
+    json_to_edi(workload.json)
+
+
+# each stage starts from the output of the previous one, which the workload prepares untimed
+STAGES: Dict[str, Callable[[Workload], None]] = {
+    'read_tokens': _read,
+    'segment_parser': _parse,
+    'transaction_set_builder': _build,
+    'edi_to_json': _edi_to_json,
+    'json_to_edi': _json_to_edi,
+}
+
+
+class StageResult(NamedTuple):
+    """The measurements of one stage at one file size.
+
+    Attributes:
+        stage (str): The key of the stage in `STAGES`.
+        claims (int): The number of claims in the file.
+        segments (int): The number of segments in the file.
+        seconds (Optional[float]): The fastest of the repeated runs.
+        segments_per_second (Optional[float]): `segments` / `seconds`.
+        peak_memory (Optional[int]): The most memory, in bytes, allocated at once during a
+            separate run traced by tracemalloc.
+        error (Optional[str]): Why the stage failed, in which case there are no measurements.
+    """
+    stage: str
+    claims: int
+    segments: int
+    seconds: Optional[float]
+    segments_per_second: Optional[float]
+    peak_memory: Optional[int]
+    error: Optional[str]
+
+
+def run_benchmarks(
+        claims: List[int] = DEFAULT_CLAIMS,
+        stages: Optional[List[str]] = None,
+        repeat: int = DEFAULT_REPEAT,
+        sample_file: str = SAMPLE_FILE,
+) -> List[StageResult]:
+    """Times every stage separately at every file size.
+
+    Each stage is run `repeat` times and the fastest run is kept, then run once
+    more under tracemalloc for its peak memory, as tracing slows it down.
+
+    Args:
+        claims (List[int]): The file sizes, in claims.
+        stages (Optional[List[str]]): The keys of the stages to run, all of `STAGES` by default.
+        repeat (int): How many times each stage is timed.
+        sample_file (str): The file whose LX loop is repeated.
+
+    Returns:
+        List[StageResult]: One result per stage and file size.
+    """
+
+    results = []
+    for size in claims:
+        workload = Workload(size, sample_file)
+        for stage in stages or STAGES:
+            results.append(_run_stage(stage, STAGES[stage], workload, repeat))
+    return results
+
+
+def _run_stage(name: str, stage: Callable[[Workload], None], workload: Workload, repeat: int) -> StageResult:
+    segments = len(workload.tokens)
+    try:
+        best = None
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            stage(workload)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            stage(workload)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    except Exception as e:
+        return StageResult(name, workload.claims, segments, None, None, None, f'{type(e).__name__}: {e}')
+
+    best = max(best, 1e-9)
+    return StageResult(name, workload.claims, segments, best, segments / best, peak, None)
+
+
+def save_results(results: List[StageResult], path: str):
+    """Writes the results as JSON, with the Python version and platform they were measured on."""
+
+    data = {
+        'version': RESULTS_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': [result._asdict() for result in results],
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+def load_results(path: str) -> List[StageResult]:
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return [StageResult(**result) for result in data['results']]
+
+
+def format_results(results: List[StageResult], baseline: Optional[List[StageResult]] = None) -> str:
+    """Formats the results as a table, with the speedup over a baseline run if one is given."""
+
+    previous: Dict[Any, StageResult] = {(result.stage, result.claims): result for result in baseline or ()}
+
+    lines = [f'{"stage":<24} {"claims":>8} {"segments":>9} {"seconds":>9} {"segments/s":>12} {"peak MB":>9}']
+    if baseline is not None:
+        lines[0] += f' {"speedup":>8}'
+
+    for result in results:
+        if result.error is not None:
+            lines.append(f'{result.stage:<24} {result.claims:>8} {result.segments:>9} FAILED {result.error}')
+            continue
+
+        line = (
+            f'{result.stage:<24} {result.claims:>8} {result.segments:>9} {result.seconds:>9.4f} '
+            f'{result.segments_per_second:>12.0f} {result.peak_memory / 1e6:>9.2f}'
+        )
+        before = previous.get((result.stage, result.claims))
+        if before is not None and before.seconds:
+            line += f' {before.seconds / result.seconds:>7.2f}x'
+        lines.append(line)
+
+    return '\n'.join(lines)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog='benchmark.py',
+        description='Time each stage of the EDI 835 pipeline at several file sizes.',
+    )
+    parser.add_argument('-c', '--claims', type=int, nargs='+', default=DEFAULT_CLAIMS, help='File sizes, in claims.')
+    parser.add_argument('-s', '--stages', nargs='+', choices=STAGES, help='Stages to run (default: all).')
+    parser.add_argument('-n', '--repeat', type=int, default=DEFAULT_REPEAT, help='Timed runs per stage, the fastest is kept.')
+    parser.add_argument('--sample', default=SAMPLE_FILE, help='The file whose LX loop is repeated (default: the EDI835input.txt next to benchmark.py).')
+    parser.add_argument('-o', '--output', help='Save the results as JSON.')
+    parser.add_argument('--compare', help='Results saved by an earlier run to compare against.')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.claims, args.stages, args.repeat, args.sample)
+    baseline = load_results(args.compare) if args.compare else None
+    print(format_results(results, baseline))
+
+    if args.output:
+        save_results(results, args.output)
+    return 1 if any(result.error is not None for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
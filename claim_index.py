@@ -0,0 +1,312 @@
+import io
+import json
+import mmap
+import os
+from itertools import chain
+from typing import Dict, List, NamedTuple, Optional
+
+from mapped_reader import _BYTE_ORDER_MARK, _LINE_BREAK_BYTES, ENCODING, read_header
+from segment_reader import read_tokens
+from transaction_set_builder import TransactionSetBuilder
+from loops.claim import Claim as ClaimLoop
+
+INDEX_SUFFIX = '.idx'
+INDEX_VERSION = 2
+_TRAILER = b'IEA'
+_TRANSACTION_SET = b'ST'
+_HEADER_NUMBER = b'LX'
+_CLAIM = b'CLP'
+# segments that end the open claim loop, and those that also end the open LX loop
+_CLAIM_END = {_CLAIM, _HEADER_NUMBER, b'PLB', b'SE', b'GE', _TRAILER, _TRANSACTION_SET}
+_HEADER_NUMBER_END = _CLAIM_END - {_CLAIM}
+# the header_number of a claim that is not inside an LX loop
+NO_HEADER_NUMBER = -1
+
+
+class Extent(NamedTuple):
+    """Where a loop sits in the file.
+
+    Attributes:
+        offset (int): The byte offset of the loop's first segment.
+        length (int): The byte length of the loop, up to the first segment after it.
+        parent (int): The row of the enclosing ISA, ST or LX in its own list.
+    """
+    offset: int
+    length: int
+    parent: int
+
+
+class ClaimEntry(NamedTuple):
+    """Where a claim loop (CLP and everything up to the next claim) sits in the file.
+
+    Attributes:
+        offset (int): The byte offset of the CLP segment.
+        length (int): The byte length of the claim loop, service lines included.
+        header_number (int): The row of the enclosing LX loop in `ClaimIndex.header_numbers`,
+            NO_HEADER_NUMBER if the CLP is not inside one.
+        marker (str): CLP01, the patient control number.
+        icn (str): CLP07, the payer claim control number.
+    """
+    offset: int
+    length: int
+    header_number: int
+    marker: str
+    icn: str
+
+
+class ClaimIndex:
+    """A byte-offset index of the ST, LX and CLP loops of an 835 file.
+
+    `build` reads the file once and records where every loop starts and how
+    long it is, keyed by claim ID (CLP01) and ICN (CLP07). `save` writes the
+    index next to the file (`<file>.idx`) and `open` reuses it as long as the
+    file has not changed. Lookups then memory-map the file and build only the
+    requested claim from its slice, without parsing anything else.
+
+    Use it as a context manager, or call `close`, to release the memory map.
+    """
+
+    def __init__(
+            self,
+            edi_file_path: str,
+            interchanges: List[Extent],
+            transaction_sets: List[Extent],
+            header_numbers: List[Extent],
+            claims: List[ClaimEntry],
+            size: int,
+            mtime_ns: int,
+    ):
+        self.edi_file_path = edi_file_path
+        self.interchanges = interchanges
+        self.transaction_sets = transaction_sets
+        self.header_numbers = header_numbers
+        self.claims = claims
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+        self._by_marker: Dict[str, List[ClaimEntry]] = {}
+        self._by_icn: Dict[str, List[ClaimEntry]] = {}
+        for claim in claims:
+            self._by_marker.setdefault(claim.marker, []).append(claim)
+            self._by_icn.setdefault(claim.icn, []).append(claim)
+
+        self._file = None
+        self._buffer: Optional[mmap.mmap] = None
+        self._builder = TransactionSetBuilder()
+
+    def __enter__(self) -> 'ClaimIndex':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @classmethod
+    def build(cls, edi_file_path: str) -> 'ClaimIndex':
+        """Reads the file once and records the extent of every ST, LX and CLP loop.
+
+        Args:
+            edi_file_path (str): The path to the EDI 835 file.
+
+        Returns:
+            ClaimIndex: The index, not saved yet.
+        """
+
+        stat = os.stat(edi_file_path)
+        with open(edi_file_path, 'rb') as f, _map(f) as buffer:
+            interchanges, transaction_sets, header_numbers, claims = _scan(buffer)
+
+        return cls(edi_file_path, interchanges, transaction_sets, header_numbers, claims, stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def load(cls, edi_file_path: str, index_path: Optional[str] = None) -> 'ClaimIndex':
+        """Reads a saved index.
+
+        Raises:
+            ValueError: If the index was saved for another version of the file or of the index format.
+        """
+
+        with open(index_path or edi_file_path + INDEX_SUFFIX, 'r') as f:
+            data = json.load(f)
+
+        stat = os.stat(edi_file_path)
+        if data['version'] != INDEX_VERSION:
+            raise ValueError(f'Index format {data["version"]} is not supported, rebuild the index.')
+        if (data['size'], data['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+            raise ValueError(f'Index is out of date for {edi_file_path}, rebuild the index.')
+
+        return cls(
+            edi_file_path,
+            [Extent(*row) for row in data['interchanges']],
+            [Extent(*row) for row in data['transaction_sets']],
+            [Extent(*row) for row in data['header_numbers']],
+            [ClaimEntry(*row) for row in data['claims']],
+            data['size'],
+            data['mtime_ns'],
+        )
+
+    @classmethod
+    def open(cls, edi_file_path: str, index_path: Optional[str] = None) -> 'ClaimIndex':
+        """Loads the saved index of the file, building and saving it first if it is missing or out of date."""
+
+        try:
+            return cls.load(edi_file_path, index_path)
+        except (FileNotFoundError, ValueError, KeyError):
+            index = cls.build(edi_file_path)
+            index.save(index_path)
+            return index
+
+    def save(self, index_path: Optional[str] = None):
+        """Writes the index as JSON, by default to `<file>.idx` next to the file."""
+
+        data = {
+            'version': INDEX_VERSION,
+            'size': self.size,
+            'mtime_ns': self.mtime_ns,
+            'interchanges': self.interchanges,
+            'transaction_sets': self.transaction_sets,
+            'header_numbers': self.header_numbers,
+            'claims': self.claims,
+        }
+        with open(index_path or self.edi_file_path + INDEX_SUFFIX, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    def close(self):
+        if self._buffer is not None:
+            self._buffer.close()
+            self._file.close()
+            self._buffer = self._file = None
+
+    def find(self, marker: Optional[str] = None, icn: Optional[str] = None) -> List[ClaimEntry]:
+        """Returns the index entries of the claims with the CLP01 `marker` or the CLP07 `icn`, in file order."""
+
+        if marker is not None:
+            return self._by_marker.get(marker, [])
+        return self._by_icn.get(icn, [])
+
+    def claims_by_marker(self, marker: str) -> List[ClaimLoop]:
+        """Builds the claims whose CLP01 (patient control number) is `marker`."""
+        return [self.read_claim(entry) for entry in self.find(marker=marker)]
+
+    def claims_by_icn(self, icn: str) -> List[ClaimLoop]:
+        """Builds the claims whose CLP07 (payer claim control number) is `icn`."""
+        return [self.read_claim(entry) for entry in self.find(icn=icn)]
+
+    def read_claim(self, entry: ClaimEntry) -> ClaimLoop:
+        """Builds one claim loop from its slice of the memory-mapped file."""
+
+        if entry.header_number == NO_HEADER_NUMBER:
+            raise ValueError(f'Claim {entry.marker!r} at byte {entry.offset} is not inside an LX loop and cannot be read.')
+
+        buffer = self._map()
+        transaction_set = self.transaction_sets[self.header_numbers[entry.header_number].parent]
+        interchange = self.interchanges[transaction_set.parent]
+
+        # the claim's own ISA declares its delimiters and ISA16 for composite elements
+        text = (
+            _slice(buffer, interchange.offset, interchange.length)
+            + _slice(buffer, entry.offset, entry.length)
+        )
+        segments = read_tokens(io.StringIO(text))
+        header = next(segments)
+
+        # an LX opens the loop claims belong to, which one does not matter for a single claim
+        claim, = self._builder.build(chain((header, [_HEADER_NUMBER.decode()]), segments)).claims
+        return claim
+
+    def _map(self) -> mmap.mmap:
+        if self._buffer is None:
+            self._file = open(self.edi_file_path, 'rb')
+            self._buffer = _map(self._file)
+        return self._buffer
+
+
+def _map(f) -> mmap.mmap:
+    if os.fstat(f.fileno()).st_size == 0:
+        raise ValueError('EDI data does not start with an ISA segment.')
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _slice(buffer: mmap.mmap, offset: int, length: int) -> str:
+    return buffer[offset:offset + length].decode(ENCODING)
+
+
+def _scan(buffer: mmap.mmap):
+    interchanges: List[Extent] = []
+    transaction_sets: List[Extent] = []
+    header_numbers: List[Extent] = []
+    claims: List[ClaimEntry] = []
+
+    size = len(buffer)
+    position = len(_BYTE_ORDER_MARK) if buffer[:len(_BYTE_ORDER_MARK)] == _BYTE_ORDER_MARK else 0
+    element = terminator = None
+
+    # [offset, parent, ...] of the loops still open
+    transaction_set = header_number = claim = None
+
+    while position < size:
+        if terminator is None:
+            header = read_header(buffer, position)
+            if header is None:
+                break
+
+            _, delimiters, start, position = header
+            interchanges.append(Extent(start, position - start, -1))
+
+            element = delimiters.element.encode()
+            terminator = delimiters.segment.encode()
+            continue
+
+        end = buffer.find(terminator, position)
+        if end == -1:
+            end = size
+
+        start = position
+        while start < end and buffer[start] in _LINE_BREAK_BYTES:
+            start += 1
+
+        separator = buffer.find(element, start, end)
+        identifier = buffer[start:separator if separator != -1 else end]
+        position = end + 1
+
+        if claim is not None and identifier in _CLAIM_END:
+            claims.append(ClaimEntry(claim[0], start - claim[0], *claim[1:]))
+            claim = None
+
+        if header_number is not None and identifier in _HEADER_NUMBER_END:
+            header_numbers.append(Extent(header_number[0], start - header_number[0], header_number[1]))
+            header_number = None
+
+        if identifier == _CLAIM:
+            elements = buffer[start:end].split(element)
+            marker = elements[1].decode(ENCODING) if len(elements) > 1 else ''
+            icn = elements[7].decode(ENCODING) if len(elements) > 7 else ''
+            # the open LX is added to header_numbers when it ends, as the next row; claims outside an LX
+            # are malformed and get NO_HEADER_NUMBER, so they can be found but not read
+            claims_header_number = len(header_numbers) if header_number is not None else NO_HEADER_NUMBER
+            claim = (start, claims_header_number, marker, icn)
+
+        elif identifier == _HEADER_NUMBER:
+            header_number = (start, len(transaction_sets))
+
+        elif identifier == _TRANSACTION_SET:
+            transaction_set = (start, len(interchanges) - 1)
+
+        elif identifier == b'SE' and transaction_set is not None:
+            transaction_sets.append(Extent(transaction_set[0], position - transaction_set[0], transaction_set[1]))
+            transaction_set = None
+
+        elif identifier == _TRAILER:
+            element = terminator = None
+
+    if claim is not None:
+        claims.append(ClaimEntry(claim[0], size - claim[0], *claim[1:]))
+    if header_number is not None:
+        header_numbers.append(Extent(header_number[0], size - header_number[0], header_number[1]))
+    if transaction_set is not None:
+        transaction_sets.append(Extent(transaction_set[0], size - transaction_set[0], transaction_set[1]))
+
+    return interchanges, transaction_sets, header_numbers, claims
+
+
+if __name__ == "__main__":
+    pass
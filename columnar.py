@@ -0,0 +1,408 @@
+import csv
+import os
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from diagnostics import Diagnostics, collecting
+from elements.composite import AdjustmentIdentifier, Composite
+from elements.dollars import parse_cents
+from loop_grammar import CLAIM, LOOPS, SERVICE, Loop, compile_grammar
+from utilities import DEFAULT_DELIMITERS, get_element
+
+INTEGER = 'int'
+FLOAT = 'float'
+MONEY = 'money'
+TEXT = 'str'
+DATE = 'date'
+
+# the service_id of adjustments and remarks that belong to the claim rather than a service line
+CLAIM_LEVEL = -1
+
+
+class Column(NamedTuple):
+    """A column of an exported table.
+
+    Attributes:
+        name (str): The column name.
+        type (str): One of INTEGER, FLOAT, MONEY, TEXT or DATE.
+    """
+    name: str
+    type: str
+
+
+TRANSACTION_SETS = 'transaction_sets'
+CLAIMS = 'claims'
+SERVICES = 'services'
+ADJUSTMENTS = 'adjustments'
+REMARKS = 'remarks'
+PROVIDER_ADJUSTMENTS = 'provider_adjustments'
+
+TABLES: Dict[str, Tuple[Column, ...]] = {
+    TRANSACTION_SETS: (
+        Column('transaction_set_id', INTEGER),
+        Column('interchange_control_number', TEXT),
+        Column('payer', TEXT),
+        Column('payee', TEXT),
+        Column('amount_paid', MONEY),
+        Column('payment_method', TEXT),
+        Column('transaction_date', DATE),
+    ),
+    CLAIMS: (
+        Column('claim_id', INTEGER),
+        Column('transaction_set_id', INTEGER),
+        Column('marker', TEXT),
+        Column('status', TEXT),
+        Column('charge_amount', MONEY),
+        Column('paid_amount', MONEY),
+        Column('patient_responsibility_amount', MONEY),
+        Column('claim_type', TEXT),
+        Column('icn', TEXT),
+        Column('patient_identification_code', TEXT),
+        Column('statement_period_start', DATE),
+        Column('statement_period_end', DATE),
+    ),
+    SERVICES: (
+        Column('service_id', INTEGER),
+        Column('claim_id', INTEGER),
+        Column('qualifier', TEXT),
+        Column('code', TEXT),
+        Column('modifier', TEXT),
+        Column('charge_amount', MONEY),
+        Column('paid_amount', MONEY),
+        Column('revenue_code', TEXT),
+        Column('allowed_units', FLOAT),
+        Column('billed_units', FLOAT),
+        Column('service_date', DATE),
+        Column('service_period_start', DATE),
+        Column('service_period_end', DATE),
+    ),
+    ADJUSTMENTS: (
+        Column('claim_id', INTEGER),
+        Column('service_id', INTEGER),
+        Column('group_code', TEXT),
+        Column('reason_code', TEXT),
+        Column('amount', MONEY),
+        Column('quantity', FLOAT),
+    ),
+    REMARKS: (
+        Column('claim_id', INTEGER),
+        Column('service_id', INTEGER),
+        Column('qualifier', TEXT),
+        Column('code', TEXT),
+    ),
+    PROVIDER_ADJUSTMENTS: (
+        Column('transaction_set_id', INTEGER),
+        Column('provider_identifier', TEXT),
+        Column('fiscal_period_date', DATE),
+        Column('reason_code', TEXT),
+        Column('reference_identification', TEXT),
+        Column('amount', MONEY),
+    ),
+}
+
+# DTM qualifiers copied onto the claim and service rows
+_CLAIM_DATES = {'232': 'statement_period_start', '233': 'statement_period_end'}
+_SERVICE_DATES = {'472': 'service_date', '150': 'service_period_start', '151': 'service_period_end'}
+_PATIENT = 'QC'
+_PAYER = 'PR'
+_PAYEE = 'PE'
+
+
+class ColumnarTables:
+    """The claims, service lines, adjustments, remarks and PLB adjustments of an 835 as columns.
+
+    Columns are filled straight from the segment tokens, without building
+    segment or loop objects. Rows are linked by integer keys: `claim_id` and
+    `service_id` are row numbers of the claims and services tables, and
+    `transaction_set_id` the row number of the transaction_sets table.
+    Adjustments and remarks of the claim itself have a `service_id` of
+    CLAIM_LEVEL. Every CAS adjustment triplet and PLB adjustment pair is a row
+    of its own.
+
+    Until converted, values are kept as the raw EDI strings; missing values
+    are empty strings. Composites are split like the object model splits them
+    (`elements.composite`), and what that reports, e.g. a component separator
+    other than the ISA16 one, goes to `diagnostics`.
+    """
+
+    def __init__(self, loops: Tuple[Loop, ...] = LOOPS, diagnostics: Optional[Diagnostics] = None):
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+        self.columns: Dict[str, Dict[str, list]] = {
+            table: {column.name: [] for column in columns} for table, columns in TABLES.items()
+        }
+        self._root, self._transitions = compile_grammar(loops)
+        self._component_separator = DEFAULT_DELIMITERS.component
+        self._interchange_control_number = ''
+        self._handlers = {
+            'ISA': self._interchange,
+            'ST': self._transaction_set,
+            'BPR': self._financial_information,
+            'N1': self._organization,
+            'CLP': self._claim,
+            'NM1': self._entity,
+            'DTM': self._date,
+            'SVC': self._service,
+            'CAS': self._adjustment,
+            'LQ': self._remark,
+            'PLB': self._provider_adjustment,
+        }
+
+    def __len__(self) -> int:
+        """The number of service lines."""
+        return len(self.columns[SERVICES]['service_id'])
+
+    def add(self, segments: Iterator[List[str]]) -> 'ColumnarTables':
+        """Appends the rows of tokenized EDI segments, as yielded by `segment_reader.read_tokens`.
+
+        Segments are placed in their loop with the same transition table as the
+        `TransactionSetBuilder`, so a CAS or DTM after an SVC goes to the service
+        line and one before it to the claim.
+        """
+
+        with collecting(self.diagnostics):
+            self._add(segments)
+        return self
+
+    def _add(self, segments: Iterator[List[str]]):
+        loops = [self._root]
+        transitions = self._transitions[self._root.name]
+        handlers = self._handlers
+
+        for segment in segments:
+            identifier = segment[0]
+            transition = transitions.get(identifier)
+
+            if type(transition) is dict:
+                transition = transition.get(segment[1] if len(segment) > 1 else None)
+
+            if transition is None:
+                continue
+
+            if transition.close:
+                del loops[-transition.close:]
+
+            if transition.loop is not None:
+                loops.append(transition.loop)
+
+            if transition.close or transition.loop is not None:
+                transitions = self._transitions[loops[-1].name]
+
+            handler = handlers.get(identifier)
+            if handler is not None:
+                handler(segment, loops[-1].name)
+
+    def to_arrays(self, cents: bool = False) -> Dict[str, Dict[str, 'numpy.ndarray']]:
+        """Converts the columns to typed NumPy arrays, keyed by table and column name.
+
+        Keys are int64, amounts and units float64 (NaN if missing), dates
+        datetime64[D] (NaT if missing) and codes and names unicode strings.
+        Needs the optional numpy package.
+
+        Args:
+            cents (bool): Write amounts as exact int64 cents (0 if missing), parsed from
+                their text without going through float, e.g. for `balancing.check_balance`.
+        """
+
+        import numpy
+
+        arrays = {}
+        for table, columns in TABLES.items():
+            values = self.columns[table]
+            arrays[table] = {
+                column.name: _to_array(numpy, values[column.name], column.type, cents) for column in columns
+            }
+
+        return arrays
+
+    def write_csv(self, directory: str):
+        """Writes one `<table>.csv` per table into the directory, dates as ISO 8601."""
+
+        os.makedirs(directory, exist_ok=True)
+        for table, columns in TABLES.items():
+            values = self.columns[table]
+            data = [
+                [_iso_date(value) for value in values[column.name]] if column.type == DATE else values[column.name]
+                for column in columns
+            ]
+
+            with open(os.path.join(directory, table + '.csv'), 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(column.name for column in columns)
+                writer.writerows(zip(*data))
+
+    def write_npz(self, directory: str):
+        """Writes one `<table>.npz` of typed column arrays per table, see `to_arrays`.
+
+        Load a table with `numpy.load(path)`, which maps column names to arrays.
+        Needs the optional numpy package.
+        """
+
+        import numpy
+
+        os.makedirs(directory, exist_ok=True)
+        for table, arrays in self.to_arrays().items():
+            numpy.savez(os.path.join(directory, table + '.npz'), **arrays)
+
+    def _append(self, table: str, **values):
+        for name, column in self.columns[table].items():
+            column.append(values.get(name, ''))
+
+    def _set(self, table: str, name: str, value: str):
+        column = self.columns[table][name]
+        if column:
+            column[-1] = value
+
+    def _current(self, table: str, key: str) -> int:
+        return len(self.columns[table][key]) - 1
+
+    def _interchange(self, segment: List[str], loop: str):
+        self._interchange_control_number = get_element(segment, 13, '')
+        self._component_separator = get_element(segment, 16, DEFAULT_DELIMITERS.component)
+
+    def _transaction_set(self, segment: List[str], loop: str):
+        self._append(
+            TRANSACTION_SETS,
+            transaction_set_id=self._current(TRANSACTION_SETS, 'transaction_set_id') + 1,
+            interchange_control_number=self._interchange_control_number,
+        )
+
+    def _financial_information(self, segment: List[str], loop: str):
+        self._set(TRANSACTION_SETS, 'amount_paid', get_element(segment, 2, ''))
+        self._set(TRANSACTION_SETS, 'payment_method', get_element(segment, 4, ''))
+        self._set(TRANSACTION_SETS, 'transaction_date', get_element(segment, 16, ''))
+
+    def _organization(self, segment: List[str], loop: str):
+        qualifier = get_element(segment, 1, '')
+        if qualifier == _PAYER:
+            self._set(TRANSACTION_SETS, 'payer', get_element(segment, 2, ''))
+        elif qualifier == _PAYEE:
+            self._set(TRANSACTION_SETS, 'payee', get_element(segment, 2, ''))
+
+    def _claim(self, segment: List[str], loop: str):
+        self._append(
+            CLAIMS,
+            claim_id=self._current(CLAIMS, 'claim_id') + 1,
+            transaction_set_id=self._current(TRANSACTION_SETS, 'transaction_set_id'),
+            marker=get_element(segment, 1, ''),
+            status=get_element(segment, 2, ''),
+            charge_amount=get_element(segment, 3, ''),
+            paid_amount=get_element(segment, 4, ''),
+            patient_responsibility_amount=get_element(segment, 5, ''),
+            claim_type=get_element(segment, 6, ''),
+            icn=get_element(segment, 7, ''),
+        )
+
+    def _entity(self, segment: List[str], loop: str):
+        if loop == CLAIM and get_element(segment, 1) == _PATIENT:
+            self._set(CLAIMS, 'patient_identification_code', get_element(segment, 9, ''))
+
+    def _date(self, segment: List[str], loop: str):
+        qualifier = get_element(segment, 1)
+        if loop == CLAIM and qualifier in _CLAIM_DATES:
+            self._set(CLAIMS, _CLAIM_DATES[qualifier], get_element(segment, 2, ''))
+        elif loop == SERVICE and qualifier in _SERVICE_DATES:
+            self._set(SERVICES, _SERVICE_DATES[qualifier], get_element(segment, 2, ''))
+
+    def _service(self, segment: List[str], loop: str):
+        procedure = Composite.split(get_element(segment, 1), self._component_separator, 'SVC.procedure')
+        modifiers = procedure.modifiers if procedure is not None else ()
+        paid_amount = get_element(segment, 3, '')
+
+        # missing units default like `segments.service.Service`: none for an unpaid line, else one
+        allowed_units = get_element(segment, 5) or ('0' if paid_amount and parse_cents(paid_amount) == 0 else '1')
+
+        self._append(
+            SERVICES,
+            service_id=self._current(SERVICES, 'service_id') + 1,
+            claim_id=self._current(CLAIMS, 'claim_id'),
+            qualifier=procedure and procedure.qualifier or '',
+            code=procedure and procedure.code or '',
+            modifier=modifiers[0] if modifiers else '',
+            charge_amount=get_element(segment, 2, ''),
+            paid_amount=paid_amount,
+            revenue_code=get_element(segment, 4, ''),
+            allowed_units=allowed_units,
+            billed_units=get_element(segment, 7) or allowed_units,
+        )
+
+    def _adjustment(self, segment: List[str], loop: str):
+        claim_id = self._current(CLAIMS, 'claim_id')
+        service_id = self._current(SERVICES, 'service_id') if loop == SERVICE else CLAIM_LEVEL
+        group_code = get_element(segment, 1, '')
+
+        # CAS carries up to six reason code, amount and quantity triplets; empty ones are skipped
+        for index in range(2, len(segment), 3):
+            if not segment[index] and not get_element(segment, index + 1):
+                continue
+            self._append(
+                ADJUSTMENTS,
+                claim_id=claim_id,
+                service_id=service_id,
+                group_code=group_code,
+                reason_code=segment[index],
+                amount=get_element(segment, index + 1, ''),
+                quantity=get_element(segment, index + 2, ''),
+            )
+
+    def _remark(self, segment: List[str], loop: str):
+        self._append(
+            REMARKS,
+            claim_id=self._current(CLAIMS, 'claim_id'),
+            service_id=self._current(SERVICES, 'service_id') if loop == SERVICE else CLAIM_LEVEL,
+            qualifier=get_element(segment, 1, ''),
+            code=get_element(segment, 2, ''),
+        )
+
+    def _provider_adjustment(self, segment: List[str], loop: str):
+        transaction_set_id = self._current(TRANSACTION_SETS, 'transaction_set_id')
+
+        # PLB03 onwards are pairs of a composite adjustment identifier and an amount
+        for index in range(3, len(segment) - 1, 2):
+            identifier = AdjustmentIdentifier.split(
+                segment[index], self._component_separator, 'PLB.adjustment_identifiers'
+            )
+            self._append(
+                PROVIDER_ADJUSTMENTS,
+                transaction_set_id=transaction_set_id,
+                provider_identifier=get_element(segment, 1, ''),
+                fiscal_period_date=get_element(segment, 2, ''),
+                reason_code=identifier and identifier.reason_code or '',
+                reference_identification=identifier and identifier.reference_identification or '',
+                amount=segment[index + 1],
+            )
+
+
+def export_columns(segments: Iterator[List[str]]) -> ColumnarTables:
+    """Collects the rows of tokenized EDI segments into columnar tables.
+
+    Args:
+        segments (Iterator[List[str]]): An iterator of tokenized EDI segments, as
+            yielded by `segment_reader.read_tokens`.
+
+    Returns:
+        ColumnarTables: The tables, ready for `to_arrays`, `write_csv` or `write_npz`.
+    """
+
+    return ColumnarTables().add(segments)
+
+
+def _iso_date(value: str) -> str:
+    # CCYYMMDD to CCYY-MM-DD, anything else (missing, ranges) is left empty
+    if len(value) == 8 and value.isdigit():
+        return f'{value[:4]}-{value[4:6]}-{value[6:]}'
+    return ''
+
+
+def _to_array(numpy, values: list, column_type: str, cents: bool = False):
+    if column_type == INTEGER:
+        return numpy.array(values, dtype=numpy.int64)
+    if column_type == MONEY and cents:
+        return numpy.array([parse_cents(value) if value else 0 for value in values], dtype=numpy.int64)
+    if column_type in (FLOAT, MONEY):
+        return numpy.array([value if value else 'nan' for value in values], dtype=numpy.float64)
+    if column_type == DATE:
+        return numpy.array([_iso_date(value) or 'NaT' for value in values], dtype='datetime64[D]')
+    return numpy.array(values, dtype=numpy.str_)
+
+
+if __name__ == "__main__":
+    pass
@@ -1,5 +1,23 @@
-from edi_to_json import edi_to_json
-from json_to_edi import json_to_edi
+import argparse
+import glob
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional
+
+from edi_to_json import edi_to_json, transaction_sets_to_json, write_ndjson
+from instrumentation import Stats
+from json_to_edi import json_to_edi, ndjson_to_edi
+from serialization import JSON_BACKENDS, set_json_backend
+from segment_reader import read_tokens
+from transaction_set_builder import TransactionSetBuilder
+
+JSON_SUFFIX = '.json'
+NDJSON_SUFFIX = '.ndjson'
+OUTPUT_SUFFIXES = (JSON_SUFFIX, NDJSON_SUFFIX)
+
 
 def main():
     """Main function for user interaction."""
@@ -13,14 +31,216 @@ def main():
         elif choice == '2':
             json_file_path = input("Enter the path to your JSON file: ")
             with open(json_file_path, 'r') as f:
-                json_data = f.read()
-            edi_output = json_to_edi(json_data)
-            print(edi_output)
+                if json_file_path.endswith(NDJSON_SUFFIX):
+                    ndjson_to_edi(f, sys.stdout)
+                    print()
+                else:
+                    print(json_to_edi(f.read()))
         elif choice == '3':
             break
         else:
             print("Invalid choice. Please enter 1, 2, or 3.")
 
 
+class ConversionResult(NamedTuple):
+    input_path: str
+    output_path: str
+    segments: int
+    error: Optional[str]
+    stats: Optional[Stats] = None
+
+
+def batch_main(argv: List[str]) -> int:
+    """Converts many EDI 835 files to JSON without prompting.
+
+    Args:
+        argv (List[str]): The command line arguments, without the program name.
+
+    Returns:
+        int: The exit status, 1 if any file failed to convert.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='converter.py',
+        description='Convert EDI 835 files to JSON. Run without arguments for the interactive mode.',
+    )
+    parser.add_argument('paths', nargs='+', help='EDI files, directories or glob patterns.')
+    parser.add_argument('-o', '--output-dir', help='Write the JSON files here instead of next to their input.')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPUs).')
+    parser.add_argument('-p', '--pattern', default='*', help="Files to pick up from directories (default: '*').")
+    parser.add_argument('-r', '--recursive', action='store_true', help='Search directories recursively.')
+    parser.add_argument('--ndjson', action='store_true', help='Write one JSON record per claim and line instead.')
+    parser.add_argument(
+        '--array', action='store_true', help='Write a JSON array even for files with a single transaction set.'
+    )
+    parser.add_argument('--json-backend', choices=JSON_BACKENDS, default='json', help="The JSON writer (default: 'json').")
+    parser.add_argument('--metrics', help='Write the time per stage and the segment counts of all files here, as Prometheus text.')
+    args = parser.parse_args(argv)
+
+    input_paths = list(_expand(args.paths, args.pattern, args.recursive))
+
+    start = time.perf_counter()
+    try:
+        results = convert_files(
+            input_paths, args.output_dir, args.workers, args.ndjson, args.json_backend, metrics=bool(args.metrics),
+            array=args.array,
+        )
+    except ValueError as e:
+        print(f'converter.py: error: {e}', file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+
+    if args.metrics:
+        stats = Stats()
+        for result in results:
+            if result.stats is not None:
+                stats.merge(result.stats)
+        with open(args.metrics, 'w') as f:
+            f.write(stats.to_prometheus())
+
+    failures = [result for result in results if result.error is not None]
+    for failure in failures:
+        print(f'FAILED {failure.input_path}: {failure.error}', file=sys.stderr)
+
+    segments = sum(result.segments for result in results)
+    elapsed = max(elapsed, 1e-9)
+    print(
+        f'{len(results)} files ({len(failures)} failed), {segments} segments in {elapsed:.2f}s: '
+        f'{len(results) / elapsed:.1f} files/sec, {segments / elapsed:.0f} segments/sec'
+    )
+    return 1 if failures else 0
+
+
+def convert_files(
+        input_paths: List[str],
+        output_dir: Optional[str] = None,
+        workers: Optional[int] = None,
+        ndjson: bool = False,
+        json_backend: str = 'json',
+        metrics: bool = False,
+        array: bool = False,
+) -> List[ConversionResult]:
+    """Converts EDI 835 files to JSON on a pool of worker processes.
+
+    A file that fails to convert is reported in its result and does not stop the others.
+    Under `output_dir`, each output keeps its input's path relative to the directory
+    the inputs have in common, so same-named files from different directories do not
+    overwrite each other.
+
+    Args:
+        input_paths (List[str]): The EDI files to convert.
+        output_dir (Optional[str]): Where to write the JSON files. Defaults to next to each input.
+        workers (Optional[int]): The number of worker processes, 1 to convert in this process.
+        ndjson (bool): Write newline-delimited JSON, see `edi_to_json.write_ndjson`.
+        json_backend (str): The JSON writer, see `serialization.set_json_backend`.
+        metrics (bool): Instrument each conversion and return its `instrumentation.Stats` in its result.
+        array (bool): Write a JSON array even for a file with a single transaction set, see `edi_to_json`.
+
+    Returns:
+        List[ConversionResult]: One result per input, in input order.
+
+    Raises:
+        ValueError: If two inputs would be written to the same output, e.g. `x.txt` and
+            `x.edi`. Nothing is converted then.
+    """
+
+    suffix = NDJSON_SUFFIX if ndjson else JSON_SUFFIX
+    output_paths = _output_paths(input_paths, output_dir, suffix)
+    for directory in {os.path.dirname(output_path) for output_path in output_paths}:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    formats = itertools.repeat(ndjson)
+    instrumented = itertools.repeat(metrics)
+    arrays = itertools.repeat(array)
+
+    if workers == 1:
+        set_json_backend(json_backend)
+        return list(map(_convert, input_paths, output_paths, formats, instrumented, arrays))
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(input_paths) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=set_json_backend, initargs=(json_backend,)) as executor:
+        return list(executor.map(
+            _convert, input_paths, output_paths, formats, instrumented, arrays, chunksize=chunksize
+        ))
+
+
+def _convert(
+        input_path: str, output_path: str, ndjson: bool, metrics: bool = False, array: bool = False
+) -> ConversionResult:
+    segments = _SegmentCounter()
+    stats = Stats() if metrics else None
+    try:
+        if ndjson:
+            with open(input_path, 'r') as f, open(output_path, 'w') as output:
+                write_ndjson(segments.count(read_tokens(f)), output, stats=stats)
+            return ConversionResult(input_path, output_path, segments.total, None, stats)
+
+        with open(input_path, 'r') as f:
+            transaction_sets = TransactionSetBuilder(stats=stats).build_all(segments.count(read_tokens(f)))
+
+        json_output = transaction_sets_to_json(transaction_sets, stats, array)
+        with open(output_path, 'w') as f:
+            f.write(json_output)
+
+    except Exception as e:
+        if ndjson and os.path.exists(output_path):
+            os.remove(output_path)  # records were written as they were read, drop the partial file
+        return ConversionResult(input_path, output_path, segments.total, f'{type(e).__name__}: {e}', stats)
+
+    return ConversionResult(input_path, output_path, segments.total, None, stats)
+
+
+class _SegmentCounter:
+
+    def __init__(self):
+        self.total = 0
+
+    def count(self, segments: Iterator[List[str]]) -> Iterator[List[str]]:
+        for segment in segments:
+            self.total += 1
+            yield segment
+
+
+def _expand(paths: List[str], pattern: str, recursive: bool) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            search = os.path.join(path, '**', pattern) if recursive else os.path.join(path, pattern)
+            matches = glob.glob(search, recursive=recursive)
+        else:
+            matches = glob.glob(path) or [path]
+
+        for match in sorted(matches):
+            if os.path.isfile(match) and not match.endswith(OUTPUT_SUFFIXES):
+                yield match
+            elif not os.path.exists(match):
+                yield match  # reported as a failure instead of silently skipped
+
+
+def _output_paths(input_paths: List[str], output_dir: Optional[str], suffix: str) -> List[str]:
+    root = None
+    if output_dir and input_paths:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(input_path)) for input_path in input_paths])
+
+    output_paths = []
+    inputs_by_output = {}
+    for input_path in input_paths:
+        stem, _ = os.path.splitext(input_path)
+        if root is not None:
+            stem = os.path.join(output_dir, os.path.relpath(os.path.abspath(stem), root))
+        output_path = stem + suffix
+
+        # the workers would race to write the same file, so refuse before any starts
+        key = os.path.normcase(os.path.abspath(output_path))
+        if key in inputs_by_output:
+            raise ValueError(f'{inputs_by_output[key]} and {input_path} would both be written to {output_path}.')
+        inputs_by_output[key] = input_path
+        output_paths.append(output_path)
+
+    return output_paths
+
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    if len(sys.argv) > 1:
+        sys.exit(batch_main(sys.argv[1:]))
+    main()
@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from warnings import warn
+
+UNHANDLED_SEGMENT = 'unhandled_segment'
+INVALID_DATE = 'invalid_date'
+UNKNOWN_CLAIM_STATUS = 'unknown_claim_status'
+COMPONENT_SEPARATOR_MISMATCH = 'component_separator_mismatch'
+
+MESSAGES = {
+    UNHANDLED_SEGMENT: 'Segment not handled in its loop',
+    INVALID_DATE: 'Unable to parse the value into a datetime',
+    UNKNOWN_CLAIM_STATUS: 'Code does not match a status in the claim status registry',
+    COMPONENT_SEPARATOR_MISMATCH: 'Composite element is split by a separator other than the ISA16 one',
+}
+
+DEFAULT_SAMPLES = 5
+
+
+class Issue(NamedTuple):
+    """One kind of issue at one place, with how often it was seen.
+
+    Attributes:
+        code (str): What went wrong, one of the keys of `MESSAGES`.
+        location (str): Where, e.g. 'DTM.date' for an element or '2100 MIA' for a segment in a loop.
+        count (int): How many times it was reported.
+        samples (List[Any]): The values of the first occurrences.
+    """
+    code: str
+    location: str
+    count: int
+    samples: List[Any]
+
+    @property
+    def message(self) -> str:
+        return f'{MESSAGES.get(self.code, self.code)} at {self.location} ({self.count}x), e.g. {self.samples[0]!r}'
+
+
+class Diagnostics:
+    """Collects the issues found while building, aggregated by code and location.
+
+    Every report only increments a counter; the value is kept for the first
+    `samples` reports of each code and location, so a file that repeats an
+    unmodeled segment a million times costs a million dictionary updates, not
+    a million warnings.
+
+    `TransactionSetBuilder` reports into one while it builds and hands it back
+    on `TransactionSet.diagnostics`. Elements parsed while no collector is
+    active, e.g. read after the build in lazy mode, warn instead; read them
+    inside `collecting(transaction_set.diagnostics)` to keep their issues.
+    """
+
+    def __init__(self, samples: int = DEFAULT_SAMPLES):
+        self.max_samples = samples
+        self.counts: Dict[Tuple[str, str], int] = {}
+        self.samples: Dict[Tuple[str, str], List[Any]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.total} issues at {len(self.counts)} locations)'
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def report(self, code: str, location: str, value: Any = None):
+        key = (code, location)
+        count = self.counts.get(key, 0) + 1
+        self.counts[key] = count
+        if count <= self.max_samples:
+            self.samples.setdefault(key, []).append(value)
+
+    def summary(self) -> List[Issue]:
+        """Returns the issues, the most frequent first."""
+        return sorted(
+            (Issue(code, location, count, self.samples.get((code, location), [])) for (code, location), count in self.counts.items()),
+            key=lambda issue: -issue.count,
+        )
+
+    def merge(self, other: 'Diagnostics') -> 'Diagnostics':
+        """Adds the issues of another collector, e.g. of another transaction set, to these."""
+
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+            samples = self.samples.setdefault(key, [])
+            samples.extend(other.samples.get(key, [])[:self.max_samples - len(samples)])
+        return self
+
+
+# the collector of the builder that is running, if any; a context variable, so that builds in
+# other threads or asyncio tasks do not report into it
+_active: ContextVar[Optional[Diagnostics]] = ContextVar('diagnostics', default=None)
+
+
+def activate(diagnostics: Optional[Diagnostics]) -> Optional[Diagnostics]:
+    """Makes `report` send issues to `diagnostics`, None to warn; returns the collector it replaces."""
+    previous = _active.get()
+    _active.set(diagnostics)
+    return previous
+
+
+@contextmanager
+def collecting(diagnostics: Optional[Diagnostics]) -> Iterator[Optional[Diagnostics]]:
+    """Activates `diagnostics` for the duration of the block, then restores the collector it replaced.
+
+        with collecting(transaction_set.diagnostics):
+            transaction_set.financial_information.transaction_date  # a lazy element, parsed now
+    """
+    token = _active.set(diagnostics)
+    try:
+        yield diagnostics
+    finally:
+        _active.reset(token)
+
+
+def report(code: str, location: str, value: Any = None):
+    """Reports an issue to the active collector, or as a warning if there is none."""
+    diagnostics = _active.get()
+    if diagnostics is not None:
+        diagnostics.report(code, location, value)
+    else:
+        warn(f'{MESSAGES.get(code, code)} at {location}: {value!r}')
+
+
+if __name__ == "__main__":
+    pass
@@ -1,41 +1,193 @@
-import json
-from typing import Union, List
+from contextlib import nullcontext
+from typing import Iterable, Iterator, List, Optional, TextIO, Union
 
+from diagnostics import collecting
+from instrumentation import JSON_ENCODING, SERIALIZING, Stats
+from segment_reader import read_tokens
+from serialization import Serializable, dumps, to_dict_or_none
 from transaction_set_builder import TransactionSet, TransactionSetBuilder
+from loops.claim import Claim as ClaimLoop
 
+HEADER_RECORD = 'header'
+CLAIM_RECORD = 'claim'
+PROVIDER_ADJUSTMENT_RECORD = 'provider_adjustment'
 
-def edi_to_json(edi_file_path: str) -> str:
+
+def edi_to_json(edi_file_path: str, stats: Optional[Stats] = None, array: bool = False) -> str:
     """Converts an EDI 835 file to JSON format.
 
+    Every ST/SE transaction set is converted on its own, with its own BPR, payer,
+    payee and claims, so a file with several of them loses nothing.
+
+    Args:
+        edi_file_path (str): The path to the EDI 835 file.
+        stats (Optional[Stats]): Records where the time of the conversion goes, see `instrumentation`.
+        array (bool): Always return a JSON array, even for a file with a single transaction set.
+
+    Returns:
+        str: The JSON object of the transaction set for a file with one, as before. A file
+            with several, or any file with `array`, gives a JSON array with one object per
+            transaction set, in file order.
+    """
+
+    builder = TransactionSetBuilder(stats=stats)
+    with open(edi_file_path, 'r') as f:
+        transaction_sets = builder.build_all(read_tokens(f))
+
+    return transaction_sets_to_json(transaction_sets, stats, array)
+
+
+def transaction_sets_to_json(
+        transaction_sets: Iterable[TransactionSet], stats: Optional[Stats] = None, array: bool = True
+) -> str:
+    """Converts built transaction sets to a JSON array.
+
+    Args:
+        transaction_sets (Iterable[TransactionSet]): The transaction sets to convert, e.g. from
+            `TransactionSetBuilder.build_all`.
+        stats (Optional[Stats]): Records the time spent in `to_dict` and in the JSON backend.
+        array (bool): False to write a single transaction set as an object instead of an
+            array of one, the shape `edi_to_json` has always had for such files.
+
+    Returns:
+        str: The JSON array, one object per transaction set, or the object of the only one.
+    """
+
+    if not array:
+        transaction_sets = list(transaction_sets)
+        if len(transaction_sets) == 1:
+            return transaction_set_to_json(transaction_sets[0], stats)
+
+    if stats is None:
+        return dumps([_to_dict(transaction_set) for transaction_set in transaction_sets], indent=True)
+
+    with stats.stage(SERIALIZING):
+        data = [_to_dict(transaction_set) for transaction_set in transaction_sets]
+    with stats.stage(JSON_ENCODING):
+        return dumps(data, indent=True)
+
+
+def transaction_set_to_json(transaction_set: TransactionSet, stats: Optional[Stats] = None) -> str:
+    """Converts a single built transaction set to a JSON object.
+
+    Args:
+        transaction_set (TransactionSet): The transaction set to convert.
+        stats (Optional[Stats]): Records the time spent in `to_dict` and in the JSON backend.
+
+    Returns:
+        str: The JSON representation of the transaction set.
+    """
+
+    if stats is None:
+        return dumps(_to_dict(transaction_set), indent=True)
+
+    with stats.stage(SERIALIZING):
+        data = _to_dict(transaction_set)
+    with stats.stage(JSON_ENCODING):
+        return dumps(data, indent=True)
+
+
+def edi_to_ndjson(edi_file_path: str, output: TextIO, stats: Optional[Stats] = None) -> int:
+    """Converts an EDI 835 file to newline-delimited JSON, writing as it reads.
+
     Args:
         edi_file_path (str): The path to the EDI 835 file.
+        output (TextIO): The file object the records are written to.
+        stats (Optional[Stats]): Records where the time of the conversion goes, see `instrumentation`.
 
     Returns:
-        str: The JSON representation of the EDI 835 file. 
+        int: The number of records written.
     """
 
     with open(edi_file_path, 'r') as f:
-        edi_data = f.read()
-
-    builder = TransactionSetBuilder()
-    transaction_set = builder.build(iter(edi_data.split('~')))
-
-    json_output = json.dumps(transaction_set, default=_custom_serializer, indent=4)
-    return json_output
-
-
-def _custom_serializer(obj):
-    """Handles serialization of custom objects."""
-    if isinstance(obj, (TransactionSet, ClaimLoop, ServiceLoop, OrganizationLoop)):
-        return obj.__dict__
-    
-    if hasattr(obj, '__dict__'):
-        return obj.__dict__
-    
-    if isinstance(obj, (list, tuple)):
-        return [_custom_serializer(item) for item in obj]
-    
-    raise TypeError(f"Type {type(obj)} not serializable")
+        return write_ndjson(read_tokens(f), output, stats=stats)
+
+
+def write_ndjson(
+        segments: Iterator[List[str]],
+        output: TextIO,
+        builder: Optional[TransactionSetBuilder] = None,
+        stats: Optional[Stats] = None,
+) -> int:
+    """Writes the transaction sets in the segments as newline-delimited JSON.
+
+    Every transaction set starts with a header record holding the interchange,
+    the BPR and the payer and payee, followed by one record per claim, written
+    as soon as the claim's loop is complete, and one record per PLB loop once
+    its SE is read. Claims are not kept after they are written, so memory stays
+    flat however many claims the file has. Each record carries its kind in a
+    'record' key, e.g. {"record": "claim", "claim": {...}}.
+
+    Args:
+        segments (Iterator[List[str]]): An iterator of tokenized EDI segments.
+        output (TextIO): The file object the records are written to.
+        builder (Optional[TransactionSetBuilder]): The builder to use, a default one if None.
+        stats (Optional[Stats]): Records the time spent in `to_dict` and in the JSON backend, and
+            everything the default builder records; a given builder records into its own `stats`.
+
+    Returns:
+        int: The number of records written.
+    """
+
+    writer = _NdjsonWriter(output, stats)
+    builder = builder or TransactionSetBuilder(stats=stats)
+
+    for transaction_set in builder.iter_build(segments, on_claim=writer.write_claim):
+        # claims are written while the builder's collector is active, the rest after it yields
+        with collecting(transaction_set.diagnostics):
+            writer.write_header(transaction_set)
+            for provider_adjustment in transaction_set.provider_adjustments:
+                writer.write(PROVIDER_ADJUSTMENT_RECORD, provider_adjustment)
+
+    return writer.records
+
+
+def _to_dict(transaction_set: TransactionSet) -> dict:
+    # lazily decoded elements are parsed here, so their issues go to the transaction set's collector
+    with collecting(transaction_set.diagnostics):
+        return transaction_set.to_dict()
+
+
+class _NdjsonWriter:
+
+    def __init__(self, output: TextIO, stats: Optional[Stats] = None):
+        self.output = output
+        self.records = 0
+        self._header_written_for = None
+        # nullcontext can be entered any number of times, so the untimed path allocates nothing per record
+        self._serializing = stats.stage(SERIALIZING) if stats is not None else nullcontext()
+        self._json_encoding = stats.stage(JSON_ENCODING) if stats is not None else nullcontext()
+
+    def write_header(self, transaction_set: TransactionSet):
+        if self._header_written_for is transaction_set:
+            return
+
+        self._header_written_for = transaction_set
+        with self._serializing:
+            record = {
+                'record': HEADER_RECORD,
+                'interchange': to_dict_or_none(transaction_set.interchange),
+                'financial_information': to_dict_or_none(transaction_set.financial_information),
+                'organizations': [organization.to_dict() for organization in transaction_set.organizations],
+            }
+        self._write(record)
+
+    def write_claim(self, transaction_set: TransactionSet, claim: ClaimLoop):
+        self.write_header(transaction_set)
+        self.write(CLAIM_RECORD, claim)
+
+    def write(self, record: str, value: Serializable):
+        with self._serializing:
+            data = {'record': record, record: value.to_dict()}
+        self._write(data)
+
+    def _write(self, record: dict):
+        with self._json_encoding:
+            line = dumps(record)
+        self.output.write(line)
+        self.output.write('\n')
+        self.records += 1
+
 
 if __name__ == "__main__":
     pass 
\ No newline at end of file
@@ -1,28 +1,182 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sys import intern
+from datetime import datetime
+from typing import Any, Callable, Dict, Mapping, Optional
+
+class _Pending:
+	"""Marks an element whose raw value has not been parsed yet."""
+
+	def __reduce__(self):
+		# unpickle to the module's own marker so segments sent between processes stay lazy
+		return '_PENDING'
+
+
+_PENDING = _Pending()
+
+# whether segments built now defer parsing; a context variable, so builds in other threads
+# or asyncio tasks keep their own mode
+_lazy: ContextVar[bool] = ContextVar('lazy_decoding', default=False)
+
+
+def format_value(value: Any) -> str:
+	"""Writes a value as an element, None as an empty one."""
+	return '' if value is None else str(value)
 
 
 class Element(ABC):
+	"""Descriptor that parses a raw EDI element when it is assigned to a segment.
+
+	In lazy mode the raw value is stored as is and only parsed the first time the
+	attribute is read; the parsed value is then cached on the instance. Segments
+	with `__slots__` need a `_<name>_raw` slot next to `_<name>` for each element.
+
+	`encoder` turns the parsed value into a JSON-safe one for `to_dict`; None
+	means the parsed value already is JSON-safe. `decoder` is the inverse of
+	`encoder`, used by `from_dict`; None means the JSON value is the parsed
+	value. `formatter` is the inverse of `parser`: it writes the parsed value
+	back as the raw element for `to_edi`.
+	"""
+
+	encoder: Optional[Callable[[Any], Any]] = None
+	decoder: Optional[Callable[[Any], Any]] = None
+	formatter: Callable[[Any], str] = staticmethod(format_value)
+	location = 'unbound element'
 
 	def __set_name__(self, owner, name):
 		self.private_name = '_' + name
+		self.raw_name = '_' + name + '_raw'
+		# where parse issues are reported, e.g. 'DTM.date'
+		self.location = f"{getattr(owner, 'identification', owner.__name__)}.{name}"
 
 	def __get__(self, obj, obj_type=None):
-		return getattr(obj, self.private_name)
+		value = getattr(obj, self.private_name)
+		if value is _PENDING:
+			value = self.parser(getattr(obj, self.raw_name))
+			setattr(obj, self.private_name, value)
+		return value
 
 	def __set__(self, obj, value):
-		value = self.parser(value)
-		setattr(obj, self.private_name, value)
+		if _lazy.get():
+			setattr(obj, self.raw_name, value)
+			setattr(obj, self.private_name, _PENDING)
+		else:
+			value = self.parser(value)
+			setattr(obj, self.private_name, value)
 
 	@abstractmethod
 	def parser(self, value):
 		pass
 
 
+@contextmanager
+def lazy_decoding(enabled: bool = True):
+	"""Defers element parsing to the first read for segments built inside the block.
+
+	Segments built in lazy mode keep decoding on demand after the block exits.
+	The mode only applies to the current thread or asyncio task.
+	"""
+	token = _lazy.set(enabled)
+	try:
+		yield
+	finally:
+		_lazy.reset(token)
+
+
+def is_lazy() -> bool:
+	"""True inside `lazy_decoding`, in the current thread or asyncio task."""
+	return _lazy.get()
+
+
+def intern_code(value: Optional[str]) -> Optional[str]:
+	"""Interns a code that has no description so repeated codes share one string."""
+	return intern(value) if isinstance(value, str) else value
+
+
 class Code:
+	"""An immutable code and its description, shared by every element carrying the code."""
+
+	__slots__ = ('code', 'description')
+
+	def __init__(self, code: str, description: Optional[str]):
+		object.__setattr__(self, 'code', code)
+		object.__setattr__(self, 'description', description)
 
-	def __init__(self, code: str, description: str):
-		self.code = code
-		self.description = description
+	def __setattr__(self, name, value):
+		raise AttributeError(f'{type(self).__name__} is immutable')
+
+	def __reduce__(self):
+		return Code, (self.code, self.description)
 
 	def __str__(self) -> str:
-		return str(self.__dict__)
+		return str(self.to_dict())
+
+	def to_dict(self) -> Dict[str, Optional[str]]:
+		return {'code': self.code, 'description': self.description}
+
+
+def encode_code(value: Optional[Code]) -> Optional[Dict[str, Optional[str]]]:
+	return None if value is None else value.to_dict()
+
+
+def encode_date(value: Any) -> Any:
+	"""Writes dates as ISO 8601 strings, leaving values that failed to parse as they are."""
+	return value.isoformat() if isinstance(value, datetime) else value
+
+
+def decode_date(value: Any) -> Any:
+	"""Reads the ISO 8601 strings written by `encode_date`, leaving other values as they are."""
+	if isinstance(value, str):
+		try:
+			return datetime.fromisoformat(value)
+		except ValueError:
+			pass
+	return value
+
+
+def format_code(value: Optional[Code]) -> str:
+	return '' if value is None else value.code
+
+
+def format_date(value: Any) -> str:
+	"""Writes dates as CCYYMMDD, leaving values that failed to parse as they are."""
+	if isinstance(value, datetime):
+		return value.strftime('%Y%m%d')
+	return '' if value is None else value
+
+
+def description_formatter(descriptions: Mapping[str, str]) -> Callable[[Optional[str]], str]:
+	"""Returns a formatter writing back the code of an element parsed into its description.
+
+	Codes without a description were parsed as they are and are written as they are.
+	"""
+	codes = {description: code for code, description in descriptions.items()}
+
+	def format_description(value: Optional[str]) -> str:
+		return '' if value is None else codes.get(value, value)
+
+	return format_description
+
+
+class CodeRegistry:
+	"""Hands out one shared Code per code value.
+
+	Codes are created on first lookup and then returned from a hash map, so a
+	file allocates one Code per distinct code rather than one per segment.
+	Codes missing from the descriptions get no description.
+	"""
+
+	def __init__(self, descriptions: Mapping[str, str]):
+		self.descriptions = descriptions
+		self._codes: Dict[str, Code] = {}
+
+	def __getitem__(self, code: str) -> Code:
+		found = self._codes.get(code)
+		if found is None:
+			found = self._codes[code] = Code(code, self.descriptions.get(code))
+		return found
+
+	def decode(self, value: Optional[Dict[str, Optional[str]]]) -> Optional[Code]:
+		"""Returns the shared Code of a value written by `encode_code`."""
+		return None if value is None else self[value['code']]
@@ -1,4 +1,4 @@
-from elements import Element, Code
+from elements import Element, Code, CodeRegistry, encode_code, format_code
 
 # https://x12.org/codes/claim-adjustment-group-codes
 adjustment_group_codes = {
@@ -9,9 +9,14 @@ adjustment_group_codes = {
 	'PI': 'payor initiated reduction',
 }
 
+_registry = CodeRegistry(adjustment_group_codes)
+
 
 class AdjustmentGroupCode(Element):
 
+	encoder = staticmethod(encode_code)
+	decoder = staticmethod(_registry.decode)
+	formatter = staticmethod(format_code)
+
 	def parser(self, value: str) -> Code:
-		description = adjustment_group_codes.get(value, None)
-		return Code(value, description)
+		return _registry[value]
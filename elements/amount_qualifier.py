@@ -1,4 +1,4 @@
-from elements import Element
+from elements import Element, intern_code, description_formatter
 
 # https://ushik.ahrq.gov/ViewItemDetails?system=mdr&itemKey=133081000
 amount_qualifiers = {
@@ -9,5 +9,7 @@ amount_qualifiers = {
 
 class AmountQualifier(Element):
 
+	formatter = staticmethod(description_formatter(amount_qualifiers))
+
 	def parser(self, value: str) -> str:
-		return amount_qualifiers.get(value, value)
+		return amount_qualifiers.get(value) or intern_code(value)
@@ -5,6 +5,9 @@ from elements import Element
 
 class AuthorizationInformationQualifier(Element):
 
+	# '00' (no authorization information) is parsed to None
+	formatter = staticmethod(lambda value: '00' if value is None else value)
+
 	def parser(self, value: str) -> Optional[str]:
 		if value == '00':
 			value = None
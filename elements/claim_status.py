@@ -1,9 +1,8 @@
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Optional
-from warnings import warn
-
+from typing import Dict, Optional
 
+from diagnostics import UNKNOWN_CLAIM_STATUS, report
 from elements import Element
 
 
@@ -18,7 +17,7 @@ class PayerClassification(Enum):
 		return str(self.name).lower()
 
 
-@dataclass
+@dataclass(frozen=True)
 class Status:
 	"""
 	Attributes:
@@ -33,6 +32,27 @@ class Status:
 	payer_classification: PayerClassification
 	was_forwarded: bool
 
+	def to_dict(self) -> dict:
+		return {
+			'code': self.code,
+			'description': self.description,
+			'payer_classification': str(self.payer_classification),
+			'was_forwarded': self.was_forwarded,
+		}
+
+	@classmethod
+	def from_dict(cls, data: dict) -> 'Status':
+		"""The inverse of `to_dict`, returning the registered status if the code has one."""
+		status = _STATUSES.get(data['code'])
+		if status is None:
+			status = cls(
+				data['code'],
+				data.get('description'),
+				PayerClassification[data.get('payer_classification', 'unknown').upper()],
+				data.get('was_forwarded', False),
+			)
+		return status
+
 
 _REGISTRY = [
 	Status('1', 'processed as primary', PayerClassification.PRIMARY, False),
@@ -46,16 +66,35 @@ _REGISTRY = [
 ]
 
 
-def _lookup_status(code: str) -> Status:
-	status = [s for s in _REGISTRY if s.code == code]
-	if len(status) == 0:
-		warn(f'ClaimStatus: Code {code} does not match a status in the edi-835-parser claim status registry.')
-		return Status('code', 'uncategorized', PayerClassification.UNKNOWN)
+_STATUSES = {status.code: status for status in _REGISTRY}
+# uncategorized statuses are shared like registered ones, but still reported on every use
+_UNKNOWN_STATUSES: Dict[str, Status] = {}
+
+
+def _lookup_status(code: str, location: str = 'CLP.status') -> Status:
+	status = _STATUSES.get(code)
+	if status is None:
+		report(UNKNOWN_CLAIM_STATUS, location, code)
+		status = _UNKNOWN_STATUSES.get(code)
+		if status is None:
+			status = _UNKNOWN_STATUSES[code] = Status(code, 'uncategorized', PayerClassification.UNKNOWN, False)
+
+	return status
 
-	return status[0]
+
+def decode_status(value: Optional[dict]) -> Optional[Status]:
+	return None if value is None else Status.from_dict(value)
+
+
+def format_status(status: Optional[Status]) -> str:
+	return '' if status is None else status.code
 
 
 class ClaimStatus(Element):
 
+	encoder = staticmethod(Status.to_dict)
+	decoder = staticmethod(decode_status)
+	formatter = staticmethod(format_status)
+
 	def parser(self, value: str) -> Status:
-		return _lookup_status(value)
+		return _lookup_status(value, self.location)
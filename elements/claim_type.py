@@ -1,4 +1,4 @@
-from elements import Element
+from elements import Element, description_formatter
 
 # https://www.stedi.com/edi/x12/element/1032
 claim_types = {
@@ -7,5 +7,7 @@ claim_types = {
 
 class ClaimType(Element):
 
+    formatter = staticmethod(description_formatter(claim_types))
+
     def parser(self, value: str) -> str:
         return claim_types.get(value, value)
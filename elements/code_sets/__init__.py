@@ -0,0 +1,88 @@
+import mmap
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterator, Mapping, Optional
+
+_DIRECTORY = Path(__file__).parent
+_FIELD_SEPARATOR = b'\t'
+_LINE_SEPARATOR = b'\n'
+
+
+class _Table:
+	"""A memory-mapped code list with the offset of every line, in code order."""
+
+	__slots__ = ('map', 'offsets', 'codes')
+
+	def __init__(self, path: Path):
+		with open(path, 'rb') as f:
+			self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+		# skip the header; each line starts after the previous separator
+		offsets = array('L')
+		position = self.map.find(_LINE_SEPARATOR) + 1
+		while position < len(self.map):
+			offsets.append(position)
+			position = self.map.find(_LINE_SEPARATOR, position)
+			if position < 0:
+				break
+			position += 1
+		self.offsets = offsets
+		# only the codes are decoded up front, the descriptions stay in the map until looked up
+		self.codes = [self._field(offset, 0) for offset in offsets]
+
+		if any(previous >= code for previous, code in zip(self.codes, self.codes[1:])):
+			raise ValueError(f'{path.name} must list every code once, sorted by code.')
+
+	def _field(self, offset: int, index: int) -> str:
+		end = self.map.find(_LINE_SEPARATOR, offset)
+		line = self.map[offset:end if end >= 0 else len(self.map)]
+		return line.split(_FIELD_SEPARATOR, 1)[index].decode('utf-8')
+
+	def description(self, code: str) -> Optional[str]:
+		index = bisect_left(self.codes, code)
+		if index < len(self.codes) and self.codes[index] == code:
+			return self._field(self.offsets[index], 1)
+		return None
+
+
+class CodeSet(Mapping):
+	"""An X12 code list mapping each code to its description.
+
+	The list lives in `<name>.tsv` next to this module: a header line, then one
+	code per line, code and description separated by a tab, sorted by code. On
+	the first lookup the file is memory-mapped and only the codes are read into
+	a sorted list; a lookup is a binary search that decodes the one description
+	it finds. Importing a module that declares a code set costs nothing.
+
+	The shipped carc.tsv and rarc.tsv are partial: they hold the codes this
+	package used to hardcode. Codes missing from them parse without a
+	description. Replace them with the published X12 lists in the same format to
+	get every description.
+	"""
+
+	def __init__(self, name: str):
+		self.path = _DIRECTORY / f'{name}.tsv'
+		self._table: Optional[_Table] = None
+
+	@property
+	def table(self) -> _Table:
+		if self._table is None:
+			self._table = _Table(self.path)
+		return self._table
+
+	def get(self, code: str, default: Optional[str] = None) -> Optional[str]:
+		description = self.table.description(code)
+		return default if description is None else description
+
+	def __getitem__(self, code: str) -> str:
+		description = self.table.description(code)
+		if description is None:
+			raise KeyError(code)
+		return description
+
+	def __iter__(self) -> Iterator[str]:
+		return iter(self.table.codes)
+
+	def __len__(self) -> int:
+		return len(self.table.codes)
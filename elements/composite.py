@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from diagnostics import COMPONENT_SEPARATOR_MISMATCH, report
+from elements import Element
+
+# C003 (SVC01, SVC06): qualifier, procedure code, up to four modifiers, description
+_MODIFIERS = slice(2, 6)
+_MODIFIER_COUNT = 4
+# the component separators in common use, tried when a composite lacks the one ISA16 declares
+COMMON_COMPONENT_SEPARATORS = (':', '>')
+
+
+class Composite(Sequence[str]):
+	"""A composite element split once on the ISA16 component separator.
+
+	Reads like the list of its components, with the names of the procedure
+	identifier (C003) of SVC01 and SVC06: qualifier, code, modifiers and
+	description. `AdjustmentIdentifier` names the components of the C042 of
+	PLB03 to PLB13 instead. Missing components read as None. Immutable, so
+	equal composites can be shared.
+	"""
+
+	__slots__ = ('components',)
+
+	def __init__(self, components: Sequence[str]):
+		object.__setattr__(self, 'components', tuple(components))
+
+	def __setattr__(self, name, value):
+		raise AttributeError(f'{type(self).__name__} is immutable')
+
+	def __reduce__(self):
+		return type(self), (self.components,)
+
+	@classmethod
+	def split(
+			cls, value: Optional[str], component_separator: str, location: str = 'composite element'
+	) -> Optional['Composite']:
+		"""Splits a raw composite element, None if the element is missing or empty.
+
+		Some senders separate components with another character than the one
+		they declare in ISA16. A composite that does not contain the declared
+		separator but contains one of `COMMON_COMPONENT_SEPARATORS` is split on
+		that one instead, and the mismatch is reported at `location`.
+		"""
+		if not value:
+			return None
+
+		if component_separator not in value:
+			for separator in COMMON_COMPONENT_SEPARATORS:
+				if separator in value:
+					report(COMPONENT_SEPARATOR_MISMATCH, location, value)
+					component_separator = separator
+					break
+
+		return cls(value.split(component_separator))
+
+	def __len__(self) -> int:
+		return len(self.components)
+
+	def __getitem__(self, index):
+		return self.components[index]
+
+	def __eq__(self, other) -> bool:
+		if isinstance(other, Composite):
+			return self.components == other.components
+		return NotImplemented
+
+	def __hash__(self) -> int:
+		return hash(self.components)
+
+	def __repr__(self) -> str:
+		return f'{type(self).__name__}({list(self.components)!r})'
+
+	def component(self, index: int) -> Optional[str]:
+		"""Returns a component by position, None if it is missing or empty."""
+		components = self.components
+		return (components[index] or None) if index < len(components) else None
+
+	@property
+	def qualifier(self) -> Optional[str]:
+		return self.component(0)
+
+	@property
+	def code(self) -> Optional[str]:
+		return self.component(1)
+
+	@property
+	def modifiers(self) -> Tuple[str, ...]:
+		"""The procedure modifiers (C003-03 to C003-06) that are present, in order."""
+		return tuple(modifier for modifier in self.components[_MODIFIERS] if modifier)
+
+	@property
+	def description(self) -> Optional[str]:
+		return self.component(6)
+
+	def join(self, component_separator: str) -> str:
+		"""Writes the composite back as a raw element, without trailing empty components."""
+		components = list(self.components)
+		while components and not components[-1]:
+			components.pop()
+		return component_separator.join(components)
+
+	def to_dict(self) -> Dict[str, Union[Optional[str], List[str]]]:
+		return {
+			'qualifier': self.qualifier,
+			'code': self.code,
+			'modifiers': list(self.modifiers),
+			'description': self.description,
+		}
+
+	@classmethod
+	def from_dict(cls, data: Optional[dict]) -> Optional['Composite']:
+		"""The inverse of `to_dict`."""
+		if data is None:
+			return None
+		components = [data.get('qualifier') or '', data.get('code') or '', *(data.get('modifiers') or ())]
+		if data.get('description'):
+			# the description is C003-07, after all four modifier positions
+			components.extend([''] * (2 + _MODIFIER_COUNT - len(components)))
+			components.append(data['description'])
+		return cls(components)
+
+
+class AdjustmentIdentifier(Composite):
+	"""The adjustment identifier (C042) of PLB03 to PLB13: an adjustment reason code and a reference identification."""
+
+	__slots__ = ()
+
+	@property
+	def reason_code(self) -> Optional[str]:
+		return self.component(0)
+
+	@property
+	def reference_identification(self) -> Optional[str]:
+		return self.component(1)
+
+	def to_dict(self) -> Dict[str, Optional[str]]:
+		return {'reason_code': self.reason_code, 'reference_identification': self.reference_identification}
+
+	@classmethod
+	def from_dict(cls, data: Optional[dict]) -> Optional['AdjustmentIdentifier']:
+		"""The inverse of `to_dict`."""
+		if data is None:
+			return None
+		return cls([data.get('reason_code') or '', data.get('reference_identification') or ''])
+
+
+def encode_composite(value: Optional[Composite]) -> Optional[dict]:
+	return None if value is None else value.to_dict()
+
+
+class CompositeElement(Element):
+	"""A composite element; segments split it with the component separator they are given and assign the `Composite`."""
+
+	encoder = staticmethod(encode_composite)
+	decoder = staticmethod(Composite.from_dict)
+
+	def parser(self, value: Optional[Composite]) -> Optional[Composite]:
+		return value
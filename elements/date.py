@@ -1,21 +1,103 @@
-from typing import Union
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional, Union
 from datetime import datetime
-from warnings import warn
 
-from elements import Element
+from diagnostics import INVALID_DATE, report
+from elements import Element, decode_date, encode_date, format_date
 
+# a remittance file has a few hundred distinct dates, so the cache rarely fills up
+CACHE_SIZE = 4096
+RANGE_QUALIFIER = 'RD8'
+RANGE_SEPARATOR = '-'
+
+
+class DateRange(NamedTuple):
+	"""An RD8 date range (CCYYMMDD-CCYYMMDD)."""
+	start: datetime
+	end: datetime
+
+
+def encode_date_or_range(value: Any) -> Any:
+	"""Writes dates as ISO 8601 strings and ranges as {'start': ..., 'end': ...}."""
+	if type(value) is DateRange:
+		return {'start': value.start.isoformat(), 'end': value.end.isoformat()}
+	return encode_date(value)
+
+
+def decode_date_or_range(value: Any) -> Any:
+	"""The inverse of `encode_date_or_range`."""
+	if type(value) is dict:
+		return DateRange(decode_date(value['start']), decode_date(value['end']))
+	return decode_date(value)
 
-class Date(Element):
 
-	def parser(self, value: str) -> Union[datetime, str]:
+def format_date_or_range(value: Any) -> str:
+	"""Writes dates as CCYYMMDD and ranges as CCYYMMDD-CCYYMMDD."""
+	if type(value) is DateRange:
+		return format_date(value.start) + RANGE_SEPARATOR + format_date(value.end)
+	return format_date(value)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date(value: str) -> Union[datetime, DateRange, str]:
+	"""Parses a fixed-width date, returning the value as it is if it is not one.
+
+	Accepts CCYYMMDD, YYMMDDHHMM (ISA09 followed by ISA10) and CCYYMMDD-CCYYMMDD
+	ranges, with or without the RD8 prefix. Results are memoized: datetimes and
+	ranges are immutable, so every element with the same raw value shares one.
+	"""
+
+	try:
+		if len(value) == 8:
+			return datetime(int(value[:4]), int(value[4:6]), int(value[6:]))
+
 		if len(value) == 10:
-			year, month, day, minute, second = [int(value[i:i + 2]) for i in range(0, len(value), 2)]
-			return datetime(2000 + year, month, day, minute, second)
+			return datetime(
+				2000 + int(value[:2]), int(value[2:4]), int(value[4:6]), int(value[6:8]), int(value[8:])
+			)
+
+		# strip the qualifier from a copy: a token that is not a range is returned as it was read
+		text = value
+		if text.startswith(RANGE_QUALIFIER):
+			text = text[len(RANGE_QUALIFIER):].lstrip(RANGE_SEPARATOR)
+		if len(text) == 17 and text[8] == RANGE_SEPARATOR:
+			start, end = parse_date(text[:8]), parse_date(text[9:])
+			if type(start) is datetime and type(end) is datetime:
+				return DateRange(start, end)
+
+	except ValueError:
+		pass
+
+	return value
+
+
+def cache_info():
+	"""Returns the hits, misses, maxsize and currsize of the date cache."""
+	return parse_date.cache_info()
+
+
+def cache_hit_rate() -> float:
+	"""Returns the share of date lookups answered from the cache, 0.0 before the first one."""
+	info = parse_date.cache_info()
+	lookups = info.hits + info.misses
+	return info.hits / lookups if lookups else 0.0
+
+
+def clear_cache():
+	parse_date.cache_clear()
+
+
+class Date(Element):
+
+	encoder = staticmethod(encode_date_or_range)
+	decoder = staticmethod(decode_date_or_range)
+	formatter = staticmethod(format_date_or_range)
 
-		elif len(value) == 8:
-			year, month, day = int(value[:4]), int(value[4:6]), int(value[6:])
-			return datetime(year, month, day)
+	def parser(self, value: Optional[str]) -> Optional[Union[datetime, DateRange, str]]:
+		if value is None:
+			return None
 
-		else:
-			warn(f'Unable to parse {value} into a datetime')
-			return value
+		parsed = parse_date(value)
+		if type(parsed) is str:
+			report(INVALID_DATE, self.location, value)
+		return parsed
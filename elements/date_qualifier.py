@@ -1,4 +1,4 @@
-from elements import Element
+from elements import Element, intern_code, description_formatter
 
 # https://ediacademy.com/blog/x12-date-time-qualifiers/
 date_qualifiers = {
@@ -13,5 +13,7 @@ date_qualifiers = {
 
 class DateQualifier(Element):
 
+	formatter = staticmethod(description_formatter(date_qualifiers))
+
 	def parser(self, value: str) -> str:
-		return date_qualifiers.get(value, value)
+		return date_qualifiers.get(value) or intern_code(value)
@@ -1,10 +1,130 @@
-from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Union
 
-from elements import Element
+from elements import Element, _PENDING, _Pending, is_lazy
+
+Amount = Union[float, int]
+
+
+class _PendingCents(_Pending):
+	"""Marks an amount assigned in lazy mode inside `money_in_cents`, parsed into cents whenever it is read."""
+
+	def __reduce__(self):
+		return '_PENDING_CENTS'
+
+
+_PENDING_CENTS = _PendingCents()
+
+# whether amounts built now are parsed into cents; a context variable, so builds in other
+# threads or asyncio tasks keep their own mode
+_cents: ContextVar[bool] = ContextVar('money_in_cents', default=False)
+
+
+def parse_cents(value: str) -> int:
+	"""Parses a decimal amount into integer cents without going through float (e.g. '-10.5' -> -1050).
+
+	Digits past the cent are rounded half away from zero.
+	"""
+	whole, point, fraction = value.partition('.')
+	if not point:
+		return int(value) * 100
+	if len(fraction) <= 2:
+		# '-0' + '50' and '' + '5' + '0' keep the sign and scale of the whole part
+		return int(whole + fraction.ljust(2, '0'))
+
+	cents = int(whole + fraction[:2])
+	if fraction[2] >= '5':
+		cents += -1 if value.lstrip().startswith('-') else 1
+	return cents
+
+
+def format_cents(value: int) -> str:
+	"""Writes integer cents as an amount without trailing zeros (e.g. 12500 -> '125', -1050 -> '-10.5')."""
+	dollars, cents = divmod(abs(value), 100)
+	text = f'{dollars}.{cents:02}'.rstrip('0').rstrip('.')
+	return '-' + text if value < 0 else text
+
+
+def format_amount(value: Optional[Amount]) -> str:
+	"""Writes an amount to the cent without trailing zeros, as X12 decimal elements prefer (e.g. 125, 10.5).
+
+	Integers are amounts parsed in cents (see `money_in_cents`).
+	"""
+	if value is None:
+		return ''
+	if type(value) is int:
+		return format_cents(value)
+
+	text = f'{value:.2f}'.rstrip('0').rstrip('.')
+	return '0' if text == '-0' else text
+
+
+def encode_amount(value: Optional[Amount]) -> Optional[float]:
+	"""Writes amounts in dollars, so `to_dict` is the same whichever mode they were parsed in."""
+	return value / 100 if type(value) is int else value
+
+
+def decode_amount(value: Optional[float]) -> Optional[Amount]:
+	"""Reads an amount written by `encode_amount` in the current mode."""
+	if value is None:
+		return None
+	return round(value * 100) if _cents.get() else float(value)
+
+
+def parse_amount(value: str, cents: Optional[bool] = None) -> Amount:
+	"""Parses a non-empty amount into integer cents or float dollars.
+
+	Without `cents`, in the current mode: cents inside `money_in_cents`, dollars otherwise.
+	"""
+	if cents is None:
+		cents = _cents.get()
+	return parse_cents(value) if cents else float(value)
+
+
+@contextmanager
+def money_in_cents(enabled: bool = True):
+	"""Parses the amounts of segments built inside the block into exact integer cents instead of float dollars.
+
+	Sums of cents are exact, and `balancing` sums them as int64 arrays. `to_dict`
+	still writes dollars and `to_edi` writes the same amounts. In lazy mode an
+	amount is parsed when it is first read, but in the mode of the block it was
+	built in. The mode only applies to the current thread or asyncio task.
+	"""
+	token = _cents.set(enabled)
+	try:
+		yield
+	finally:
+		_cents.reset(token)
+
+
+def is_in_cents() -> bool:
+	"""True inside `money_in_cents`, in the current thread or asyncio task."""
+	return _cents.get()
 
 
 class Dollars(Element):
 
-	def parser(self, value: str) -> Optional[float]:
-		if value != '':
-			return float(value)
+	encoder = staticmethod(encode_amount)
+	decoder = staticmethod(decode_amount)
+	formatter = staticmethod(format_amount)
+
+	def __get__(self, obj, obj_type=None):
+		value = getattr(obj, self.private_name)
+		if value is _PENDING or value is _PENDING_CENTS:
+			raw = getattr(obj, self.raw_name)
+			value = parse_amount(raw, value is _PENDING_CENTS) if raw is not None and raw != '' else None
+			setattr(obj, self.private_name, value)
+		return value
+
+	def __set__(self, obj, value):
+		if is_lazy():
+			# the mode is the one the segment is built in, not the one it is read in
+			setattr(obj, self.raw_name, value)
+			setattr(obj, self.private_name, _PENDING_CENTS if _cents.get() else _PENDING)
+		else:
+			setattr(obj, self.private_name, self.parser(value))
+
+	def parser(self, value: str) -> Optional[Amount]:
+		if value is not None and value != '':
+			return parse_amount(value)
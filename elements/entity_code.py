@@ -1,4 +1,4 @@
-from elements import Element
+from elements import Element, intern_code, description_formatter
 
 # https://ediacademy.com/blog/x12-n101-entity-identifier-codes/
 entity_codes = {
@@ -11,5 +11,7 @@ entity_codes = {
 
 class EntityCode(Element):
 
+	formatter = staticmethod(description_formatter(entity_codes))
+
 	def parser(self, value: str) -> str:
-		return entity_codes.get(value, value)
+		return entity_codes.get(value) or intern_code(value)
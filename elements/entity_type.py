@@ -1,4 +1,4 @@
-from elements import Element
+from elements import Element, description_formatter
 
 # https://magnacare.com/wp-content/uploads/pdf/MagnacareCompanionGuide_835_5010A1.pdf
 entity_types = {
@@ -9,5 +9,7 @@ entity_types = {
 
 class EntityType(Element):
 
+	formatter = staticmethod(description_formatter(entity_types))
+
 	def parser(self, value: str) -> str:
 		return entity_types.get(value, value)
@@ -1,4 +1,4 @@
-from elements import Element
+from elements import Element, description_formatter
 
 # https://ushik.ahrq.gov/dr.ui.drValueDomain_View?system=mdr&ValueDomainID=4933000&CallingRoutine=$CallingRoutine$&OrganizationID=3&RecordOffset=11&Referer=ValueDomain
 identification_code_qualifiers = {
@@ -12,5 +12,7 @@ identification_code_qualifiers = {
 
 class IdentificationCodeQualifier(Element):
 
+	formatter = staticmethod(description_formatter(identification_code_qualifiers))
+
 	def parser(self, value: str) -> str:
 		return identification_code_qualifiers.get(value, value)
@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import Any, Callable, Optional, Union
 
 from elements import Element
 
@@ -15,3 +15,18 @@ class Integer(Element):
 			pass
 
 		return value
+
+
+class DefaultInteger(Integer):
+	"""An integer whose missing value is computed from the segment when it is read.
+
+	The default is not computed when the segment is built, so it may read other
+	elements without decoding them up front in lazy mode.
+	"""
+
+	def __init__(self, default: Callable[[Any], Optional[int]]):
+		self.default = default
+
+	def __get__(self, obj, obj_type=None):
+		value = super().__get__(obj, obj_type)
+		return self.default(obj) if value is None else value
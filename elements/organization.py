@@ -1,4 +1,4 @@
-from elements import Element
+from elements import Element, description_formatter
 
 organizations = {
 	'AV09311993': 'Availity',
@@ -8,6 +8,8 @@ organizations = {
 
 class Organization(Element):
 
+	formatter = staticmethod(description_formatter(organizations))
+
 	def parser(self, value: str) -> str:
 		value = value.strip()
 		return organizations.get(value, value)
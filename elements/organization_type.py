@@ -1,4 +1,4 @@
-from elements import Element
+from elements import Element, description_formatter
 
 organization_types = {
 	'PE': 'payee',
@@ -8,6 +8,8 @@ organization_types = {
 
 class OrganizationType(Element):
 
+	formatter = staticmethod(description_formatter(organization_types))
+
 	def parser(self, value: str) -> str:
 		value = value.strip()
 		return organization_types.get(value, value)
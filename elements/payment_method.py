@@ -1,4 +1,4 @@
-from elements import Element
+from elements import Element, description_formatter
 
 payment_methods = {
 	'ACH': 'automatic deposit',
@@ -9,6 +9,8 @@ payment_methods = {
 
 class PaymentMethod(Element):
 
+	formatter = staticmethod(description_formatter(payment_methods))
+
 	def parser(self, value: str) -> str:
 		value = value.strip()
 		return payment_methods.get(value, value)
@@ -1,4 +1,4 @@
-from elements import Element, Code
+from elements import Element, Code, CodeRegistry, encode_code, format_code
 
 # https://ushik.ahrq.gov/ViewItemDetails?&system=sdo&itemKey=133213000
 reference_qualifiers = {
@@ -9,9 +9,14 @@ reference_qualifiers = {
 	'LU': 'location number'
 }
 
+_registry = CodeRegistry(reference_qualifiers)
+
 
 class ReferenceQualifier(Element):
 
+	encoder = staticmethod(encode_code)
+	decoder = staticmethod(_registry.decode)
+	formatter = staticmethod(format_code)
+
 	def parser(self, value: str) -> Code:
-		description = reference_qualifiers.get(value, None)
-		return Code(value, description)
+		return _registry[value]
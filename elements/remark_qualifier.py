@@ -1,12 +1,17 @@
-from elements import Element, Code
+from elements import Element, Code, CodeRegistry, encode_code, format_code
 
 remark_qualifiers = {
 	'HE': 'claim payment'
 }
 
+_registry = CodeRegistry(remark_qualifiers)
+
 
 class RemarkQualifier(Element):
 
+	encoder = staticmethod(encode_code)
+	decoder = staticmethod(_registry.decode)
+	formatter = staticmethod(format_code)
+
 	def parser(self, value: str) -> Code:
-		description = remark_qualifiers.get(value, None)
-		return Code(value, description)
+		return _registry[value]
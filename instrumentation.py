@@ -0,0 +1,195 @@
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from loop_grammar import Loop, Route
+
+TOKENIZING = 'tokenizing'
+LOOP_BUILDING = 'loop_building'
+ELEMENT_DECODING = 'element_decoding'
+SERIALIZING = 'serializing'
+JSON_ENCODING = 'json_encoding'
+STAGES = (TOKENIZING, LOOP_BUILDING, ELEMENT_DECODING, SERIALIZING, JSON_ENCODING)
+
+METRIC_PREFIX = 'edi835'
+
+
+class Stats:
+    """Where the time of a conversion goes, and what it read and created.
+
+    Pass one to `TransactionSetBuilder(stats=...)` and to the serializers in
+    `edi_to_json`. Time is charged to one stage at a time: while a segment
+    object is created inside loop building, the clock runs for element decoding
+    only, and claims written by an `on_claim` handler are charged to
+    serializing, so the stages add up to the wall time of the conversion.
+
+    Without a `Stats` nothing is instrumented: the builder compiles timed
+    constructors into its grammar only when given one, so the untimed path is
+    the same code as before.
+
+    Attributes:
+        seconds (Dict[str, float]): The wall time of each of `STAGES`.
+        segments (Counter): The segments read, by identifier.
+        objects (Counter): The segment, loop and transaction set objects created, by class
+            (e.g. 'segments.claim.Claim').
+        unknown (Counter): The segments no open loop handles, by (loop name, identifier).
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self.segments: Counter = Counter()
+        self.objects: Counter = Counter()
+        self.unknown: Counter = Counter()
+        self._stage: Optional[str] = None
+        self._since = 0.0
+
+    def __repr__(self) -> str:
+        seconds = ', '.join(f'{stage}={seconds:.4f}s' for stage, seconds in self.seconds.items())
+        return f'{type(self).__name__}({seconds}, segments={sum(self.segments.values())})'
+
+    def switch(self, stage: Optional[str]) -> Optional[str]:
+        """Charges the time since the last switch to the current stage and starts timing `stage`.
+
+        Returns:
+            Optional[str]: The stage that was running, to switch back to.
+        """
+
+        now = time.perf_counter()
+        if self._stage is not None:
+            self.seconds[self._stage] += now - self._since
+        self._since = now
+        previous, self._stage = self._stage, stage
+        return previous
+
+    def stage(self, stage: str) -> '_Stage':
+        """Returns a context manager timing its block as `stage`, e.g. `with stats.stage(SERIALIZING):`."""
+        return _Stage(self, stage)
+
+    def count_segments(self, segments: Iterator[List[str]]) -> Iterator[List[str]]:
+        """Passes the segments through, counting them and timing the reads as tokenizing."""
+
+        segments = iter(segments)
+        counts = self.segments
+        switch = self.switch
+        while True:
+            previous = switch(TOKENIZING)
+            try:
+                segment = next(segments)
+            except StopIteration:
+                return
+            finally:
+                switch(previous)
+            counts[segment[0]] += 1
+            yield segment
+
+    def instrument(self, loops: Tuple[Loop, ...]) -> Tuple[Loop, ...]:
+        """Returns the loop grammar with every segment and loop class replaced by a timed, counted constructor."""
+
+        constructors: Dict[type, Callable] = {}
+
+        def route(route: Route) -> Route:
+            if route.segment is None:
+                return route
+            if route.segment not in constructors:
+                constructors[route.segment] = self._constructor(route.segment, ELEMENT_DECODING)
+            return route._replace(segment=constructors[route.segment])
+
+        def container(container: Optional[type]) -> Optional[type]:
+            if container is None:
+                return None
+            if container not in constructors:
+                constructors[container] = self._constructor(container, None)
+            return constructors[container]
+
+        return tuple(
+            loop._replace(
+                route=route(loop.route),
+                container=container(loop.container),
+                routes={identifier: route(value) for identifier, value in loop.routes.items()},
+            )
+            for loop in loops
+        )
+
+    def merge(self, other: 'Stats') -> 'Stats':
+        """Adds the measurements of another `Stats`, e.g. from a worker process, to these."""
+
+        for stage, seconds in other.seconds.items():
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.segments.update(other.segments)
+        self.objects.update(other.objects)
+        self.unknown.update(other.unknown)
+        return self
+
+    def to_prometheus(self, prefix: str = METRIC_PREFIX) -> str:
+        """Returns the measurements in the Prometheus text exposition format."""
+
+        lines: List[str] = []
+        _metric(
+            lines, f'{prefix}_stage_seconds_total', 'Wall time spent in each stage of the conversion.',
+            (({'stage': stage}, seconds) for stage, seconds in self.seconds.items()),
+        )
+        _metric(
+            lines, f'{prefix}_segments_total', 'Segments read, by identifier.',
+            (({'identifier': identifier}, count) for identifier, count in sorted(self.segments.items())),
+        )
+        _metric(
+            lines, f'{prefix}_objects_total', 'Segment, loop and transaction set objects created, by class.',
+            (({'class': name}, count) for name, count in sorted(self.objects.items())),
+        )
+        _metric(
+            lines, f'{prefix}_unknown_segments_total', 'Segments no open loop handles, by loop and identifier.',
+            (({'loop': loop, 'identifier': identifier}, count) for (loop, identifier), count in sorted(self.unknown.items())),
+        )
+        return '\n'.join(lines) + '\n'
+
+    def _constructor(self, cls: type, stage: Optional[str]) -> Callable:
+        name = f'{cls.__module__}.{cls.__qualname__}'
+        objects = self.objects
+        switch = self.switch
+
+        if stage is None:
+            def construct(*args):
+                objects[name] += 1
+                return cls(*args)
+            return construct
+
+        def construct(*args):
+            previous = switch(stage)
+            try:
+                return cls(*args)
+            finally:
+                switch(previous)
+                objects[name] += 1
+        return construct
+
+
+class _Stage:
+
+    __slots__ = ('stats', 'stage', 'previous')
+
+    def __init__(self, stats: Stats, stage: str):
+        self.stats = stats
+        self.stage = stage
+        self.previous = None
+
+    def __enter__(self):
+        self.previous = self.stats.switch(self.stage)
+
+    def __exit__(self, *exc_info):
+        self.stats.switch(self.previous)
+
+
+def _metric(lines: List[str], name: str, description: str, samples):
+    lines.append(f'# HELP {name} {description}')
+    lines.append(f'# TYPE {name} counter')
+    for labels, value in samples:
+        label_text = ','.join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        lines.append(f'{name}{{{label_text}}} {value!r}')
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+if __name__ == "__main__":
+    pass
@@ -1,114 +1,295 @@
+import io
 import json
-from typing import Dict, List
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, TextIO, Tuple, Union
 
-from segments.interchange import Interchange as InterchangeSegment
+from edi_to_json import CLAIM_RECORD, HEADER_RECORD, PROVIDER_ADJUSTMENT_RECORD
+from elements.organization import Organization
+from loop_grammar import CLAIM, LOOPS, PAYER, PROVIDER_ADJUSTMENT, TRANSACTION_SET, Loop, Route
+from segments.interchange import VERSIONS, Interchange as InterchangeSegment
 from segments.financial_information import FinancialInformation as FinancialInformationSegment
-from utilities import find_identifier
-from loops.organization import Organization as OrganizationLoop
-from loops.claim import Claim as ClaimLoop
-from loops.service import Service as ServiceLoop
-from loops.provider_adjustment import ProviderAdjustment as ProviderAdjustmentLoop
 from transaction_set_builder import TransactionSet
+from utilities import DEFAULT_DELIMITERS, Delimiters, join_segment
 
+# a segment or loop, as an object or as its `to_dict` output
+Node = Union[Any, Dict[str, Any]]
 
-def json_to_edi(json_data: str) -> str:
+
+def json_to_edi(json_data: str, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
     """Converts a JSON representation back to EDI 835 format.
 
     Args:
-        json_data (str): The JSON string representing an EDI 835 transaction set.
+        json_data (str): The JSON array of transaction sets written by `edi_to_json`, or a single
+            transaction set object (`transaction_set_to_json`).
+        delimiters (Delimiters): The separators and segment terminator to write with.
 
     Returns:
-        str: The EDI 835 representation of the JSON data.
+        str: The EDI 835 representation of the JSON data, with its GS, ST, SE, GE and IEA.
     """
 
     data = json.loads(json_data)
-    transaction_set = _build_transaction_set(data)
-
-    segments = []
-    segments.append(transaction_set.interchange.to_edi())
-    segments.append(transaction_set.financial_information.to_edi())
-
-    for organization in transaction_set.organizations:
-        segments.extend(organization.to_edi())
-
-    for claim in transaction_set.claims:
-        segments.append(claim.claim.to_edi())
-        segments.extend(entity.to_edi() for entity in claim.entities)
-
-        for reference in claim.references:
-            segments.append(reference.to_edi())
-
-        for date in claim.dates:
-            segments.append(date.to_edi())
-
-        if claim.amount:
-            segments.append(claim.amount.to_edi())
-
-        for service in claim.services:
-            segments.append(service.service.to_edi())
-            segments.extend(date.to_edi() for date in service.dates)
-            segments.extend(reference.to_edi() for reference in service.references)
-            segments.extend(remark.to_edi() for remark in service.remarks)
-
-            if service.amount:
-                segments.append(service.amount.to_edi())
-
-            segments.extend(adjustment.to_edi() for adjustment in service.adjustments)
-
-    # Add provider adjustments to EDI output
-    for provider_adjustment in transaction_set.provider_adjustments:
-        segments.extend(provider_adjustment.to_edi())
+    output = io.StringIO()
+    with EdiWriter(output, delimiters) as writer:
+        for transaction_set in data if isinstance(data, list) else [data]:
+            writer.write_transaction_set(transaction_set)
+    return output.getvalue()
 
-    segments.append('SE*')
-    segments.append('GE*')
-    segments.append('IEA*')
 
-    return '~'.join(segments)
+def ndjson_to_edi(input: TextIO, output: TextIO, delimiters: Delimiters = DEFAULT_DELIMITERS) -> int:
+    """Converts newline-delimited JSON, as written by `write_ndjson`, back to EDI as it reads.
 
+    Every header record starts a transaction set and the claim and provider
+    adjustment records after it are written into it, one record at a time, so
+    memory stays flat however many claims the file has.
 
+    Args:
+        input (TextIO): The file object the records are read from.
+        output (TextIO): The file object the EDI is written to.
+        delimiters (Delimiters): The separators and segment terminator to write with.
 
-def _build_transaction_set(data: Dict) -> TransactionSet:
-    """Builds a TransactionSet object from JSON data."""
-
-    interchange = InterchangeSegment.from_dict(data['interchange'])
-    financial_information = FinancialInformationSegment.from_dict(data['financial_information'])
-    claims = [_build_claim(claim_data) for claim_data in data['claims']]
-    organizations = [_build_organization(org_data) for org_data in data['organizations']]
-    return TransactionSet(interchange, financial_information, claims, organizations)
-
-
-def _build_claim(claim_data: Dict) -> ClaimLoop:
-    """Builds a ClaimLoop object from JSON data."""
-
-    claim = ClaimSegment.from_dict(claim_data['claim'])
-    entities = [EntitySegment.from_dict(entity_data) for entity_data in claim_data['entities']]
-    services = [_build_service(service_data) for service_data in claim_data['services']]
-    references = [ReferenceSegment.from_dict(reference_data) for reference_data in claim_data['references']]
-    dates = [DateSegment.from_dict(date_data) for date_data in claim_data['dates']]
-    amount = AmountSegment.from_dict(claim_data.get('amount'))
-    return ClaimLoop(claim, entities, services, references, dates, amount)
-
-
-def _build_service(service_data: Dict) -> ServiceLoop:
-    """Builds a ServiceLoop object from JSON data."""
-
-    service = ServiceSegment.from_dict(service_data['service'])
-    dates = [DateSegment.from_dict(date_data) for date_data in service_data['dates']]
-    references = [ReferenceSegment.from_dict(reference_data) for reference_data in service_data['references']]
-    remarks = [RemarkSegment.from_dict(remark_data) for remark_data in service_data['remarks']]
-    amount = AmountSegment.from_dict(service_data.get('amount'))
-    adjustments = [ServiceAdjustmentSegment.from_dict(adjustment_data)
-                    for adjustment_data in service_data['adjustments']]
-    return ServiceLoop(service, dates, references, remarks, amount, adjustments)
+    Returns:
+        int: The number of segments written.
+    """
 
+    with EdiWriter(output, delimiters) as writer:
+        for line in input:
+            if not line.strip():
+                continue
+
+            record = json.loads(line)
+            kind = record.get('record')
+            if kind == HEADER_RECORD:
+                writer.begin_transaction_set(record)
+            elif kind == CLAIM_RECORD:
+                writer.write_claim(record[CLAIM_RECORD])
+            elif kind == PROVIDER_ADJUSTMENT_RECORD:
+                writer.write_provider_adjustment(record[PROVIDER_ADJUSTMENT_RECORD])
+            else:
+                raise ValueError(f'Unknown record kind: {kind!r}.')
+
+    return writer.segments
+
+
+class _Layout(NamedTuple):
+    """The segments of a loop in the order they are written, and the loops nested in it."""
+    routes: Tuple[Route, ...]
+    children: Tuple[Loop, ...]
+
+
+class EdiWriter:
+    """Writes 835 transaction sets to a text stream a segment at a time.
+
+    Segments are written as soon as they are produced and only counted, so the
+    envelope is computed rather than copied: SE01 holds the segments from ST to
+    SE, GE01 the transaction sets of the functional group and IEA01 its
+    functional groups. Consecutive transaction sets of the same interchange (ISA
+    sender, receiver and control number) share one ISA/GS envelope; GS is
+    derived from the ISA.
+
+    The segments inside each loop are written in the order of the loop grammar.
+    Segments the JSON does not carry (e.g. TRN, and TS3 and the LX numbers of
+    the header number loops) are not written back; every transaction set gets a
+    single LX before its first claim.
+
+    Transaction sets, claims and provider adjustment loops can be given as
+    objects (e.g. from `TransactionSetBuilder`) or as their `to_dict` output.
+
+        with open('remittance.835', 'w') as output, EdiWriter(output) as writer:
+            writer.begin_transaction_set(header)
+            for claim in claims:
+                writer.write_claim(claim)
+    """
 
-def _build_organization(org_data: Dict) -> OrganizationLoop:
-    """Builds an OrganizationLoop object from JSON data."""
+    def __init__(self, output: TextIO, delimiters: Delimiters = DEFAULT_DELIMITERS, loops: Tuple[Loop, ...] = LOOPS):
+        """
+        Args:
+            output (TextIO): The file object the segments are written to.
+            delimiters (Delimiters): The separators and segment terminator to write with. Each
+                ISA keeps the version it was read with; one without a version gets 00501 if
+                the delimiters have a repetition separator and 00401 if not.
+            loops (Tuple[Loop, ...]): The loop grammar giving the segments of each loop.
+        """
+        self.output = output
+        self.delimiters = delimiters
+        self.segments = 0
+        self._layouts = _layouts(loops)
+
+        self._interchange_key = None
+        self._interchange_control_number = None
+        self._group_control_number = None
+        self._transaction_sets = 0
+        self._transaction_set_control_number = None
+        self._transaction_set_start = 0
+        self._header_number_open = False
+
+    def __enter__(self) -> 'EdiWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def write_transaction_set(self, transaction_set: Union[TransactionSet, Dict[str, Any]]):
+        """Writes a whole transaction set, opening its interchange if it is not the open one."""
+
+        self.begin_transaction_set(transaction_set)
+        for claim in _field(transaction_set, 'claims') or ():
+            self.write_claim(claim)
+        for provider_adjustment in _field(transaction_set, 'provider_adjustments') or ():
+            self.write_provider_adjustment(provider_adjustment)
+        self.end_transaction_set()
+
+    def begin_transaction_set(self, header: Node):
+        """Ends the open transaction set and writes the ST, BPR and payer and payee loops of the next one.
+
+        Args:
+            header (Node): A transaction set or a header record, i.e. anything with an
+                `interchange`, a `financial_information` and `organizations`.
+        """
+
+        interchange = _field(header, 'interchange')
+        if interchange is None:
+            raise ValueError('A transaction set cannot be written without its interchange (ISA).')
+        interchange = _segment(InterchangeSegment, interchange)
+
+        self.end_transaction_set()
+        key = (interchange.sender, interchange.receiver, interchange.interchange_control_number)
+        if key != self._interchange_key:
+            self._end_interchange()
+            self._begin_interchange(interchange, key)
+
+        self._transaction_sets += 1
+        self._transaction_set_control_number = f'{self._transaction_sets:04}'
+        self._transaction_set_start = self.segments
+        self._write_elements(['ST', TRANSACTION_SET, self._transaction_set_control_number])
+
+        financial_information = _field(header, 'financial_information')
+        if financial_information is not None:
+            self._write(_segment(FinancialInformationSegment, financial_information))
+        for organization in _field(header, 'organizations') or ():
+            self._write_loop(PAYER, organization)
+
+    def write_claim(self, claim: Node):
+        """Writes a claim loop and its service loops into the open transaction set."""
+
+        self._require_transaction_set()
+        if not self._header_number_open:
+            self._write_elements(['LX', '1'])
+            self._header_number_open = True
+        self._write_loop(CLAIM, claim)
+
+    def write_provider_adjustment(self, provider_adjustment: Node):
+        """Writes the PLB segments of a provider adjustment loop into the open transaction set."""
+
+        self._require_transaction_set()
+        self._write_loop(PROVIDER_ADJUSTMENT, provider_adjustment)
+
+    def end_transaction_set(self):
+        """Writes the SE of the open transaction set, if there is one."""
+
+        if self._transaction_set_control_number is None:
+            return
+        count = self.segments - self._transaction_set_start + 1
+        self._write_elements(['SE', str(count), self._transaction_set_control_number])
+        self._transaction_set_control_number = None
+        self._header_number_open = False
+
+    def close(self):
+        """Ends the open transaction set and interchange. The output is left open."""
+
+        self.end_transaction_set()
+        self._end_interchange()
+
+    def _begin_interchange(self, interchange: InterchangeSegment, key: tuple):
+        version = interchange.control_version(self.delimiters)
+        if version not in VERSIONS:
+            raise ValueError(f'No 835 implementation guide is known for ISA version {version!r}.')
+
+        self._write(interchange)
+        self._interchange_key = key
+        self._interchange_control_number = interchange.interchange_control_number.zfill(9)
+        self._group_control_number = interchange.interchange_control_number.lstrip('0') or '0'
+        self._transaction_sets = 0
+
+        date, time = _date_and_time(interchange.transmission_date)
+        self._write_elements([
+            'GS',
+            'HP',  # Functional Identifier Code, health care claim payment/advice
+            Organization.formatter(interchange.sender),
+            Organization.formatter(interchange.receiver),
+            date,
+            time,
+            self._group_control_number,
+            'X',  # Responsible Agency Code
+            VERSIONS[version],
+        ])
+
+    def _end_interchange(self):
+        if self._interchange_key is None:
+            return
+        self._write_elements(['GE', str(self._transaction_sets), self._group_control_number])
+        self._write_elements(['IEA', '1', self._interchange_control_number])
+        self._interchange_key = None
+
+    def _require_transaction_set(self):
+        if self._transaction_set_control_number is None:
+            raise ValueError('No transaction set is open; begin one with its header first.')
+
+    def _write_loop(self, name: str, node: Node):
+        layout = self._layouts[name]
+        for route in layout.routes:
+            value = _field(node, route.attribute)
+            if route.repeats:
+                for item in value or ():
+                    self._write(_segment(route.segment, item))
+            elif value is not None:
+                self._write(_segment(route.segment, value))
+
+        for child in layout.children:
+            for item in _field(node, child.attribute) or ():
+                self._write_loop(child.name, item)
+
+    def _write(self, segment):
+        self._write_text(segment.to_edi(self.delimiters))
+
+    def _write_elements(self, elements):
+        self._write_text(join_segment(elements, self.delimiters.element))
+
+    def _write_text(self, text: str):
+        self.output.write(text)
+        self.output.write(self.delimiters.segment)
+        self.segments += 1
+
+
+def _layouts(loops: Tuple[Loop, ...]) -> Dict[str, _Layout]:
+    layouts = {}
+    for loop in loops:
+        routes = {}
+        for route in (loop.route, *loop.routes.values()):
+            if route.segment is not None:
+                # the PLB loop routes its opening segment and the ones after it to the same list
+                routes.setdefault(route.attribute, route)
+
+        children = tuple(child for child in loops if child.parent == loop.name and child.container is not None)
+        layouts[loop.name] = _Layout(tuple(routes.values()), children)
+    return layouts
+
+
+def _field(node: Node, name: str) -> Any:
+    return node.get(name) if type(node) is dict else getattr(node, name, None)
+
+
+def _segment(cls: type, value: Node):
+    return cls.from_dict(value) if type(value) is dict else value
+
+
+def _date_and_time(value: Optional[Union[datetime, str]]) -> Tuple[str, str]:
+    """Returns GS04 and GS05 (CCYYMMDD, HHMM) from ISA09 and ISA10."""
+    if isinstance(value, datetime):
+        return value.strftime('%Y%m%d'), value.strftime('%H%M')
+    value = value or ''
+    return '20' + value[:6], value[6:10]
 
-    organization = OrganizationSegment.from_dict(org_data['organization'])
-    location = LocationSegment.from_dict(org_data.get('location'))
-    address = AddressSegment.from_dict(org_data.get('address'))
-    return OrganizationLoop(organization, location, address)
 
 if __name__ == "__main__":
-    pass 
\ No newline at end of file
+    pass
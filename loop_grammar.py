@@ -0,0 +1,235 @@
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from segments.interchange import Interchange as InterchangeSegment
+from segments.financial_information import FinancialInformation as FinancialInformationSegment
+from segments.organization import Organization as OrganizationSegment
+from segments.address import Address as AddressSegment
+from segments.location import Location as LocationSegment
+from segments.claim import Claim as ClaimSegment
+from segments.entity import Entity as EntitySegment
+from segments.reference import Reference as ReferenceSegment
+from segments.date import Date as DateSegment
+from segments.amount import Amount as AmountSegment
+from segments.service import Service as ServiceSegment
+from segments.service_adjustment import ServiceAdjustment as ServiceAdjustmentSegment
+from segments.remark import Remark as RemarkSegment
+from segments.provider_level_adjustment import ProviderLevelAdjustment as ProviderLevelAdjustmentSegment
+from loops.organization import Organization as OrganizationLoop
+from loops.claim import Claim as ClaimLoop
+from loops.service import Service as ServiceLoop
+from loops.provider_adjustment import ProviderAdjustment as ProviderAdjustmentLoop
+
+
+class Route(NamedTuple):
+    """Where a segment is stored in its loop.
+
+    Attributes:
+        segment (Optional[type]): The segments.* class to build, or None to skip the segment.
+        attribute (Optional[str]): The attribute of the loop object that receives the segment.
+        repeats (bool): True if the attribute is a list the segment is appended to.
+        composite (bool): True if the segment class needs the ISA16 component separator.
+        index (Optional[str]): The dictionary attribute of the loop object that also receives
+            repeating segments, keyed by the segment's `key` attribute.
+        key (Optional[str]): The segment attribute the index is keyed by (e.g. 'qualifier').
+    """
+    segment: Optional[type] = None
+    attribute: Optional[str] = None
+    repeats: bool = False
+    composite: bool = False
+    index: Optional[str] = None
+    key: Optional[str] = None
+
+
+SKIP = Route()
+
+
+class Loop(NamedTuple):
+    """A loop of the 835 grammar.
+
+    Attributes:
+        name (str): The implementation guide name of the loop (e.g., '2100').
+        description (str): Used in diagnostics (e.g., 'claim loop').
+        parent (Optional[str]): The name of the enclosing loop, None for the transaction set itself.
+        identifier (Optional[str]): The segment identifier that opens the loop.
+        qualifier (Optional[str]): The first element the opening segment must carry (e.g., 'PR' for N1).
+        route (Route): Where the opening segment is stored.
+        container (Optional[type]): The loops.* class created for each occurrence, or None to
+            store the loop's segments on the enclosing loop object.
+        attribute (Optional[str]): The list attribute of the enclosing loop object that receives the container.
+        routes (Dict[str, Route]): The other segments of the loop keyed by identifier.
+        strict (bool): Warn about segments the loop does not handle.
+    """
+    name: str
+    description: str
+    parent: Optional[str] = None
+    identifier: Optional[str] = None
+    qualifier: Optional[str] = None
+    route: Route = SKIP
+    container: Optional[type] = None
+    attribute: Optional[str] = None
+    routes: Dict[str, Route] = {}
+    strict: bool = False
+
+
+class Transition(NamedTuple):
+    """What to do when a segment is read in a given loop.
+
+    Attributes:
+        close (int): The number of open loops to close first.
+        loop (Optional[Loop]): The loop the segment opens, if any.
+        route (Route): Where the segment is stored.
+    """
+    close: int
+    loop: Optional[Loop]
+    route: Route
+
+
+TRANSACTION_SET = '835'
+PAYER = '1000A'
+PAYEE = '1000B'
+HEADER_NUMBER = '2000'
+CLAIM = '2100'
+SERVICE = '2110'
+PROVIDER_ADJUSTMENT = 'PLB'
+
+LOOPS = (
+    Loop(
+        TRANSACTION_SET, 'transaction set',
+        routes={
+            InterchangeSegment.identification: Route(InterchangeSegment, 'interchange'),
+            FinancialInformationSegment.identification: Route(FinancialInformationSegment, 'financial_information'),
+            **{identifier: SKIP for identifier in ('GS', 'ST', 'TRN', 'CUR', 'REF', 'DTM', 'SE', 'GE', 'IEA')},
+        },
+    ),
+    Loop(
+        PAYER, 'payer loop', parent=TRANSACTION_SET,
+        identifier=OrganizationSegment.identification, qualifier='PR',
+        route=Route(OrganizationSegment, 'organization'),
+        container=OrganizationLoop, attribute='organizations',
+        routes={
+            AddressSegment.identification: Route(AddressSegment, 'address'),
+            LocationSegment.identification: Route(LocationSegment, 'location'),
+            'REF': SKIP,
+            'PER': SKIP,
+        },
+    ),
+    Loop(
+        PAYEE, 'payee loop', parent=TRANSACTION_SET,
+        identifier=OrganizationSegment.identification, qualifier='PE',
+        route=Route(OrganizationSegment, 'organization'),
+        container=OrganizationLoop, attribute='organizations',
+        routes={
+            AddressSegment.identification: Route(AddressSegment, 'address'),
+            LocationSegment.identification: Route(LocationSegment, 'location'),
+            'REF': SKIP,
+            'RDM': SKIP,
+        },
+    ),
+    Loop(
+        HEADER_NUMBER, 'header number loop', parent=TRANSACTION_SET, identifier='LX',
+        routes={'TS3': SKIP, 'TS2': SKIP},
+    ),
+    Loop(
+        CLAIM, 'claim loop', parent=HEADER_NUMBER, identifier=ClaimSegment.identification,
+        route=Route(ClaimSegment, 'claim'),
+        container=ClaimLoop, attribute='claims',
+        routes={
+            ServiceAdjustmentSegment.identification: Route(ServiceAdjustmentSegment, 'adjustments', repeats=True),
+            EntitySegment.identification: Route(
+                EntitySegment, 'entities', repeats=True, index='entities_by_code', key='entity'
+            ),
+            ReferenceSegment.identification: Route(ReferenceSegment, 'references', repeats=True),
+            DateSegment.identification: Route(
+                DateSegment, 'dates', repeats=True, index='dates_by_qualifier', key='qualifier'
+            ),
+            AmountSegment.identification: Route(AmountSegment, 'amount'),
+        },
+        strict=True,
+    ),
+    Loop(
+        SERVICE, 'service loop', parent=CLAIM, identifier=ServiceSegment.identification,
+        route=Route(ServiceSegment, 'service', composite=True),
+        container=ServiceLoop, attribute='services',
+        routes={
+            DateSegment.identification: Route(
+                DateSegment, 'dates', repeats=True, index='dates_by_qualifier', key='qualifier'
+            ),
+            ServiceAdjustmentSegment.identification: Route(ServiceAdjustmentSegment, 'adjustments', repeats=True),
+            ReferenceSegment.identification: Route(ReferenceSegment, 'references', repeats=True),
+            AmountSegment.identification: Route(AmountSegment, 'amount'),
+            RemarkSegment.identification: Route(RemarkSegment, 'remarks', repeats=True),
+        },
+        strict=True,
+    ),
+    Loop(
+        PROVIDER_ADJUSTMENT, 'provider adjustment loop', parent=TRANSACTION_SET,
+        identifier=ProviderLevelAdjustmentSegment.identification,
+        route=Route(ProviderLevelAdjustmentSegment, 'adjustments', repeats=True, composite=True),
+        container=ProviderAdjustmentLoop, attribute='provider_adjustments',
+        routes={
+            ProviderLevelAdjustmentSegment.identification: Route(
+                ProviderLevelAdjustmentSegment, 'adjustments', repeats=True, composite=True
+            ),
+        },
+    ),
+)
+
+TransitionTable = Dict[str, Dict[str, Union[Transition, Dict[str, Transition]]]]
+
+
+def compile_grammar(loops: Tuple[Loop, ...] = LOOPS) -> Tuple[Loop, TransitionTable]:
+    """Compiles the loop grammar into a transition table.
+
+    For every loop, each segment identifier is resolved once, following the X12
+    rule that a segment belongs to the nearest loop that accepts it: first the
+    loop's own segments, then the loops it may open, then the same search in
+    each enclosing loop, closing the inner loops on the way out.
+
+    Args:
+        loops (Tuple[Loop, ...]): The loop grammar, enclosing loops first.
+
+    Returns:
+        Tuple[Loop, TransitionTable]: The outermost loop and the transitions keyed by loop
+        name and segment identifier. Identifiers whose loop depends on the qualifier
+        map to a dictionary of transitions keyed by the segment's first element.
+    """
+
+    by_name = {loop.name: loop for loop in loops}
+    children: Dict[str, List[Loop]] = defaultdict(list)
+    root = None
+    for loop in loops:
+        if loop.parent is None:
+            root = loop
+        else:
+            children[loop.parent].append(loop)
+
+    table: TransitionTable = {}
+    for loop in loops:
+        transitions = {}
+        close = 0
+        ancestor = loop
+
+        while ancestor is not None:
+            for identifier, route in ancestor.routes.items():
+                transitions.setdefault(identifier, Transition(close, None, route))
+
+            for child in children[ancestor.name]:
+                transition = Transition(close, child, child.route)
+                if child.qualifier is None:
+                    transitions.setdefault(child.identifier, transition)
+                else:
+                    qualified = transitions.setdefault(child.identifier, {})
+                    if isinstance(qualified, dict):
+                        qualified.setdefault(child.qualifier, transition)
+
+            ancestor = by_name.get(ancestor.parent)
+            close += 1
+
+        table[loop.name] = transitions
+
+    return root, table
+
+
+if __name__ == "__main__":
+    pass
@@ -1,21 +1,23 @@
-from typing import Iterator, Tuple, Optional, List
-from warnings import warn
+from typing import Optional, List
 
 from segments.claim import Claim as ClaimSegment
 from segments.entity import Entity as EntitySegment
 from segments.reference import Reference as ReferenceSegment
 from segments.date import Date as DateSegment
 from segments.amount import Amount as AmountSegment
-from utilities import find_identifier
+from segments.service_adjustment import ServiceAdjustment as ServiceAdjustmentSegment
 from loops.service import Service as ServiceLoop
+from serialization import Serializable
+from utilities import index_by
 
 
-class Claim:
-	initiating_identifier = ClaimSegment.identification
-	terminating_identifiers = [
-		ClaimSegment.identification,
-		'SE'
-	]
+class Claim(Serializable):
+	__slots__ = (
+		'claim', 'entities', 'services', 'references', 'dates', 'amount', 'adjustments',
+		'entities_by_code', 'dates_by_qualifier',
+	)
+	nested_fields = ('claim', 'amount')
+	repeating_fields = ('adjustments', 'entities', 'references', 'dates', 'services')
 
 	def __init__(
 			self,
@@ -25,6 +27,7 @@ class Claim:
 			references: List[ReferenceSegment] = None,
 			dates: List[DateSegment] = None,
 			amount: AmountSegment = None,
+			adjustments: List[ServiceAdjustmentSegment] = None,
 	):
 		self.claim = claim
 		self.entities = entities if entities else []
@@ -32,13 +35,18 @@ class Claim:
 		self.references = references if references else []
 		self.dates = dates if dates else []
 		self.amount = amount
+		self.adjustments = adjustments if adjustments else []
+
+		# the builder keeps these in step with `entities` and `dates`, rebuild them after editing those lists
+		self.entities_by_code = index_by(self.entities, 'entity')
+		self.dates_by_qualifier = index_by(self.dates, 'qualifier')
 
 	def __repr__(self):
-		return '\n'.join(str(item) for item in self.__dict__.items())
+		return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
 	@property
 	def rendering_provider(self) -> Optional[EntitySegment]:
-		rendering_provider = [e for e in self.entities if e.entity == 'rendering provider']
+		rendering_provider = self.entities_by_code.get('rendering provider', ())
 		assert len(rendering_provider) <= 1
 
 		if len(rendering_provider) == 1:
@@ -46,7 +54,7 @@ class Claim:
 
 	@property
 	def claim_statement_period_start(self) -> Optional[DateSegment]:
-		statement_period_start = [d for d in self.dates if d.qualifier == 'claim statement period start']
+		statement_period_start = self.dates_by_qualifier.get('claim statement period start', ())
 		assert len(statement_period_start) <= 1
 
 		if len(statement_period_start) == 1:
@@ -54,7 +62,7 @@ class Claim:
 
 	@property
 	def claim_statement_period_end(self) -> Optional[DateSegment]:
-		statement_period_end = [d for d in self.dates if d.qualifier == 'claim statement period end']
+		statement_period_end = self.dates_by_qualifier.get('claim statement period end', ())
 		assert len(statement_period_end) <= 1
 
 		if len(statement_period_end) == 1:
@@ -62,55 +70,7 @@ class Claim:
 
 	@property
 	def patient(self) -> EntitySegment:
-		patient = [e for e in self.entities if e.entity == 'patient']
+		patient = self.entities_by_code.get('patient', ())
 		assert len(patient) == 1
 
 		return patient[0]
-
-	@classmethod
-	def build(cls, segment: str, segments: Iterator[str]) -> Tuple['Claim', Optional[Iterator[str]], Optional[str]]:
-		claim = Claim()
-		claim.claim = ClaimSegment(segment)
-
-		segment = segments.__next__()
-		while True:
-			try:
-				if segment is None:
-					segment = segments.__next__()
-
-				identifier = find_identifier(segment)
-
-				if identifier == ServiceLoop.initiating_identifier:
-					service, segment, segments = ServiceLoop.build(segment, segments)
-					claim.services.append(service)
-
-				elif identifier == EntitySegment.identification:
-					entity = EntitySegment(segment)
-					claim.entities.append(entity)
-					segment = None
-
-				elif identifier == ReferenceSegment.identification:
-					reference = ReferenceSegment(segment)
-					claim.references.append(reference)
-					segment = None
-
-				elif identifier == DateSegment.identification:
-					date = DateSegment(segment)
-					claim.dates.append(date)
-					segment = None
-
-				elif identifier == AmountSegment.identification:
-					amount = AmountSegment(segment)
-					claim.amount = amount
-					segment = None
-
-				elif identifier in cls.terminating_identifiers:
-					return claim, segments, segment
-
-				else:
-					segment = None
-					message = f'Identifier: {identifier} not handled in claim loop.'
-					warn(message)
-
-			except StopIteration:
-				return claim, None, None
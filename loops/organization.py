@@ -1,19 +1,12 @@
-from typing import Iterator, Tuple, Optional
-
 from segments.organization import Organization as OrganizationSegment
-from segments.claim import Claim as ClaimSegment
 from segments.address import Address as AddressSegment
 from segments.location import Location as LocationSegment
-from utilities import find_identifier
+from serialization import Serializable
 
 
-class Organization:
-	initiating_identifier = OrganizationSegment.identification
-	terminating_identifiers = [
-		ClaimSegment.identification,
-		OrganizationSegment.identification,
-		'SE'
-	]
+class Organization(Serializable):
+	__slots__ = ('organization', 'location', 'address')
+	nested_fields = ('organization', 'address', 'location')
 
 	def __init__(self, organization: OrganizationSegment = None, location: LocationSegment = None,
 				 address: AddressSegment = None):
@@ -22,30 +15,7 @@ class Organization:
 		self.address = address
 
 	def __repr__(self):
-		return '\n'.join(str(item) for item in self.__dict__.items())
-
-	@classmethod
-	def build(cls, current_segment: str, segments: Iterator[str]) -> Tuple[
-		'OrganizationSegment', Optional[Iterator[str]], Optional[str]
-	]:
-		organization = Organization()
-		organization.organization = OrganizationSegment(current_segment)
-		while True:
-			try:
-				segment = segments.__next__()
-				identifier = find_identifier(segment)
-
-				if identifier == AddressSegment.identification:
-					organization.address = AddressSegment(segment)
-
-				elif identifier == LocationSegment.identification:
-					organization.location = LocationSegment(segment)
-
-				elif identifier in cls.terminating_identifiers:
-					return organization, segments, segment
-
-			except StopIteration:
-				return organization, None, None
+		return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
 
 if __name__ == '__main__':
@@ -1,50 +1,23 @@
-from typing import Tuple, Iterator, Optional, List
+from typing import List
 
 from segments.provider_level_adjustment import ProviderLevelAdjustment as PLBSegment
-from utilities import find_identifier
+from serialization import Serializable
+from utilities import DEFAULT_DELIMITERS, Delimiters
 
-class ProviderAdjustment:
+class ProviderAdjustment(Serializable):
     """Represents a provider adjustment loop in the EDI 835."""
-    initiating_identifier = PLBSegment.identification
-    terminating_identifiers = ['PLB', 'SE'] # Adjust terminating identifiers as needed
+    __slots__ = ('adjustments',)
+    repeating_fields = ('adjustments',)
 
     def __init__(self, adjustments: List[PLBSegment] = None):
         self.adjustments = adjustments if adjustments else []
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    @classmethod
-    def build(cls, segment: dict, segments: Iterator[List[dict]]) -> Tuple['ProviderAdjustment', Optional[Iterator[List[dict]]], Optional[dict]]:
-        """Builds the provider adjustment loop from the segments.
-
-        Args:
-            segment (dict): The current parsed segment.
-            segments (Iterator[List[dict]]): Iterator over remaining segments.
-
-        Returns:
-            Tuple[ProviderAdjustment, Optional[Iterator[List[dict]]], Optional[dict]]: A tuple containing the built ProviderAdjustment object, the updated segments iterator, and the next segment.
-        """
-        adjustment = ProviderAdjustment()
-        adjustment.adjustments.append(PLBSegment(segment[PLBSegment.identification][0]))
-
-        while True:
-            try:
-                segment = segments.__next__()
-                identifier = find_identifier(segment)
-
-                if identifier == PLBSegment.identification:  
-                    adjustment.adjustments.append(PLBSegment(segment[PLBSegment.identification][0]))
-                
-                elif identifier in cls.terminating_identifiers:
-                    return adjustment, segments, segment
-
-            except StopIteration:
-                return adjustment, None, None
-    
-    def to_edi(self) -> List[str]:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> List[str]:
         """Converts the provider adjustment loop back to EDI format."""
-        return [adjustment.to_edi() for adjustment in self.adjustments]
+        return [adjustment.to_edi(delimiters) for adjustment in self.adjustments]
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
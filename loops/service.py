@@ -1,24 +1,20 @@
-from typing import Tuple, Iterator, Optional, List
-from warnings import warn
+from typing import Optional, List
 
 from segments.service import Service as ServiceSegment
-from segments.claim import Claim as ClaimSegment
 from segments.date import Date as DateSegment
 from segments.reference import Reference as ReferenceSegment
 from segments.amount import Amount as AmountSegment
 from segments.service_adjustment import ServiceAdjustment as ServiceAdjustmentSegment
 from segments.remark import Remark as RemarkSegment
-from utilities import find_identifier
 from elements.dollars import Dollars
+from serialization import Serializable
+from utilities import index_by
 
 
-class Service:
-	initiating_identifier = ServiceSegment.identification
-	terminating_identifiers = [
-		ServiceSegment.identification,
-		ClaimSegment.identification,
-		'SE'
-	]
+class Service(Serializable):
+	__slots__ = ('service', 'dates', 'references', 'remarks', 'amount', 'adjustments', 'dates_by_qualifier')
+	nested_fields = ('service', 'amount')
+	repeating_fields = ('dates', 'adjustments', 'references', 'remarks')
 
 	def __init__(
 			self,
@@ -36,8 +32,11 @@ class Service:
 		self.amount = amount
 		self.adjustments = adjustments if adjustments else []
 
+		# the builder keeps this in step with `dates`, rebuild it after editing that list
+		self.dates_by_qualifier = index_by(self.dates, 'qualifier')
+
 	def __repr__(self):
-		return '\n'.join(str(item) for item in self.__dict__.items())
+		return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
 	@property
 	def allowed_amount(self) -> Optional[Dollars]:
@@ -47,7 +46,7 @@ class Service:
 
 	@property
 	def service_date(self) -> Optional[DateSegment]:
-		service_date = [d for d in self.dates if d.qualifier == 'service']
+		service_date = self.dates_by_qualifier.get('service', ())
 		assert len(service_date) <= 1, f'{self.dates}'
 
 		if len(service_date) == 1:
@@ -55,7 +54,7 @@ class Service:
 
 	@property
 	def service_period_start(self) -> Optional[DateSegment]:
-		service_period_start = [d for d in self.dates if d.qualifier == 'service period start']
+		service_period_start = self.dates_by_qualifier.get('service period start', ())
 		assert len(service_period_start) <= 1, f'{self.dates}'
 
 		if len(service_period_start) == 1:
@@ -65,7 +64,7 @@ class Service:
 
 	@property
 	def service_period_end(self) -> Optional[DateSegment]:
-		service_period_end = [d for d in self.dates if d.qualifier == 'service period end']
+		service_period_end = self.dates_by_qualifier.get('service period end', ())
 		assert len(service_period_end) <= 1
 
 		if len(service_period_end) == 1:
@@ -73,44 +72,6 @@ class Service:
 		else:
 			return self.service_date
 
-	@classmethod
-	def build(cls, segment: str, segments: Iterator[str]) -> Tuple['Service', Optional[str], Optional[Iterator[str]]]:
-		service = Service()
-		service.service = ServiceSegment(segment)
-
-		while True:
-			try:
-				segment = segments.__next__()
-				identifier = find_identifier(segment)
-
-				if identifier == DateSegment.identification:
-					date = DateSegment(segment)
-					service.dates.append(date)
-
-				elif identifier == AmountSegment.identification:
-					service.amount = AmountSegment(segment)
-
-				elif identifier == RemarkSegment.identification:
-					remark = RemarkSegment(segment)
-					service.remarks.append(remark)
-
-				elif identifier == ReferenceSegment.identification:
-					reference = ReferenceSegment(segment)
-					service.references.append(reference)
-
-				elif identifier == ServiceAdjustmentSegment.identification:
-					service.adjustments.append(ServiceAdjustmentSegment(segment))
-
-				elif identifier in cls.terminating_identifiers:
-					return service, segment, segments
-
-				else:
-					message = f'Identifier: {identifier} not handled in service loop.'
-					warn(message)
-
-			except StopIteration:
-				return service, None, None
-
 
 if __name__ == '__main__':
 	pass
@@ -0,0 +1,205 @@
+import codecs
+import mmap
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from segment_reader import _LEADING_NOISE, _LINE_BREAKS, _TRAILER_IDENTIFIER, _read_header
+from utilities import Delimiters
+
+# bytes.decode() defaults to UTF-8 and is faster called without arguments
+ENCODING = 'utf-8'
+
+# anything with find and slicing; memoryview has no find
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+_BYTE_ORDER_MARK = b'\xef\xbb\xbf'
+# enough for any ISA, which is 106 characters plus whatever line breaks wrap it
+_HEADER_PROBE = 4096
+_LINE_BREAK_BYTES = _LINE_BREAKS.encode()
+_TRAILER = _TRAILER_IDENTIFIER.encode()
+
+# identifiers repeat on every segment, so the ones an 835 uses are decoded once; a fixed table,
+# so that a malformed file cannot grow it, and anything else is decoded where it is read
+_IDENTIFIERS: Dict[bytes, str] = {
+    identifier.encode(): identifier
+    for identifier in (
+        'ISA', 'GS', 'ST', 'BPR', 'TRN', 'CUR', 'REF', 'DTM', 'N1', 'N2', 'N3', 'N4', 'PER', 'RDM', 'LX',
+        'TS3', 'TS2', 'CLP', 'CAS', 'NM1', 'MIA', 'MOA', 'AMT', 'QTY', 'SVC', 'LQ', 'PLB', 'SE', 'GE', 'IEA',
+    )
+}
+
+
+class SegmentView(Sequence[str]):
+    """A segment of an EDI buffer, held as its offsets in the buffer.
+
+    Nothing is copied or decoded when the view is created. The identifier is
+    decoded once per 835 segment identifier and shared, so routing a segment by
+    identifier, or skipping it, never copies it. The first read of another
+    element splits the segment's bytes on the element separator, and each
+    element is decoded to `str` only when it is read. `number` reads an element
+    straight from its bytes as an int or float.
+
+    A view reads like the token list of `segment_reader.read_tokens`, so the
+    builder and the segment classes accept either. It keeps its buffer alive and
+    is only readable while the buffer is open; `list(view)` copies it out.
+    Pickling a view sends its token list.
+    """
+
+    __slots__ = ('buffer', 'start', 'end', 'separator', '_elements')
+
+    def __init__(self, buffer: Buffer, start: int, end: int, separator: bytes):
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.separator = separator
+        self._elements: Optional[List[bytes]] = None
+
+    def __len__(self) -> int:
+        elements = self._elements
+        if elements is None:
+            elements = self._split()
+        return len(elements)
+
+    def __getitem__(self, index):
+        elements = self._elements
+        if elements is None:
+            if index == 0:
+                buffer = self.buffer
+                end = buffer.find(self.separator, self.start, self.end)
+                raw = buffer[self.start:self.end if end == -1 else end]
+                identifier = _IDENTIFIERS.get(raw)
+                return raw.decode() if identifier is None else identifier
+            elements = self._split()
+
+        if type(index) is slice:
+            return [element.decode() for element in elements[index]]
+        return elements[index].decode()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (SegmentView, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)!r})'
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+    @property
+    def identifier(self) -> str:
+        return self[0]
+
+    def raw(self, index: int) -> bytes:
+        """Returns an element's bytes without decoding them."""
+        return (self._elements or self._split())[index]
+
+    def number(self, index: int, default=None) -> Union[int, float, None]:
+        """Reads an element as an int, or a float if it has a decimal point, without decoding it to `str`.
+
+        Returns `default` if the element is missing or empty.
+        """
+
+        elements = self._elements or self._split()
+        raw = elements[index] if index < len(elements) else None
+        if not raw:
+            return default
+        return float(raw) if b'.' in raw else int(raw)
+
+    def _split(self) -> List[bytes]:
+        # one split in C beats finding each separator's offset from Python several times over
+        elements = self._elements = self.buffer[self.start:self.end].split(self.separator)
+        return elements
+
+
+def read_views(buffer: Buffer) -> Iterator[Union[List[str], SegmentView]]:
+    """Lazily splits an EDI buffer into segment views, one segment at a time.
+
+    Each interchange's ISA header declares the delimiters of the segments that
+    follow it, as in `segment_reader`. The ISA itself is yielded as a token
+    list, as it may be wrapped across lines; every other segment is a
+    `SegmentView` over the buffer.
+
+    Args:
+        buffer (Buffer): The EDI 835 data, e.g. a memory-mapped file (see `map_views`).
+
+    Yields:
+        Union[List[str], SegmentView]: The segments, readable like token lists.
+    """
+
+    size = len(buffer)
+    position = len(_BYTE_ORDER_MARK) if buffer[:len(_BYTE_ORDER_MARK)] == _BYTE_ORDER_MARK else 0
+    separator = terminator = None
+    find = buffer.find
+
+    while position < size:
+        if terminator is None:
+            header = read_header(buffer, position)
+            if header is None:
+                return
+
+            segment, delimiters, _, position = header
+            separator = delimiters.element.encode()
+            terminator = delimiters.segment.encode()
+            yield segment.split(delimiters.element)
+            continue
+
+        end = find(terminator, position)
+        if end == -1:
+            end = size
+
+        start = position
+        position = end + 1
+        if start == end:
+            continue
+
+        if buffer[start] in _LINE_BREAK_BYTES or buffer[end - 1] in _LINE_BREAK_BYTES:
+            while start < end and buffer[start] in _LINE_BREAK_BYTES:
+                start += 1
+            while end > start and buffer[end - 1] in _LINE_BREAK_BYTES:
+                end -= 1
+            if start == end:
+                continue
+
+        if buffer[start] == _TRAILER[0] and buffer[start:start + len(_TRAILER)] == _TRAILER:
+            terminator = None
+        yield SegmentView(buffer, start, end, separator)
+
+
+def read_header(buffer: Buffer, position: int) -> Optional[Tuple[str, Delimiters, int, int]]:
+    """Reads the ISA segment starting at (or after whitespace following) a byte position.
+
+    Returns:
+        Optional[Tuple[str, Delimiters, int, int]]: The ISA segment, its delimiters and the byte
+        offsets where it starts and where the next segment starts, or None if only whitespace is left.
+    """
+
+    # the probe may end inside a multibyte character, which the incremental decoder leaves out
+    probe = codecs.getincrementaldecoder(ENCODING)().decode(buffer[position:position + _HEADER_PROBE])
+    header = _read_header(probe, eof=True)
+    if header is None:
+        return None
+
+    segment, delimiters, consumed = header
+    start = position + len(probe) - len(probe.lstrip(_LEADING_NOISE))
+    end = position + len(probe[:consumed].encode(ENCODING))
+    return segment, delimiters, start, end
+
+
+@contextmanager
+def map_views(edi_file_path: str) -> Iterator[Iterator[Union[List[str], SegmentView]]]:
+    """Memory-maps a file and yields `read_views` over it; the map is closed when the block exits.
+
+    Copy out anything that has to outlive the block (e.g. build with
+    `TransactionSetBuilder(keep_segments=False)`, or `list(view)`).
+    """
+
+    with open(edi_file_path, 'rb') as f:
+        if not f.seek(0, 2):
+            raise ValueError('EDI data does not start with an ISA segment.')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield read_views(buffer)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,100 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterator, List, Optional
+
+from elements import is_lazy, lazy_decoding
+from elements.dollars import is_in_cents, money_in_cents
+from segment_reader import read_transaction_sets
+from transaction_set_builder import TransactionSet, TransactionSetBuilder
+
+# transaction sets are sent to the workers in batches of about this many segments,
+# so files made of many small transaction sets do not pay one round trip per set
+BATCH_SEGMENTS = 20_000
+
+
+def build_transaction_sets(
+        edi_file_path: str,
+        max_workers: Optional[int] = None,
+        keep_segments: bool = True,
+        transform: Optional[Callable[[TransactionSet], Any]] = None,
+) -> List[Any]:
+    """Builds every ST/SE transaction set of an EDI 835 file on a pool of worker processes.
+
+    The file is split at its envelope boundaries while it is streamed, and at most
+    two batches per worker are in flight, so memory stays bounded by the batch
+    size rather than the file size. Workers build in the decoding and money
+    modes of the caller, e.g. lazily inside `elements.lazy_decoding`.
+
+    Sending built transaction sets back to the parent process means pickling
+    every segment object, which can cost more than building them. When only a
+    derived result is needed (JSON, totals, ...), pass a `transform` so it is
+    computed in the worker and only that result is sent back.
+
+    Args:
+        edi_file_path (str): The path to the EDI 835 file.
+        max_workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+        keep_segments (bool): Keep each segment's tokens, see `TransactionSetBuilder`.
+        transform (Optional[Callable[[TransactionSet], Any]]): A picklable function applied to
+            each transaction set in the worker.
+
+    Returns:
+        List[Any]: The transaction sets, or their transforms, in file order.
+    """
+
+    max_workers = max_workers or os.cpu_count() or 1
+    build = partial(
+        _build_batch, keep_segments=keep_segments, transform=transform, lazy=is_lazy(), cents=is_in_cents()
+    )
+    transaction_sets = []
+
+    with open(edi_file_path, 'r') as f, ProcessPoolExecutor(max_workers) as executor:
+        pending = deque()
+
+        for batch in _batches(read_transaction_sets(f)):
+            pending.append(executor.submit(build, batch))
+            if len(pending) >= 2 * max_workers:
+                transaction_sets.extend(pending.popleft().result())
+
+        while pending:
+            transaction_sets.extend(pending.popleft().result())
+
+    return transaction_sets
+
+
+def _batches(transaction_sets: Iterator[List[List[str]]]) -> Iterator[List[List[List[str]]]]:
+    batch = []
+    size = 0
+
+    for segments in transaction_sets:
+        batch.append(segments)
+        size += len(segments)
+
+        if size >= BATCH_SEGMENTS:
+            yield batch
+            batch = []
+            size = 0
+
+    if batch:
+        yield batch
+
+
+def _build_batch(
+        batch: List[List[List[str]]],
+        keep_segments: bool,
+        transform: Optional[Callable[[TransactionSet], Any]],
+        lazy: bool = False,
+        cents: bool = False,
+) -> List[Any]:
+    builder = TransactionSetBuilder(keep_segments=keep_segments)
+    with lazy_decoding(lazy), money_in_cents(cents):
+        transaction_sets = [builder.build(segments) for segments in batch]
+
+    if transform is not None:
+        return [transform(transaction_set) for transaction_set in transaction_sets]
+    return transaction_sets
+
+
+if __name__ == "__main__":
+    pass
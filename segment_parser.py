@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Union
 
 
 from utilities import split_segment
@@ -9,20 +9,24 @@ class SegmentParser:
     def __init__(self, segment_delimiter: str = "*"):
         self.segment_delimiter = segment_delimiter
 
-    def parse(self, segment: str) -> Dict:
+    def parse(self, segment: Union[str, List[str]]) -> Dict:
         """Parses a single EDI segment.
-        
+
+        Segments already tokenized by `segment_reader.read_tokens` are used as
+        they are, so each segment is only ever split once.
+
         Args:
-            segment (str): The EDI segment string (e.g., 'CLP*CLAIM123*1*125.00').
+            segment (Union[str, List[str]]): The EDI segment string (e.g., 'CLP*CLAIM123*1*125.00')
+                or its list of elements.
 
         Returns:
             Dict: A dictionary representing the parsed segment with the segment 
-                  identifier as the key and a list of data elements as the value.
+                  identifier as the key and the list of elements, identifier
+                  included, as the value.
         """
-        parts = split_segment(segment, self.segment_delimiter)
-        segment_id = parts[0]
-        elements = parts[1:]
-        return {segment_id: elements}
+        if isinstance(segment, str):
+            segment = split_segment(segment, self.segment_delimiter)
+        return {segment[0]: segment}
 
 if __name__ == "__main__":
-    pass 
\ No newline at end of file
+    pass 
@@ -0,0 +1,195 @@
+from typing import Iterator, List, Optional, TextIO, Tuple, Union
+
+from utilities import Delimiters
+
+BLOCK_SIZE = 64 * 1024
+
+_HEADER_IDENTIFIER = 'ISA'
+_HEADER_ELEMENT_COUNT = 16
+_REPETITION_SEPARATOR_VERSION = 501
+_TRAILER_IDENTIFIER = 'IEA'
+_GROUP_IDENTIFIER = 'GS'
+_ENVELOPE_IDENTIFIERS = (_HEADER_IDENTIFIER, _GROUP_IDENTIFIER)
+_TRANSACTION_SET_IDENTIFIER = 'ST'
+_TRANSACTION_SET_TRAILER_IDENTIFIER = 'SE'
+_LINE_BREAKS = '\r\n'
+_LEADING_NOISE = '\ufeff \t\r\n'
+
+
+def read_segments(edi_file: TextIO, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """Lazily reads EDI segments from a file object, one segment at a time.
+
+    The file is consumed in blocks of `block_size` characters so memory stays
+    flat regardless of the file size. Segments spanning two blocks are carried
+    over to the next block. The segment terminator is taken from the ISA header
+    of each interchange, and line breaks following a terminator (or used as
+    the terminator, as in `EDI835BIG.txt`) are discarded.
+
+    Args:
+        edi_file (TextIO): An open EDI 835 file.
+        block_size (int): The number of characters to read per block.
+
+    Yields:
+        str: The EDI segments without their terminator (e.g., 'CLP*CLAIM123*1*125.00').
+    """
+
+    return _read(edi_file, block_size, tokenize=False)
+
+
+def read_tokens(edi_file: TextIO, block_size: int = BLOCK_SIZE) -> Iterator[List[str]]:
+    """Lazily reads EDI segments from a file object and splits each into its elements.
+
+    Works like `read_segments`, but every segment is split exactly once on the
+    element separator declared by its interchange's ISA header.
+
+    Args:
+        edi_file (TextIO): An open EDI 835 file.
+        block_size (int): The number of characters to read per block.
+
+    Yields:
+        List[str]: The elements of each segment, identifier first (e.g., ['CLP', 'CLAIM123', '1', '125.00']).
+    """
+
+    return _read(edi_file, block_size, tokenize=True)
+
+
+def read_transaction_sets(edi_file: TextIO, block_size: int = BLOCK_SIZE) -> Iterator[List[List[str]]]:
+    """Splits an EDI file at its envelope boundaries, one ST/SE transaction set at a time.
+
+    Each transaction set is preceded by the ISA and GS segments of the envelope it
+    was sent in, so it can be built on its own. Segments outside an ST/SE pair
+    (GE, IEA) are dropped.
+
+    Args:
+        edi_file (TextIO): An open EDI 835 file.
+        block_size (int): The number of characters to read per block.
+
+    Yields:
+        List[List[str]]: The tokens of the ISA, GS and ST through SE segments.
+    """
+
+    envelope = {}
+    transaction_set = None
+
+    for segment in read_tokens(edi_file, block_size):
+        identifier = segment[0]
+
+        if identifier in _ENVELOPE_IDENTIFIERS:
+            envelope[identifier] = segment
+            if identifier == _HEADER_IDENTIFIER:
+                envelope.pop(_GROUP_IDENTIFIER, None)
+
+        elif identifier == _TRANSACTION_SET_IDENTIFIER:
+            transaction_set = [*envelope.values(), segment]
+
+        elif transaction_set is not None:
+            transaction_set.append(segment)
+
+            if identifier == _TRANSACTION_SET_TRAILER_IDENTIFIER:
+                yield transaction_set
+                transaction_set = None
+
+    if transaction_set is not None:
+        yield transaction_set
+
+
+def _read(edi_file: TextIO, block_size: int, tokenize: bool) -> Iterator[Union[str, List[str]]]:
+    buffer = ''
+    delimiters = None
+    eof = False
+
+    while not eof:
+        block = edi_file.read(block_size)
+        eof = block == ''
+        buffer += block
+        start = 0
+
+        while True:
+            if delimiters is None:
+                header = _read_header(buffer[start:], eof)
+                if header is None:
+                    break
+
+                segment, delimiters, consumed = header
+                start += consumed
+                yield segment.split(delimiters.element) if tokenize else segment
+                continue
+
+            end = buffer.find(delimiters.segment, start)
+            if end == -1:
+                break
+
+            segment = buffer[start:end].strip(_LINE_BREAKS)
+            start = end + 1
+
+            if segment:
+                separator = delimiters.element
+                if segment.startswith(_TRAILER_IDENTIFIER):
+                    delimiters = None
+
+                yield segment.split(separator) if tokenize else segment
+
+        buffer = buffer[start:]
+
+    segment = buffer.strip(_LINE_BREAKS)
+    if segment:
+        yield segment.split(delimiters.element) if tokenize and delimiters else segment
+
+
+def _read_header(buffer: str, eof: bool) -> Optional[Tuple[str, Delimiters, int]]:
+    """Reads the ISA segment at the start of the buffer and the delimiters it declares.
+
+    The ISA always has 16 elements and the segment terminator is the character
+    directly after the component element separator (ISA16). Counting element
+    separators, rather than relying on the fixed ISA width, also handles
+    headers that were padded inconsistently or wrapped across lines.
+
+    Returns:
+        Optional[Tuple[str, Delimiters, int]]: The ISA segment, its delimiters and the
+        number of characters consumed, or None if more data is needed.
+    """
+
+    stripped = buffer.lstrip(_LEADING_NOISE)
+    offset = len(buffer) - len(stripped)
+
+    if len(stripped) < len(_HEADER_IDENTIFIER) + 1:
+        if eof and stripped:
+            raise ValueError('EDI data does not start with an ISA segment.')
+        return None
+
+    if not stripped.startswith(_HEADER_IDENTIFIER):
+        raise ValueError('EDI data does not start with an ISA segment.')
+
+    element_separator = stripped[len(_HEADER_IDENTIFIER)]
+    position = 0
+    for _ in range(_HEADER_ELEMENT_COUNT):
+        position = stripped.find(element_separator, position + 1)
+        if position == -1:
+            break
+
+    # the component element separator and segment terminator follow the last element separator
+    if position == -1 or position + 2 >= len(stripped):
+        if eof:
+            raise ValueError('EDI data ends inside the ISA segment.')
+        return None
+
+    segment = ''.join(stripped[:position + 2].splitlines())
+    elements = segment.split(element_separator)
+
+    # ISA11 only became the repetition separator in version 5010; before it was a standards identifier
+    repetition_separator = None
+    version = elements[12].strip()
+    if version.isdigit() and int(version) >= _REPETITION_SEPARATOR_VERSION:
+        repetition_separator = elements[11]
+
+    delimiters = Delimiters(
+        element=element_separator,
+        component=stripped[position + 1],
+        repetition=repetition_separator,
+        segment=stripped[position + 2],
+    )
+    return segment, delimiters, offset + position + 3
+
+
+if __name__ == "__main__":
+    pass
@@ -1,39 +1,41 @@
 from typing import List
 
 from elements.identifier import Identifier
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class Address:
+class Address(Serializable):
     """Represents the N3 segment (Address Information) in the EDI 835."""
     identification = 'N3'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        'address',
+    )
+    fields = (
+        'address',
+    )
 
     identifier = Identifier()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.address = get_element(segment, 1) 
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the N3 segment back to its EDI representation."""
         elements = [
             self.identifier,
             self.address,
-            # Add any other missing elements as needed 
         ]
-        return '*'.join(elements)
+        return join_segment(elements, delimiters.element)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.address = data.get('address')
-        return segment
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
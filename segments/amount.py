@@ -3,43 +3,49 @@ from typing import List
 from elements.identifier import Identifier
 from elements.dollars import Dollars
 from elements.amount_qualifier import AmountQualifier
-from utilities import split_segment
+from utilities import DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class Amount:
+class Amount(Serializable):
     """Represents the AMT segment (Monetary Amount Information) in the EDI 835."""
     identification = 'AMT'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        '_qualifier',
+        '_qualifier_raw',
+        '_amount',
+        '_amount_raw',
+    )
+    fields = (
+        'qualifier',
+        'amount',
+    )
 
     identifier = Identifier()
     qualifier = AmountQualifier()
     amount = Dollars()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.qualifier = segment[1]
         self.amount = segment[2] 
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the AMT segment back to its EDI representation."""
         elements = [
             self.identifier,
-            self.qualifier, 
-            self.amount,
+            AmountQualifier.formatter(self.qualifier),
+            Dollars.formatter(self.amount),
         ]
-        return '*'.join(str(element) for element in elements)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.qualifier = data.get('qualifier')
-        segment.amount = data.get('amount')
-        return segment
+        return join_segment(elements, delimiters.element)
+
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -4,12 +4,38 @@ from elements.identifier import Identifier
 from elements.claim_status import ClaimStatus
 from elements.dollars import Dollars
 from elements.claim_type import ClaimType
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class Claim:
+class Claim(Serializable):
     """Represents the CLP segment (Claim Payment Information) in the EDI 835."""
     identification = 'CLP'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        'marker',
+        '_status',
+        '_status_raw',
+        '_charge_amount',
+        '_charge_amount_raw',
+        '_paid_amount',
+        '_paid_amount_raw',
+        '_patient_responsibility_amount',
+        '_patient_responsibility_amount_raw',
+        '_claim_type',
+        '_claim_type_raw',
+        'icn',
+    )
+    fields = (
+        'marker',
+        'status',
+        'charge_amount',
+        'paid_amount',
+        'patient_responsibility_amount',
+        'claim_type',
+        'icn',
+    )
 
     identifier = Identifier()
     status = ClaimStatus()
@@ -18,9 +44,8 @@ class Claim:
     patient_responsibility_amount = Dollars()
     claim_type = ClaimType()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.marker = get_element(segment, 1)
@@ -32,35 +57,22 @@ class Claim:
         self.icn = get_element(segment, 7)
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the CLP segment back to its EDI representation."""
         elements = [
             self.identifier,
             self.marker,
-            self.status.code,  # Access the status code from the Status object
-            self.charge_amount,
-            self.paid_amount,
-            self.patient_responsibility_amount,
-            self.claim_type,
+            ClaimStatus.formatter(self.status),
+            Dollars.formatter(self.charge_amount),
+            Dollars.formatter(self.paid_amount),
+            Dollars.formatter(self.patient_responsibility_amount),
+            ClaimType.formatter(self.claim_type),
             self.icn,
-            # Add any other missing elements as empty strings
-            *['' for _ in range(4)],  # Adjust the range as needed
         ]
-        return '*'.join(str(element) for element in elements)
+        return join_segment(elements, delimiters.element)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.marker = data.get('marker')
-        segment.status = ClaimStatus().parser(data.get('status', {}).get('code'))
-        segment.charge_amount = data.get('charge_amount')
-        segment.paid_amount = data.get('paid_amount')
-        segment.patient_responsibility_amount = data.get('patient_responsibility_amount')
-        segment.claim_type = data.get('claim_type')
-        segment.icn = data.get('icn')
-        return segment
 
 
 if __name__ == "__main__":
@@ -3,41 +3,48 @@ from typing import List
 from elements.identifier import Identifier
 from elements.date import Date as DateElement
 from elements.date_qualifier import DateQualifier
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
 
 
 class Date:
     """Represents the DTM segment (Date/Time Reference) in the EDI 835."""
 
     identification = 'DTM'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        '_qualifier',
+        '_qualifier_raw',
+        '_date',
+        '_date_raw',
+    )
 
     identifier = Identifier()
     qualifier = DateQualifier()
     date = DateElement()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.qualifier = segment[1]
         self.date = segment[2]
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the DTM segment back to its EDI representation."""
         elements = [
             self.identifier,
-            self.qualifier,
-            self.date,
+            DateQualifier.formatter(self.qualifier),
+            DateElement.formatter(self.date),
         ]
-        return '*'.join(str(element) for element in elements)
+        return join_segment(elements, delimiters.element)
 
     @classmethod
     def from_dict(cls, data: dict):
-        segment = cls('')
+        segment = cls([cls.identification])
         segment.qualifier = data.get('qualifier')
         segment.date = data.get('date')
         return segment
@@ -4,21 +4,48 @@ from elements.identifier import Identifier
 from elements.entity_code import EntityCode
 from elements.entity_type import EntityType
 from elements.identification_code_qualifier import IdentificationCodeQualifier
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class Entity:
+class Entity(Serializable):
     """Represents the NM1 segment (entity name and identification) in the EDI 835."""
     identification = 'NM1'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        '_entity',
+        '_entity_raw',
+        '_type',
+        '_type_raw',
+        'last_name',
+        'first_name',
+        'middle_name',
+        'name_prefix',
+        'name_suffix',
+        '_identification_code_qualifier',
+        '_identification_code_qualifier_raw',
+        'identification_code',
+    )
+    fields = (
+        'entity',
+        'type',
+        'last_name',
+        'first_name',
+        'middle_name',
+        'name_prefix',
+        'name_suffix',
+        'identification_code_qualifier',
+        'identification_code',
+    )
 
     identifier = Identifier()
     entity = EntityCode()
     type = EntityType()
     identification_code_qualifier = IdentificationCodeQualifier()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.entity = segment[1]
@@ -32,38 +59,23 @@ class Entity:
         self.identification_code = get_element(segment, 9)
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the NM1 segment back to its EDI representation."""
         elements = [
             self.identifier,
-            self.entity,
-            self.type,
+            EntityCode.formatter(self.entity),
+            EntityType.formatter(self.type),
             self.last_name,
-            self.first_name if self.first_name else '',
-            self.middle_name if self.middle_name else '',
-            self.name_prefix if self.name_prefix else '',
-            self.name_suffix if self.name_suffix else '',
-            self.identification_code_qualifier if self.identification_code_qualifier else '',
-            self.identification_code if self.identification_code else ''
+            self.first_name,
+            self.middle_name,
+            self.name_prefix,
+            self.name_suffix,
+            IdentificationCodeQualifier.formatter(self.identification_code_qualifier),
+            self.identification_code,
         ]
-        return '*'.join(elements)
-
-    @classmethod
-    def from_dict(cls, data: dict) -> 'Entity':
-        """Creates an Entity object from dictionary data."""
-        segment = cls('')
-        segment.entity = data.get('entity')
-        segment.type = data.get('type')
-        segment.last_name = data.get('last_name')
-        segment.first_name = data.get('first_name')
-        segment.middle_name = data.get('middle_name')
-        segment.name_prefix = data.get('name_prefix')
-        segment.name_suffix = data.get('name_suffix')
-        segment.identification_code_qualifier = data.get('identification_code_qualifier')
-        segment.identification_code = data.get('identification_code')
-        return segment
+        return join_segment(elements, delimiters.element)
 
     @property
     def name(self) -> str:
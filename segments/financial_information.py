@@ -4,22 +4,43 @@ from elements.identifier import Identifier
 from elements.payment_method import PaymentMethod
 from elements.dollars import Dollars
 from elements.date import Date
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class FinancialInformation:
+class FinancialInformation(Serializable):
     """Represents the BPR segment (Financial Information) of the EDI 835."""
 
     identification = 'BPR'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        'transaction_handling_code',
+        '_amount_paid',
+        '_amount_paid_raw',
+        'credit_debit_flag_code',
+        '_payment_method',
+        '_payment_method_raw',
+        'payment_format_code',
+        '_transaction_date',
+        '_transaction_date_raw',
+    )
+    fields = (
+        'transaction_handling_code',
+        'amount_paid',
+        'credit_debit_flag_code',
+        'payment_method',
+        'payment_format_code',
+        'transaction_date',
+    )
 
     identifier = Identifier()
     amount_paid = Dollars()
     payment_method = PaymentMethod()
     transaction_date = Date()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.transaction_handling_code = segment[1]
@@ -30,33 +51,22 @@ class FinancialInformation:
         self.transaction_date = get_element(segment, 16)
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the BPR segment back to its EDI representation."""
         elements = [
             self.identifier,
             self.transaction_handling_code,
-            self.amount_paid,
+            Dollars.formatter(self.amount_paid),
             self.credit_debit_flag_code,
-            self.payment_method,
+            PaymentMethod.formatter(self.payment_method),
             self.payment_format_code,
-            # Pad with empty strings for missing elements
-            *['' for _ in range(10)], 
-            self.transaction_date
+            *[None] * 10,  # BPR06 to BPR15, the bank account details
+            Date.formatter(self.transaction_date),
         ]
-        return '*'.join(str(element) for element in elements)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.transaction_handling_code = data.get('transaction_handling_code')
-        segment.amount_paid = data.get('amount_paid')
-        segment.credit_debit_flag_code = data.get('credit_debit_flag_code')
-        segment.payment_method = data.get('payment_method')
-        segment.payment_format_code = data.get('payment_format_code')
-        segment.transaction_date = data.get('transaction_date')
-        return segment
+        return join_segment(elements, delimiters.element)
+
 
 
 if __name__ == "__main__":
@@ -1,73 +1,137 @@
+from datetime import datetime
 from typing import List
 
 from elements.identifier import Identifier
 from elements.organization import Organization
 from elements.date import Date
 from elements.authorization_information_qualifier import AuthorizationInformationQualifier
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters
+from serialization import Serializable
 
+# GS08, the implementation guide of the 835 in each version of the ISA
+VERSIONS = {'00501': '005010X221A1', '00401': '004010X091A1'}
 
-class Interchange:
+
+class Interchange(Serializable):
     """Represents the ISA segment (Interchange Control Header) of the EDI 835."""
 
     identification = 'ISA'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        '_authorization_information_qualifier',
+        '_authorization_information_qualifier_raw',
+        'authorization_information',
+        'security_information_qualifier',
+        'security_information',
+        'sender_qualifier',
+        '_sender',
+        '_sender_raw',
+        'receiver_qualifier',
+        '_receiver',
+        '_receiver_raw',
+        '_transmission_date',
+        '_transmission_date_raw',
+        'version',
+        'interchange_control_number',
+        'acknowledgment_requested',
+        'usage_indicator',
+        'component_element_separator',
+    )
+    fields = (
+        'authorization_information_qualifier',
+        'authorization_information',
+        'security_information_qualifier',
+        'security_information',
+        'sender_qualifier',
+        'sender',
+        'receiver_qualifier',
+        'receiver',
+        'transmission_date',
+        'version',
+        'interchange_control_number',
+        'acknowledgment_requested',
+        'usage_indicator',
+        'component_element_separator',
+    )
 
     identifier = Identifier()
     authorization_information_qualifier = AuthorizationInformationQualifier()
     sender = Organization()
     receiver = Organization()
     transmission_date = Date()
-    interchange_control_number = str()
-    component_element_separator = str()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.authorization_information_qualifier = get_element(segment, 1)
+        self.authorization_information = get_element(segment, 2, '').strip()
+        self.security_information_qualifier = get_element(segment, 3)
+        self.security_information = get_element(segment, 4, '').strip()
+        self.sender_qualifier = get_element(segment, 5)
         self.sender = get_element(segment, 6)
+        self.receiver_qualifier = get_element(segment, 7)
         self.receiver = get_element(segment, 8)
         self.transmission_date = get_element(segment, 9) + get_element(segment, 10)
+        self.version = get_element(segment, 12)
         self.interchange_control_number = get_element(segment, 13)
+        self.acknowledgment_requested = get_element(segment, 14)
+        self.usage_indicator = get_element(segment, 15)
         self.component_element_separator = get_element(segment, 16)
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
+
+    def control_version(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
+        """Returns the ISA12 to write, padded like the control number.
+
+        That is the version read, else 00501 for delimiters with a repetition
+        separator and 00401 without.
+        """
+        if self.version:
+            return self.version.strip().zfill(5)
+        return '00501' if delimiters.repetition else '00401'
+
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
+        """Converts the ISA segment back to its EDI representation.
+
+        The ISA is fixed width, so no element is dropped and the sender, receiver and
+        control number are padded. The elements read are written back as they were;
+        those a header restored from older JSON lacks get the defaults below. ISA11 is
+        the repetition separator from version 00501 on and 'U' before it.
+        """
+        transmission_date = self.transmission_date
+        if isinstance(transmission_date, datetime):
+            date, time = transmission_date.strftime('%y%m%d'), transmission_date.strftime('%H%M')
+        else:
+            date, time = transmission_date[:6], transmission_date[6:]
+
+        version = self.control_version(delimiters)
+        repetition = delimiters.repetition if version >= '00501' else 'U'
+        if not repetition:
+            raise ValueError(f'A version {version} ISA needs delimiters with a repetition separator (ISA11).')
 
-    def to_edi(self) -> str:
-        """Converts the ISA segment back to its EDI representation."""
         elements = [
             self.identifier,
-            self.authorization_information_qualifier,
-            '          ',  # Authorization Information
-            '00',          # Security Information Qualifier
-            '          ',  # Security Information
-            'ZZ',          # Interchange ID Qualifier
-            self.sender,    # Interchange Sender ID
-            'ZZ',          # Interchange ID Qualifier
-            self.receiver,   # Interchange Receiver ID
-            self.transmission_date[:6],  # Interchange Date
-            self.transmission_date[6:],  # Interchange Time
-            '^',          # Repetition Separator
-            '00501',       # Interchange Control Version Number
-            self.interchange_control_number,  # Interchange Control Number
-            '0',          # Acknowledgment Requested
-            'P',          # Usage Indicator
-            self.component_element_separator,  # Component Element Separator
+            AuthorizationInformationQualifier.formatter(self.authorization_information_qualifier),
+            (self.authorization_information or '').ljust(10),  # Authorization Information
+            self.security_information_qualifier or '00',  # Security Information Qualifier
+            (self.security_information or '').ljust(10),  # Security Information
+            self.sender_qualifier or 'ZZ',  # Interchange ID Qualifier
+            Organization.formatter(self.sender).ljust(15),  # Interchange Sender ID
+            self.receiver_qualifier or 'ZZ',  # Interchange ID Qualifier
+            Organization.formatter(self.receiver).ljust(15),  # Interchange Receiver ID
+            date,  # Interchange Date
+            time,  # Interchange Time
+            repetition,  # Repetition Separator, or Interchange Control Standards Identifier before 00501
+            version,  # Interchange Control Version Number
+            self.interchange_control_number.zfill(9),  # Interchange Control Number
+            self.acknowledgment_requested or '0',  # Acknowledgment Requested
+            self.usage_indicator or 'P',  # Usage Indicator
+            delimiters.component,  # Component Element Separator
         ]
-        return '*'.join(elements)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.authorization_information_qualifier = data.get('authorization_information_qualifier')
-        segment.sender = data.get('sender')
-        segment.receiver = data.get('receiver')
-        segment.transmission_date = data.get('transmission_date')
-        segment.interchange_control_number = data.get('interchange_control_number')
-        segment.component_element_separator = data.get('component_element_separator')
-        return segment
+        return delimiters.element.join(elements)
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
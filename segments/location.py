@@ -1,18 +1,30 @@
 from typing import List
 
 from elements.identifier import Identifier
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class Location:
+class Location(Serializable):
     """Represents the N4 segment (Geographic Location) in the EDI 835."""
     identification = 'N4'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        'city',
+        'state',
+        'zip_code',
+    )
+    fields = (
+        'city',
+        'state',
+        'zip_code',
+    )
 
     identifier = Identifier()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.city = get_element(segment, 1)
@@ -20,9 +32,9 @@ class Location:
         self.zip_code = get_element(segment, 3)
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the N4 segment back to its EDI representation."""
         elements = [
             self.identifier,
@@ -30,15 +42,8 @@ class Location:
             self.state,
             self.zip_code,
         ]
-        return '*'.join(elements)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.city = data.get('city')
-        segment.state = data.get('state')
-        segment.zip_code = data.get('zip_code')
-        return segment
+        return join_segment(elements, delimiters.element)
+
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
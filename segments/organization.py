@@ -2,19 +2,34 @@ from typing import List
 
 from elements.identifier import Identifier
 from elements.organization_type import OrganizationType
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class Organization:
+class Organization(Serializable):
     """Represents the N1 segment (Name) in the EDI 835."""
     identification = 'N1'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        '_type',
+        '_type_raw',
+        'name',
+        'identification_code_qualifier',
+        'identification_code',
+    )
+    fields = (
+        'type',
+        'name',
+        'identification_code_qualifier',
+        'identification_code',
+    )
 
     identifier = Identifier()
     type = OrganizationType()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.type = segment[1]
@@ -23,28 +38,19 @@ class Organization:
         self.identification_code = get_element(segment, 4)
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the N1 segment back to its EDI representation."""
         elements = [
             self.identifier,
-            self.type,
+            OrganizationType.formatter(self.type),
             self.name,
-            self.identification_code_qualifier if self.identification_code_qualifier else '',
-            self.identification_code if self.identification_code else ''
-            # ... (Add other elements if present in your EDI data)
+            self.identification_code_qualifier,
+            self.identification_code,
         ]
-        return '*'.join(elements)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.type = data.get('type')
-        segment.name = data.get('name')
-        segment.identification_code_qualifier = data.get('identification_code_qualifier')
-        segment.identification_code = data.get('identification_code')
-        return segment
+        return join_segment(elements, delimiters.element)
+
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -1,61 +1,105 @@
-from typing import List
+from typing import List, Optional
 
 from elements.identifier import Identifier
 from elements.date import Date
-from elements.dollars import Dollars
-from utilities import split_segment, get_element
+from elements.dollars import Amount, Dollars, decode_amount, encode_amount, is_in_cents, parse_amount
+from elements.composite import AdjustmentIdentifier
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
 from elements.adjustment_reason_code import AdjustmentReasonCode
 from elements.reference_qualifier import ReferenceQualifier
+from serialization import Serializable
 
-class ProviderLevelAdjustment:
-    """Represents the PLB segment in an EDI 835."""
+class ProviderLevelAdjustment(Serializable):
+    """Represents the PLB segment in an EDI 835.
+
+    The adjustment amounts are parsed from their raw elements on first read, in
+    the money mode the segment was built in, like the other amounts.
+    """
 
     identification = 'PLB'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        'provider_identifier',
+        '_fiscal_period_date',
+        '_fiscal_period_date_raw',
+        'adjustment_identifiers',
+        'adjustment_reason_code',
+        'reference_identification',
+        '_adjustment_amount_raw',
+        '_adjustment_amount',
+        '_cents',
+    )
+    fields = (
+        'provider_identifier',
+        'fiscal_period_date',
+        'adjustment_reason_code',
+        'reference_identification',
+        'adjustment_amount',
+    )
+    field_encoders = {'adjustment_amount': lambda amounts: [encode_amount(amount) for amount in amounts]}
 
     identifier = Identifier()
     fiscal_period_date = Date()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str], component_separator: str = DEFAULT_DELIMITERS.component):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.provider_identifier = segment[1]
         self.fiscal_period_date = segment[2]
-        self.adjustment_reason_code = []
-        self.reference_identification = []
-        self.adjustment_amount = []
-        for i in range(3, len(segment), 3):
-            if i + 2 < len(segment):
-                adjustment_identifier = segment[i]
-                parts = adjustment_identifier.split(':')
-                self.adjustment_reason_code.append(parts[0])
-                self.reference_identification.append(parts[1] if len(parts) > 1 else None)
-                self.adjustment_amount.append(segment[i + 1])
+        # PLB03 onwards are pairs of a composite adjustment identifier (C042) and an amount
+        self.adjustment_identifiers = [
+            AdjustmentIdentifier.split(segment[i], component_separator, 'PLB.adjustment_identifiers')
+            or AdjustmentIdentifier(('',))
+            for i in range(3, len(segment) - 1, 2)
+        ]
+        self.adjustment_reason_code = [identifier.reason_code or '' for identifier in self.adjustment_identifiers]
+        self.reference_identification = [identifier.reference_identification for identifier in self.adjustment_identifiers]
+        # kept raw until read, so lazy mode does not parse them
+        self._adjustment_amount_raw = segment[4::2][:len(self.adjustment_identifiers)]
+        self._adjustment_amount = None
+        self._cents = is_in_cents()
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
+
+    @property
+    def adjustment_amount(self) -> List[Optional[Amount]]:
+        """The amount of each adjustment identifier, None where it is empty."""
+        if self._adjustment_amount is None:
+            self._adjustment_amount = [
+                parse_amount(amount, self._cents) if amount else None for amount in self._adjustment_amount_raw
+            ]
+        return self._adjustment_amount
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the PLB segment to its EDI representation."""
-        elements = [self.identifier, self.provider_identifier, self.fiscal_period_date]
+        elements = [self.identifier, self.provider_identifier, Date.formatter(self.fiscal_period_date)]
 
-        for i in range(len(self.adjustment_reason_code)):
-            adjustment_identifier = self.adjustment_reason_code[i]
-            if self.reference_identification[i]:
-                adjustment_identifier += ":" + self.reference_identification[i]
-            elements.extend([adjustment_identifier, self.adjustment_amount[i]])
+        for reason_code, reference, amount in zip(
+                self.adjustment_reason_code, self.reference_identification, self.adjustment_amount):
+            elements.extend([join_segment([reason_code, reference], delimiters.component), Dollars.formatter(amount)])
 
-        return '*'.join(elements)
+        return join_segment(elements, delimiters.element)
 
     @classmethod
     def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.provider_identifier = data.get('provider_identifier')
-        segment.fiscal_period_date = data.get('fiscal_period_date')
-        segment.adjustment_reason_code = data.get('adjustment_reason_code', [])
-        segment.reference_identification = data.get('reference_identification', [])
-        segment.adjustment_amount = data.get('adjustment_amount', [])
+        """Creates a PLB segment from its `to_dict` output, rebuilding the adjustment identifiers."""
+        segment = super().from_dict(data)
+        segment.adjustment_reason_code = segment.adjustment_reason_code or []
+        segment.reference_identification = segment.reference_identification or []
+        # amounts are numbers in dollars; older output wrote them as strings
+        segment._adjustment_amount_raw = []
+        segment._cents = is_in_cents()
+        segment._adjustment_amount = [
+            decode_amount(None if amount in (None, '') else float(amount))
+            for amount in data.get('adjustment_amount') or ()
+        ]
+        segment.adjustment_identifiers = [
+            AdjustmentIdentifier([reason_code or '', reference or ''])
+            for reason_code, reference in zip(segment.adjustment_reason_code, segment.reference_identification)
+        ]
         return segment
 
 if __name__ == "__main__":
@@ -2,42 +2,47 @@ from typing import List
 
 from elements.identifier import Identifier
 from elements.reference_qualifier import ReferenceQualifier
-from utilities import split_segment
+from utilities import DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class Reference:
+class Reference(Serializable):
     """Represents the REF segment (Reference Identification) in the EDI 835."""
     identification = 'REF'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        '_qualifier',
+        '_qualifier_raw',
+        'value',
+    )
+    fields = (
+        'qualifier',
+        'value',
+    )
 
     identifier = Identifier()
     qualifier = ReferenceQualifier()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.qualifier = segment[1]
         self.value = segment[2] if len(segment) > 2 else '' 
 
     def __repr__(self) -> str:
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the REF segment back to its EDI representation."""
         elements = [
             self.identifier,
-            self.qualifier.code,  # Get code from the ReferenceQualifier object
+            ReferenceQualifier.formatter(self.qualifier),
             self.value,
         ]
-        return '*'.join(elements)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.qualifier = ReferenceQualifier().parser(data.get('qualifier', {}).get('code'))
-        segment.value = data.get('value')
-        return segment
+        return join_segment(elements, delimiters.element)
+
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
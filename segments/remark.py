@@ -3,43 +3,49 @@ from typing import List
 from elements.identifier import Identifier
 from elements.remark_qualifier import RemarkQualifier
 from elements.remark_code import RemarkCode
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class Remark:
+class Remark(Serializable):
     """Represents the LQ segment (Health Care Remark Codes) in the EDI 835."""
     identification = 'LQ'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        '_qualifier',
+        '_qualifier_raw',
+        '_code',
+        '_code_raw',
+    )
+    fields = (
+        'qualifier',
+        'code',
+    )
 
     identifier = Identifier()
     qualifier = RemarkQualifier()
     code = RemarkCode()
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.qualifier = segment[1]
         self.code = segment[2]
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-    def to_edi(self) -> str:
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the LQ segment back to its EDI representation."""
         elements = [
             self.identifier,
-            self.qualifier.code,  # Get the code from RemarkQualifier object
-            self.code.code,       # Get the code from RemarkCode object
+            RemarkQualifier.formatter(self.qualifier),
+            RemarkCode.formatter(self.code),
         ]
-        return '*'.join(elements)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.qualifier = RemarkQualifier().parser(data.get('qualifier', {}).get('code'))
-        segment.code = RemarkCode().parser(data.get('code', {}).get('code'))
-        return segment
+        return join_segment(elements, delimiters.element)
+
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
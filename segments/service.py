@@ -1,75 +1,120 @@
-from typing import List
+from typing import List, Optional, Tuple
 
 from elements.identifier import Identifier
 from elements.dollars import Dollars
-from elements.service_code import ServiceCode
-from elements.service_qualifier import ServiceQualifer
-from elements.service_modifier import ServiceModifier
-from elements.integer import Integer
-from utilities import split_segment, get_element
+from elements.composite import Composite, CompositeElement
+from elements.integer import DefaultInteger, Integer
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
 
-class Service:
+class Service(Serializable):
     """Represents the SVC segment (Service Payment Information) in the EDI 835."""
     identification = 'SVC'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        '_procedure',
+        '_procedure_raw',
+        '_submitted_procedure',
+        '_submitted_procedure_raw',
+        '_charge_amount',
+        '_charge_amount_raw',
+        '_paid_amount',
+        '_paid_amount_raw',
+        'revenue_code',
+        '_allowed_units',
+        '_allowed_units_raw',
+        '_billed_units',
+        '_billed_units_raw',
+    )
+    fields = (
+        'code',
+        'qualifier',
+        'modifier',
+        'modifiers',
+        'description',
+        'charge_amount',
+        'paid_amount',
+        'revenue_code',
+        'allowed_units',
+        'billed_units',
+        'submitted_procedure',
+    )
+    field_encoders = {'modifiers': list}
 
     identifier = Identifier()
     charge_amount = Dollars()
     paid_amount = Dollars()
-    code = ServiceCode()
-    qualifier = ServiceQualifer()
-    modifier = ServiceModifier()
-    allowed_units = Integer()
-    billed_units = Integer()
-    revenue_code = str()
-
-    def __init__(self, segment: str):
+    procedure = CompositeElement()  # SVC01
+    submitted_procedure = CompositeElement()  # SVC06, the procedure billed when the payer changed it
+    # missing units default to none for an unpaid line and one otherwise, computed when read
+    allowed_units = DefaultInteger(lambda service: 0 if service.paid_amount == 0 else 1)
+    billed_units = DefaultInteger(lambda service: service.allowed_units)
+
+    def __init__(self, segment: List[str], component_separator: str = DEFAULT_DELIMITERS.component):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
-        self.code = segment[1]
-        self.qualifier = segment[1]
-        self.modifier = segment[1]
+        self.procedure = Composite.split(segment[1], component_separator, 'SVC.procedure')
         self.charge_amount = get_element(segment, 2)
         self.paid_amount = get_element(segment, 3)
         self.revenue_code = get_element(segment, 4)
+        self.allowed_units = get_element(segment, 5)
+        self.billed_units = get_element(segment, 7)
+        self.submitted_procedure = Composite.split(get_element(segment, 6), component_separator, 'SVC.submitted_procedure')
+
+    def __repr__(self):
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
 
-        # assume unit count of one if unit not provided
-        default = 0 if self.paid_amount == 0 else 1
-        self.allowed_units = get_element(segment, 5, default=default)
+    @property
+    def qualifier(self) -> Optional[str]:
+        return self.procedure.qualifier if self.procedure is not None else None
 
-        self.billed_units = get_element(segment, 7, default=self.allowed_units)
+    @property
+    def code(self) -> Optional[str]:
+        return self.procedure.code if self.procedure is not None else None
 
-    def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+    @property
+    def modifier(self) -> Optional[str]:
+        """The first procedure modifier, see `modifiers` for all of them."""
+        modifiers = self.modifiers
+        return modifiers[0] if modifiers else None
 
-    def to_edi(self) -> str:
+    @property
+    def modifiers(self) -> Tuple[str, ...]:
+        return self.procedure.modifiers if self.procedure is not None else ()
+
+    @property
+    def description(self) -> Optional[str]:
+        """The procedure description (SVC01-7), sent for procedures without a code of their own."""
+        return self.procedure.description if self.procedure is not None else None
+
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the SVC segment back to its EDI representation."""
         elements = [
             self.identifier,
-            self.code,  # The code property already includes qualifier and modifier
-            self.charge_amount,
-            self.paid_amount,
-            self.revenue_code if self.revenue_code else '',  # Include revenue code if present
-            self.allowed_units,
-            '',  # Placeholder for another composite element
-            self.billed_units,
+            _join_composite(self.procedure, delimiters.component),
+            Dollars.formatter(self.charge_amount),
+            Dollars.formatter(self.paid_amount),
+            self.revenue_code,
+            Integer.formatter(self.allowed_units),
+            _join_composite(self.submitted_procedure, delimiters.component),
+            Integer.formatter(self.billed_units),
         ]
-        return '*'.join(str(element) for element in elements)
+        return join_segment(elements, delimiters.element)
 
     @classmethod
     def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.code = data.get('code')
-        segment.qualifier = data.get('qualifier')
-        segment.modifier = data.get('modifier')
-        segment.charge_amount = data.get('charge_amount')
-        segment.paid_amount = data.get('paid_amount')
-        segment.allowed_units = data.get('allowed_units')
-        segment.billed_units = data.get('billed_units')
-        segment.revenue_code = data.get('revenue_code')
+        """Creates an SVC segment from its `to_dict` output, rebuilding SVC01 from the procedure fields."""
+        segment = super().from_dict(data)
+        modifiers = data.get('modifiers') or ([data['modifier']] if data.get('modifier') else [])
+        segment.procedure = Composite.from_dict({**data, 'modifiers': modifiers})
         return segment
 
+
+def _join_composite(value: Optional[Composite], component_separator: str) -> Optional[str]:
+    return None if value is None else value.join(component_separator)
+
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -1,17 +1,70 @@
-from typing import List
+from typing import List, NamedTuple, Optional, Tuple, Union
 
+from elements import Code
 from elements.identifier import Identifier
 from elements.adjustment_group_code import AdjustmentGroupCode
 from elements.adjustment_reason_code import AdjustmentReasonCode
-from elements.dollars import Dollars
+from elements.dollars import Amount, Dollars, decode_amount, encode_amount, is_in_cents, parse_amount
 from elements.integer import Integer  # Import Integer
-from utilities import split_segment, get_element
+from utilities import get_element, DEFAULT_DELIMITERS, Delimiters, join_segment
+from serialization import Serializable
 
+# CAS05 to CAS19: the reason code, amount and quantity of the second to sixth adjustment
+_ADDITIONAL = slice(5, 20)
+_NO_ADJUSTMENTS: Tuple[str, ...] = ()
 
-class ServiceAdjustment:
-    """Represents the CAS segment (Claim Adjustment) in the EDI 835."""
+
+class Adjustment(NamedTuple):
+    """One reason code, amount and quantity triplet of a CAS segment."""
+    reason_code: Optional[Code]
+    amount: Optional[Amount]
+    quantity: Optional[Union[int, str]]
+
+    def to_dict(self) -> dict:
+        return {
+            'reason_code': AdjustmentReasonCode.encoder(self.reason_code),
+            'amount': encode_amount(self.amount),
+            'quantity': self.quantity,
+        }
+
+
+class ServiceAdjustment(Serializable):
+    """Represents the CAS segment (Claim Adjustment) in the EDI 835.
+
+    A CAS carries up to six reason code, amount and quantity triplets under one
+    group code. `reason_code`, `amount` and `quantity` hold the first;
+    `additional_adjustments` the others, parsed from their raw elements on first
+    read, in the money mode the segment was built in. `total_amount` sums all of them.
+    """
 
     identification = 'CAS'
+    __slots__ = (
+        'segment',
+        '_identifier',
+        '_group_code',
+        '_group_code_raw',
+        '_reason_code',
+        '_reason_code_raw',
+        '_amount',
+        '_amount_raw',
+        '_quantity',
+        '_quantity_raw',
+        '_additional_raw',
+        '_additional',
+        '_cents',
+    )
+    fields = (
+        'group_code',
+        'reason_code',
+        'amount',
+        'quantity',
+        'additional_adjustments',
+        'total_amount',
+    )
+    field_encoders = {
+        'additional_adjustments': lambda adjustments: [adjustment.to_dict() for adjustment in adjustments],
+        'total_amount': encode_amount,
+    }
 
     identifier = Identifier()
     group_code = AdjustmentGroupCode()
@@ -19,9 +72,8 @@ class ServiceAdjustment:
     amount = Dollars()
     quantity = Integer()  # Use Integer as a class attribute
 
-    def __init__(self, segment: str):
+    def __init__(self, segment: List[str]):
         self.segment = segment
-        segment = split_segment(segment)
 
         self.identifier = segment[0]
         self.group_code = segment[1]
@@ -29,29 +81,81 @@ class ServiceAdjustment:
         self.amount = get_element(segment, 3)
         self.quantity = get_element(segment, 4)
 
+        # kept raw until read, so lazy mode does not parse them
+        self._additional_raw = tuple(segment[_ADDITIONAL]) if len(segment) > _ADDITIONAL.start else _NO_ADJUSTMENTS
+        self._additional = None
+        self._cents = is_in_cents()
+
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name, None))) for name in self.__slots__)
+
+    @property
+    def additional_adjustments(self) -> List[Adjustment]:
+        """The second to sixth triplets (CAS05 to CAS19) that are present."""
+        if self._additional is None:
+            raw = self._additional_raw
+            self._additional = [
+                _parse_adjustment(raw[i:i + 3], self._cents) for i in range(0, len(raw), 3) if any(raw[i:i + 3])
+            ]
+        return self._additional
+
+    @property
+    def adjustments(self) -> List[Adjustment]:
+        """Every triplet of the segment, the first one first."""
+        return [Adjustment(self.reason_code, self.amount, self.quantity), *self.additional_adjustments]
 
-    def to_edi(self) -> str:
+    @property
+    def total_amount(self) -> Amount:
+        """The sum of the amounts of all triplets, in the money mode the segment was built in."""
+        total = 0 if self._cents else 0.0
+        for adjustment in self.adjustments:
+            if adjustment.amount is not None:
+                total += adjustment.amount
+        return total
+
+    def to_edi(self, delimiters: Delimiters = DEFAULT_DELIMITERS) -> str:
         """Converts the CAS segment back to its EDI representation."""
         elements = [
             self.identifier,
-            self.group_code.code,  # Get code from AdjustmentGroupCode
-            self.reason_code.code,  # Get code from AdjustmentReasonCode
-            self.amount,
-            self.quantity if self.quantity else '',  # Include quantity if present
-            # ... (Add other elements if present in your EDI data)
+            AdjustmentGroupCode.formatter(self.group_code),
         ]
-        return '*'.join(str(element) for element in elements)
+        for adjustment in self.adjustments:
+            elements.extend((
+                AdjustmentReasonCode.formatter(adjustment.reason_code),
+                Dollars.formatter(adjustment.amount),
+                Integer.formatter(adjustment.quantity),
+            ))
+        return join_segment(elements, delimiters.element)
 
     @classmethod
     def from_dict(cls, data: dict):
-        segment = cls('')
-        segment.group_code = AdjustmentGroupCode().parser(data.get('group_code', {}).get('code'))
-        segment.reason_code = AdjustmentReasonCode().parser(data.get('reason_code', {}).get('code'))
-        segment.amount = data.get('amount')
-        segment.quantity = data.get('quantity')
+        """Creates a CAS segment from its `to_dict` output, with all of its triplets."""
+        segment = super().from_dict(data)
+        segment._additional_raw = _NO_ADJUSTMENTS
+        segment._cents = is_in_cents()
+        segment._additional = [
+            Adjustment(
+                AdjustmentReasonCode.decoder(adjustment.get('reason_code')),
+                decode_amount(adjustment.get('amount')),
+                adjustment.get('quantity'),
+            )
+            for adjustment in data.get('additional_adjustments') or ()
+        ]
         return segment
 
+
+_reason_code = AdjustmentReasonCode()
+_quantity = Integer()
+
+
+def _parse_adjustment(raw: Tuple[str, ...], cents: bool) -> Adjustment:
+    reason_code, amount, quantity = (*raw, '', '')[:3]
+    return Adjustment(
+        _reason_code.parser(reason_code) if reason_code else None,
+        parse_amount(amount, cents) if amount else None,
+        _quantity.parser(quantity),
+    )
+
+
 if __name__ == "__main__":
-    pass
\ No newline at end of file
+    pass
@@ -0,0 +1,185 @@
+import json
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from elements import Element
+
+JsonBackend = Callable[[Any, bool], str]
+
+
+class Serializable:
+    """Gives segment and loop classes a `to_dict` compiled from their public schema.
+
+    Subclasses list their public schema in these class attributes:
+
+    - `fields`: plain values. Values of `elements.Element` descriptors are written
+      with the element's `encoder` (e.g. dates as ISO strings, codes as
+      {'code': ..., 'description': ...}); other values are written as they are.
+    - `nested_fields`: a single segment or loop, or None.
+    - `repeating_fields`: a list of segments or loops.
+    - `field_encoders`: encoders for the plain attributes among `fields` that are
+      not elements, keyed by name.
+    - `field_decoders`: their inverses, for `from_dict`.
+
+    When the subclass is created, the schema is turned into the source of a
+    `to_dict` method reading each attribute directly, so serializing does not
+    go through `__dict__`, `__slots__` or type checks per value. Private slots
+    and the raw `segment` tokens are never part of the output.
+
+    Segment classes, which have an `identification`, also get the inverse: a
+    `from_dict` that stores each field's decoded value directly, without
+    building tokens to parse again. Fields that are read-only properties are
+    derived and skipped; segments deriving them from other state override
+    `from_dict` to restore it.
+    """
+
+    __slots__ = ()
+
+    fields: Tuple[str, ...] = ()
+    nested_fields: Tuple[str, ...] = ()
+    repeating_fields: Tuple[str, ...] = ()
+    field_encoders: Dict[str, Callable[[Any], Any]] = {}
+    field_decoders: Dict[str, Callable[[Any], Any]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.to_dict = _compile_to_dict(cls)
+        if 'identification' in cls.__dict__:
+            cls._restore = _compile_restore(cls)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the public fields as a dictionary of JSON-safe values."""
+        return {}
+
+    def to_json(self, indent: bool = False) -> str:
+        """Returns the public fields as JSON, written by the current JSON backend."""
+        return dumps(self.to_dict(), indent)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Creates a segment from its `to_dict` output; its `segment` tokens are None."""
+        obj = cls.__new__(cls)
+        obj._restore(data)
+        return obj
+
+    def _restore(self, data: Dict[str, Any]):
+        raise TypeError(f'{type(self).__qualname__} is not a segment and cannot be created from a dictionary')
+
+
+def _compile_to_dict(cls) -> Callable[[Any], Dict[str, Any]]:
+    namespace = {'to_dict_or_none': to_dict_or_none}
+    items = []
+
+    for name in cls.fields:
+        attribute = _class_attribute(cls, name)
+        encoder = attribute.encoder if isinstance(attribute, Element) else cls.field_encoders.get(name)
+        if encoder is not None:
+            namespace[f'_encode_{name}'] = encoder
+            encoder = f'_encode_{name}'
+            items.append(f'{name!r}: {encoder}(self.{name})')
+        else:
+            items.append(f'{name!r}: self.{name}')
+
+    for name in cls.nested_fields:
+        items.append(f'{name!r}: to_dict_or_none(self.{name})')
+
+    for name in cls.repeating_fields:
+        items.append(f'{name!r}: [item.to_dict() for item in self.{name}]')
+
+    source = 'def to_dict(self):\n    return {' + ', '.join(items) + '}\n'
+    exec(compile(source, f'<{cls.__qualname__}.to_dict>', 'exec'), namespace)
+
+    to_dict = namespace['to_dict']
+    to_dict.__qualname__ = f'{cls.__qualname__}.to_dict'
+    to_dict.__doc__ = Serializable.to_dict.__doc__
+    return to_dict
+
+
+def _compile_restore(cls) -> Callable[[Any, Dict[str, Any]], None]:
+    namespace = {}
+    lines = []
+
+    if any('segment' in getattr(klass, '__slots__', ()) for klass in cls.__mro__):
+        lines.append('self.segment = None')
+    identifier = _class_attribute(cls, 'identifier')
+    if isinstance(identifier, Element):
+        lines.append(f'self.{identifier.private_name} = {cls.identification!r}')
+
+    for name in cls.fields:
+        attribute = _class_attribute(cls, name)
+        if isinstance(attribute, property):
+            continue
+        if isinstance(attribute, Element):
+            target, decoder = attribute.private_name, attribute.decoder
+        else:
+            target, decoder = name, cls.field_decoders.get(name)
+
+        if decoder is not None:
+            namespace[f'_decode_{name}'] = decoder
+            lines.append(f'self.{target} = _decode_{name}(data.get({name!r}))')
+        else:
+            lines.append(f'self.{target} = data.get({name!r})')
+
+    source = 'def _restore(self, data):\n' + ''.join(f'    {line}\n' for line in lines or ['pass'])
+    exec(compile(source, f'<{cls.__qualname__}._restore>', 'exec'), namespace)
+
+    restore = namespace['_restore']
+    restore.__qualname__ = f'{cls.__qualname__}._restore'
+    return restore
+
+
+def _class_attribute(cls, name: str):
+    # read the class __dict__ directly, descriptors raise when fetched without an instance
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass.__dict__[name]
+
+
+def to_dict_or_none(value: Optional[Serializable]) -> Optional[Dict[str, Any]]:
+    """Returns the `to_dict` of a segment or loop that may be missing."""
+    return None if value is None else value.to_dict()
+
+
+def _json_dumps(obj: Any, indent: bool) -> str:
+    return json.dumps(obj, indent=4 if indent else None)
+
+
+def _orjson_dumps(obj: Any, indent: bool) -> str:
+    import orjson
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+
+JSON_BACKENDS: Dict[str, JsonBackend] = {
+    'json': _json_dumps,
+    'orjson': _orjson_dumps,
+}
+
+_backend: JsonBackend = _json_dumps
+
+
+def set_json_backend(backend: Union[str, JsonBackend]):
+    """Selects the function that turns `to_dict` output into JSON text.
+
+    Args:
+        backend (Union[str, JsonBackend]): A name from `JSON_BACKENDS` ('json', the
+            default, or 'orjson', which needs the optional orjson package and indents
+            by two spaces), or a callable taking the object and whether to indent.
+    """
+
+    global _backend
+    if isinstance(backend, str):
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f'Unknown JSON backend: {backend}. Choose one of {", ".join(JSON_BACKENDS)}.')
+        if backend == 'orjson':
+            import orjson  # fail here rather than on the first dump if it is not installed
+        backend = JSON_BACKENDS[backend]
+
+    _backend = backend
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Writes JSON-safe values (e.g. the output of `to_dict`) with the current JSON backend."""
+    return _backend(obj, indent)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,443 @@
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Iterator, List, NamedTuple, Optional, TextIO
+
+from segments.address import Address as AddressSegment
+from segments.amount import Amount as AmountSegment
+from segments.claim import Claim as ClaimSegment
+from segments.date import Date as DateSegment
+from segments.entity import Entity as EntitySegment
+from segments.financial_information import FinancialInformation as FinancialInformationSegment
+from segments.interchange import VERSIONS, Interchange as InterchangeSegment
+from segments.location import Location as LocationSegment
+from segments.organization import Organization as OrganizationSegment
+from segments.provider_level_adjustment import ProviderLevelAdjustment as ProviderLevelAdjustmentSegment
+from segments.reference import Reference as ReferenceSegment
+from segments.remark import Remark as RemarkSegment
+from segments.service import Service as ServiceSegment
+from segments.service_adjustment import ServiceAdjustment as ServiceAdjustmentSegment
+from utilities import Delimiters, join_segment
+
+# the ISA/GS envelopes of the sample files, both one segment per line
+VARIANTS = {
+    # EDI835input.txt: version 00401 header without a repetition separator, GS05 as HHMM
+    '00401': Delimiters(repetition=None, segment='\n'),
+    # EDI835BIG.txt: version 00501 header, GS05 as HHMMSS
+    '00501': Delimiters(segment='\n'),
+}
+DEFAULT_VARIANT = '00501'
+
+# how much of a claim each kind of adjustment takes at most, as a fraction of what is left
+_ADJUSTMENTS = (
+    ('CO', '45', 0.5),
+    ('PR', '1', 0.3),
+    ('PR', '2', 0.2),
+    ('PR', '3', 0.1),
+    ('OA', '23', 0.2),
+    ('CO', '97', 0.3),
+)
+_DENIAL = ('CO', '96')
+_REMARK_CODES = ('M15', 'N122', 'N20', 'N630', 'MA130', 'N781')
+_PROVIDER_ADJUSTMENT_CODES = ('WO', 'CS', 'L6', 'FB')
+_PROCEDURES = ('99213', '99214', '99203', '97110', '80053', '85025', '36415', '71046', '93000', 'G0439')
+_MODIFIERS = ('25', '59', 'GP', 'LT', 'RT')
+_LAST_NAMES = ('SMITH', 'JOHNSON', 'WILLIAMS', 'BROWN', 'JONES', 'GARCIA', 'MILLER', 'DAVIS', 'LOPEZ', 'WILSON')
+_FIRST_NAMES = ('JAMES', 'MARY', 'ROBERT', 'PATRICIA', 'JOHN', 'JENNIFER', 'MICHAEL', 'LINDA', 'DAVID', 'MARIA')
+_PAYERS = ('SYNTHETIC HEALTH PLAN', 'EXAMPLE MEDICAID', 'SAMPLE MUTUAL INSURANCE')
+_PAYEES = ('SYNTHETIC CLINIC', 'EXAMPLE MEDICAL GROUP', 'SAMPLE FAMILY PRACTICE')
+_CITIES = (('SPRINGFIELD', 'IL', '62701'), ('RIVERSIDE', 'CA', '92501'), ('FRANKLIN', 'TN', '37064'))
+_START = date(2024, 1, 1)
+
+
+class Shape(NamedTuple):
+    """The size and density of a synthetic file.
+
+    Counts given as floats are averages: 1.5 means one or two, half the time each.
+
+    Attributes:
+        interchanges (int): ISA/IEA envelopes, each with one GS/GE group.
+        transaction_sets (int): ST/SE transaction sets per interchange.
+        claims (int): Claims per transaction set.
+        services (float): Service lines per claim, at least one.
+        claim_adjustments (float): Claim-level CAS segments per claim.
+        service_adjustments (float): CAS segments per service line.
+        remarks (float): LQ segments per service line.
+        provider_adjustments (float): PLB segments per transaction set.
+        denial_rate (float): The share of claims denied (CLP02 4, nothing paid).
+    """
+    interchanges: int = 1
+    transaction_sets: int = 1
+    claims: int = 100
+    services: float = 2.0
+    claim_adjustments: float = 0.2
+    service_adjustments: float = 1.0
+    remarks: float = 0.3
+    provider_adjustments: float = 1.0
+    denial_rate: float = 0.05
+
+
+class _Adjustment(NamedTuple):
+    group: str
+    reason: str
+    cents: int
+
+
+class _ServiceLine(NamedTuple):
+    procedure: str
+    modifier: Optional[str]
+    units: int
+    charge: int
+    paid: int
+    allowed: int
+    day: int
+    adjustments: List[_Adjustment]
+    remarks: List[str]
+
+
+class _Claim(NamedTuple):
+    status: str
+    charge: int
+    paid: int
+    patient_responsibility: int
+    adjustments: List[_Adjustment]
+    services: List[_ServiceLine]
+    last_name: str
+    first_name: str
+    member_id: str
+    provider_id: str
+
+
+def generate(
+        output: TextIO,
+        shape: Shape = Shape(),
+        seed: int = 0,
+        variant: str = DEFAULT_VARIANT,
+        delimiters: Optional[Delimiters] = None,
+        line_breaks: bool = False,
+        wrap_header: bool = False,
+) -> int:
+    """Writes a synthetic EDI 835 file, one claim at a time.
+
+    Every segment with a class in `segments` is built from its tokens and written
+    by its `to_edi`, so the output is what the converter writes back. The same
+    seed and arguments always give the same file. Amounts balance: each SVC03 is
+    its SVC02 less the line's CAS, each CLP04 its CLP03 less all of its CAS, and
+    BPR02 the sum of CLP04 less the PLB amounts. Names and identifiers are made up.
+
+    Memory does not grow with the file. BPR02 comes before the claims it sums, so
+    each transaction set's claims are drawn twice from the same seed: once to
+    total them, once to write them.
+
+    Args:
+        output (TextIO): Where to write.
+        shape (Shape): The counts and densities.
+        seed (int): Seeds every random choice.
+        variant (str): The ISA/GS layout, a key of `VARIANTS`.
+        delimiters (Optional[Delimiters]): Overrides the delimiters of the variant.
+        line_breaks (bool): Follow each terminator with a line break, when the terminator is not one.
+        wrap_header (bool): Break the ISA line after ISA08, as in EDI835BIG.txt.
+
+    Returns:
+        int: The number of segments written.
+    """
+
+    delimiters = delimiters or VARIANTS[variant]
+    terminator = delimiters.segment + ('\n' if line_breaks and delimiters.segment != '\n' else '')
+    write = _Writer(output, terminator)
+
+    claim_number = 0
+    for interchange in range(shape.interchanges):
+        control_number = str(interchange + 1)
+        transmission = _START + timedelta(days=interchange)
+
+        header = InterchangeSegment([
+            'ISA', '00', '', '00', '', 'ZZ', 'SYNTHSENDER', 'ZZ', 'SYNTHRECEIVER',
+            transmission.strftime('%y%m%d'), '1230', '', variant, control_number, '0', 'P', delimiters.component,
+        ]).to_edi(delimiters)
+        if wrap_header:
+            position = _nth(header, delimiters.element, 9)
+            header = header[:position] + '\n' + header[position:]
+        write(header)
+
+        group_time = '1230' if variant == '00401' else '123021'
+        write(join_segment([
+            'GS', 'HP', 'SYNTHSENDER', 'SYNTHRECEIVER', transmission.strftime('%Y%m%d'), group_time,
+            control_number, 'X', VERSIONS[variant],  # GS08 matches the ISA12 of the variant
+        ], delimiters.element))
+
+        for transaction_set in range(shape.transaction_sets):
+            number = interchange * shape.transaction_sets + transaction_set
+            _write_transaction_set(write, delimiters, shape, f'{seed}:{number}', transaction_set + 1, claim_number)
+            claim_number += shape.claims
+
+        write(join_segment(['GE', str(shape.transaction_sets), control_number], delimiters.element))
+        write(join_segment(['IEA', '1', control_number.zfill(9)], delimiters.element))
+
+    write.flush()
+    return write.segments
+
+
+def write_file(path: str, shape: Shape = Shape(), seed: int = 0, **kwargs) -> int:
+    """Writes a synthetic EDI 835 file to `path`, see `generate`."""
+
+    with open(path, 'w', newline='') as f:
+        return generate(f, shape, seed, **kwargs)
+
+
+def _write_transaction_set(
+        write: '_Writer',
+        delimiters: Delimiters,
+        shape: Shape,
+        seed: str,
+        control_number: int,
+        first_claim: int,
+):
+    rng = random.Random(seed + ':header')
+    provider_adjustments = _provider_adjustments(rng, shape)
+
+    paid = sum(claim.paid for claim in _claims(random.Random(seed), shape))
+    if sum(provider_adjustments) > paid:
+        provider_adjustments = [-abs(amount) for amount in provider_adjustments]
+    amount_paid = paid - sum(provider_adjustments)
+
+    payer = rng.choice(_PAYERS)
+    payee = rng.choice(_PAYEES)
+    payee_id = _digits(rng, 10)
+    payment_date = _START + timedelta(days=rng.randrange(365))
+    method = rng.choice(('ACH', 'CHK')) if amount_paid else 'NON'
+
+    write.start_transaction_set()
+    write(join_segment(['ST', '835', f'{control_number:04d}'], delimiters.element))
+    write(FinancialInformationSegment([
+        'BPR', 'I' if amount_paid else 'H', _amount(amount_paid), 'C', method, 'CCP' if method == 'ACH' else '',
+        *[''] * 10, payment_date.strftime('%Y%m%d'),
+    ]).to_edi(delimiters))
+    write(join_segment(['TRN', '1', _digits(rng, 10), '1' + _digits(rng, 9)], delimiters.element))
+    write(DateSegment(['DTM', '405', payment_date.strftime('%Y%m%d')]).to_edi(delimiters))
+
+    for organization in (['N1', 'PR', payer], ['N1', 'PE', payee, 'XX', payee_id]):
+        city, state, zip_code = rng.choice(_CITIES)
+        write(OrganizationSegment(organization).to_edi(delimiters))
+        write(AddressSegment(['N3', f'{rng.randint(1, 9999)} MAIN ST']).to_edi(delimiters))
+        write(LocationSegment(['N4', city, state, zip_code]).to_edi(delimiters))
+    write(ReferenceSegment(['REF', 'TJ', _digits(rng, 9)]).to_edi(delimiters))
+
+    write(join_segment(['LX', '1'], delimiters.element))
+    for number, claim in enumerate(_claims(random.Random(seed), shape), first_claim + 1):
+        for segment in _claim_segments(claim, number, delimiters):
+            write(segment)
+        write.flush()
+
+    for index, amount in enumerate(provider_adjustments):
+        code = _PROVIDER_ADJUSTMENT_CODES[index % len(_PROVIDER_ADJUSTMENT_CODES)]
+        write(ProviderLevelAdjustmentSegment(
+            ['PLB', payee_id, f'{payment_date.year}1231', f'{code}{delimiters.component}{_digits(rng, 9)}', _amount(amount)],
+            delimiters.component,
+        ).to_edi(delimiters))
+
+    write(join_segment(['SE', str(write.transaction_set_segments + 1), f'{control_number:04d}'], delimiters.element))
+
+
+def _claims(rng: random.Random, shape: Shape) -> Iterator[_Claim]:
+    """Draws the claims of a transaction set, amounts in cents."""
+
+    for _ in range(shape.claims):
+        denied = rng.random() < shape.denial_rate
+        services = [_service_line(rng, shape, denied) for _ in range(max(1, _count(rng, shape.services)))]
+
+        charge = sum(service.charge for service in services)
+        paid = sum(service.paid for service in services)
+
+        adjustments = []
+        if not denied:
+            for _ in range(_count(rng, shape.claim_adjustments)):
+                group, reason, share = rng.choice(_ADJUSTMENTS)
+                cents = rng.randint(0, int(paid * share))
+                if cents:
+                    adjustments.append(_Adjustment(group, reason, cents))
+                    paid -= cents
+
+        patient_responsibility = sum(
+            adjustment.cents
+            for adjustments_ in (adjustments, *(service.adjustments for service in services))
+            for adjustment in adjustments_
+            if adjustment.group == 'PR'
+        )
+
+        yield _Claim(
+            status='4' if denied else rng.choice(('1', '1', '1', '2')),
+            charge=charge,
+            paid=paid,
+            patient_responsibility=patient_responsibility,
+            adjustments=adjustments,
+            services=services,
+            last_name=rng.choice(_LAST_NAMES),
+            first_name=rng.choice(_FIRST_NAMES),
+            member_id=_digits(rng, 11),
+            provider_id=_digits(rng, 10),
+        )
+
+
+def _service_line(rng: random.Random, shape: Shape, denied: bool) -> _ServiceLine:
+    units = rng.randint(1, 4)
+    charge = rng.randint(20, 1500) * 100 * units + rng.choice((0, 0, 50, 99))
+
+    adjustments = []
+    remaining = charge
+    if denied:
+        adjustments.append(_Adjustment(*_DENIAL, charge))
+        remaining = 0
+    else:
+        for _ in range(_count(rng, shape.service_adjustments)):
+            group, reason, share = rng.choice(_ADJUSTMENTS)
+            cents = rng.randint(1, max(1, int(remaining * share)))
+            if cents < remaining:
+                adjustments.append(_Adjustment(group, reason, cents))
+                remaining -= cents
+
+    contractual = sum(adjustment.cents for adjustment in adjustments if adjustment.group != 'PR')
+    return _ServiceLine(
+        procedure=rng.choice(_PROCEDURES),
+        modifier=rng.choice(_MODIFIERS) if rng.random() < 0.2 else None,
+        units=units,
+        charge=charge,
+        paid=remaining,
+        allowed=charge - contractual,
+        day=rng.randrange(365),
+        adjustments=adjustments,
+        remarks=[rng.choice(_REMARK_CODES) for _ in range(_count(rng, shape.remarks))],
+    )
+
+
+def _provider_adjustments(rng: random.Random, shape: Shape) -> List[int]:
+    return [rng.choice((-1, 1)) * rng.randint(100, 50000) for _ in range(_count(rng, shape.provider_adjustments))]
+
+
+def _claim_segments(claim: _Claim, number: int, delimiters: Delimiters) -> Iterator[str]:
+    first_day = min(service.day for service in claim.services)
+    last_day = max(service.day for service in claim.services)
+
+    yield ClaimSegment([
+        'CLP', f'PCN{number:09d}', claim.status, _amount(claim.charge), _amount(claim.paid),
+        _amount(claim.patient_responsibility), '12', f'{number:013d}',
+    ]).to_edi(delimiters)
+    for adjustment in claim.adjustments:
+        yield _adjustment_segment(adjustment, delimiters)
+    yield EntitySegment([
+        'NM1', 'QC', '1', claim.last_name, claim.first_name, '', '', '', 'MI', claim.member_id,
+    ]).to_edi(delimiters)
+    yield EntitySegment(['NM1', '82', '2', 'SYNTHETIC PROVIDER', '', '', '', '', 'XX', claim.provider_id]).to_edi(delimiters)
+    yield DateSegment(['DTM', '232', _day(first_day)]).to_edi(delimiters)
+    yield DateSegment(['DTM', '233', _day(last_day)]).to_edi(delimiters)
+    yield AmountSegment(['AMT', 'AU', _amount(sum(service.allowed for service in claim.services))]).to_edi(delimiters)
+
+    for line, service in enumerate(claim.services, 1):
+        procedure = join_segment(['HC', service.procedure, service.modifier], delimiters.component)
+        yield ServiceSegment(
+            ['SVC', procedure, _amount(service.charge), _amount(service.paid), '', str(service.units)],
+            delimiters.component,
+        ).to_edi(delimiters)
+        yield DateSegment(['DTM', '472', _day(service.day)]).to_edi(delimiters)
+        for adjustment in service.adjustments:
+            yield _adjustment_segment(adjustment, delimiters)
+        yield ReferenceSegment(['REF', '6R', f'{number}.{line}']).to_edi(delimiters)
+        yield AmountSegment(['AMT', 'B6', _amount(service.allowed)]).to_edi(delimiters)
+        for remark in service.remarks:
+            yield RemarkSegment(['LQ', 'HE', remark]).to_edi(delimiters)
+
+
+def _adjustment_segment(adjustment: _Adjustment, delimiters: Delimiters) -> str:
+    return ServiceAdjustmentSegment(
+        ['CAS', adjustment.group, adjustment.reason, _amount(adjustment.cents)],
+    ).to_edi(delimiters)
+
+
+class _Writer:
+    """Writes segments with their terminator, a claim at a time, and counts them."""
+
+    def __init__(self, output: TextIO, terminator: str):
+        self.output = output
+        self.terminator = terminator
+        self.segments = 0
+        self.transaction_set_segments = 0
+        self._pending: List[str] = []
+
+    def __call__(self, segment: str):
+        self._pending.append(segment)
+        self.segments += 1
+        self.transaction_set_segments += 1
+
+    def start_transaction_set(self):
+        self.transaction_set_segments = 0
+
+    def flush(self):
+        if self._pending:
+            self._pending.append('')
+            self.output.write(self.terminator.join(self._pending))
+            self._pending.clear()
+
+
+def _count(rng: random.Random, average: float) -> int:
+    whole = int(average)
+    return whole + (rng.random() < average - whole)
+
+
+def _amount(cents: int) -> str:
+    sign = '-' if cents < 0 else ''
+    cents = abs(cents)
+    return f'{sign}{cents // 100}.{cents % 100:02d}'
+
+
+def _day(offset: int) -> str:
+    return (_START + timedelta(days=offset)).strftime('%Y%m%d')
+
+
+def _digits(rng: random.Random, length: int) -> str:
+    return str(rng.randrange(10 ** (length - 1), 10 ** length))
+
+
+def _nth(text: str, separator: str, n: int) -> int:
+    position = -1
+    for _ in range(n):
+        position = text.index(separator, position + 1)
+    return position
+
+
+def main(argv: List[str]) -> int:
+    defaults = Shape()
+    parser = argparse.ArgumentParser(
+        prog='synthetic.py',
+        description='Write a reproducible synthetic EDI 835 file with made-up claims.',
+    )
+    parser.add_argument('output', help='The file to write.')
+    parser.add_argument('--seed', type=int, default=0, help='Seeds every random choice (default: 0).')
+    parser.add_argument('--variant', choices=VARIANTS, default=DEFAULT_VARIANT, help='The ISA/GS layout.')
+    parser.add_argument('--terminator', help='The segment terminator (default: a line break, as in the samples).')
+    parser.add_argument('--line-breaks', action='store_true', help='Follow each terminator with a line break.')
+    parser.add_argument('--wrap-header', action='store_true', help='Break the ISA line, as in EDI835BIG.txt.')
+    for name, value in defaults._asdict().items():
+        parser.add_argument(
+            '--' + name.replace('_', '-'), type=type(value), default=value, help=f'(default: {value})',
+        )
+    args = parser.parse_args(argv)
+
+    shape = Shape(**{name: getattr(args, name) for name in Shape._fields})
+    delimiters = VARIANTS[args.variant]
+    if args.terminator:
+        delimiters = delimiters._replace(segment=args.terminator)
+
+    start = time.perf_counter()
+    segments = write_file(
+        args.output, shape, args.seed,
+        variant=args.variant, delimiters=delimiters, line_breaks=args.line_breaks, wrap_header=args.wrap_header,
+    )
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f'{segments} segments in {elapsed:.2f}s: {segments / elapsed:.0f} segments/sec')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,135 @@
+import io
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import synthetic
+from balancing import balance, check_balance
+from columnar import ADJUSTMENTS, CLAIM_LEVEL, CLAIMS, PROVIDER_ADJUSTMENTS, SERVICES, TRANSACTION_SETS, export_columns
+from elements.dollars import money_in_cents
+from segment_reader import read_tokens
+from synthetic import Shape
+from transaction_set_builder import TransactionSetBuilder
+
+
+def tables(dtype, scale):
+    """Two claims of one transaction set; claim 1 and its service line are short by one cent.
+
+    Claim 0: charged 100, CO 45 of 20 on its service line, paid 80.
+    Claim 1: charged 50.5, CO 45 of 10 at claim level and 10 on its line, paid 30.49.
+    The payment (BPR02) is both claims less a PLB of 5.
+    """
+    def amounts(*values):
+        return numpy.array([round(value * scale) if scale != 1 else value for value in values], dtype=dtype)
+
+    keys = numpy.int64
+    return {
+        TRANSACTION_SETS: {
+            'transaction_set_id': numpy.array([0], dtype=keys),
+            'amount_paid': amounts(105.49),
+        },
+        CLAIMS: {
+            'claim_id': numpy.array([0, 1], dtype=keys),
+            'transaction_set_id': numpy.array([0, 0], dtype=keys),
+            'marker': numpy.array(['A', 'B']),
+            'charge_amount': amounts(100, 50.5),
+            'paid_amount': amounts(80, 30.49),
+        },
+        SERVICES: {
+            'service_id': numpy.array([0, 1], dtype=keys),
+            'claim_id': numpy.array([0, 1], dtype=keys),
+            'charge_amount': amounts(100, 40.5),
+            'paid_amount': amounts(80, 30.49),
+        },
+        ADJUSTMENTS: {
+            'claim_id': numpy.array([0, 1, 1], dtype=keys),
+            'service_id': numpy.array([0, CLAIM_LEVEL, 1], dtype=keys),
+            'amount': amounts(20, 10, 10),
+        },
+        PROVIDER_ADJUSTMENTS: {
+            'transaction_set_id': numpy.array([0], dtype=keys),
+            'amount': amounts(5),
+        },
+    }
+
+
+@unittest.skipIf(numpy is None, 'needs numpy')
+class CheckBalanceTest(unittest.TestCase):
+
+    def assert_short_by_a_cent(self, result, one_cent):
+        self.assertFalse(result.is_balanced)
+        self.assertEqual(len(result.transaction_sets['transaction_set_id']), 0)
+        self.assertEqual(result.claims['marker'].tolist(), ['B'])
+        self.assertEqual(result.claims['difference'].tolist(), [-one_cent])
+        self.assertEqual(result.services['service_id'].tolist(), [1])
+        self.assertEqual(result.services['difference'].tolist(), [-one_cent])
+
+    def test_float_dollars(self):
+        result = check_balance(tables(numpy.float64, 1))
+        self.assertEqual(result.claims['adjustment_amount'].tolist(), [20.0])
+        self.assertEqual(result.claims['expected'].tolist(), [30.5])
+        self.assert_short_by_a_cent(result, 0.01)
+
+    def test_int64_cents(self):
+        result = check_balance(tables(numpy.int64, 100))
+        self.assertEqual(result.claims['adjustment_amount'].dtype, numpy.int64)
+        self.assertEqual(result.claims['expected'].tolist(), [3050])
+        self.assert_short_by_a_cent(result, 1)
+
+    def test_paid_amounts_that_match_balance(self):
+        for dtype, scale in ((numpy.float64, 1), (numpy.int64, 100)):
+            with self.subTest(dtype=dtype.__name__):
+                data = tables(dtype, scale)
+                data[CLAIMS]['paid_amount'][1] = 30.5 * scale
+                data[SERVICES]['paid_amount'][1] = 30.5 * scale
+                data[TRANSACTION_SETS]['amount_paid'][0] = 105.5 * scale
+                self.assertTrue(check_balance(data).is_balanced)
+
+    def test_payment_against_claims_and_provider_adjustments(self):
+        data = tables(numpy.int64, 100)
+        data[TRANSACTION_SETS]['amount_paid'][0] = 11049
+        rows = check_balance(data).transaction_sets
+        self.assertEqual(rows['expected'].tolist(), [10549])
+        self.assertEqual(rows['difference'].tolist(), [500])
+
+
+@unittest.skipIf(numpy is None, 'needs numpy')
+class SyntheticBalanceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        output = io.StringIO()
+        synthetic.generate(output, Shape(transaction_sets=3, claims=40), seed=11)
+        cls.edi = output.getvalue()
+
+    def build(self):
+        return TransactionSetBuilder().build_all(read_tokens(io.StringIO(self.edi)))
+
+    def test_built_transaction_sets_balance(self):
+        self.assertTrue(balance(self.build()).is_balanced)
+        with money_in_cents():
+            transaction_sets = self.build()
+        self.assertTrue(balance(transaction_sets).is_balanced)
+
+    def test_columnar_tables_balance(self):
+        columns = export_columns(read_tokens(io.StringIO(self.edi)))
+        for cents in (False, True):
+            with self.subTest(cents=cents):
+                self.assertTrue(check_balance(columns.to_arrays(cents=cents)).is_balanced)
+
+    def test_a_changed_payment_is_reported(self):
+        transaction_sets = self.build()
+        claim = transaction_sets[1].claims[3].claim
+        claim.paid_amount = str(claim.paid_amount + 1)
+
+        result = balance(transaction_sets)
+        self.assertEqual(result.claims['marker'].tolist(), [claim.marker])
+        self.assertEqual(result.claims['difference'].tolist(), [1.0])
+        self.assertEqual(result.transaction_sets['transaction_set_id'].tolist(), [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from claim_index import NO_HEADER_NUMBER, ClaimIndex
+from segment_reader import read_tokens
+from transaction_set_builder import TransactionSetBuilder
+
+BIG_SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'EDI835BIG.txt')
+
+WITHOUT_HEADER_NUMBER = (
+    'ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       '
+    '*190101*1200*^*00501*000000001*0*P*:~'
+    'GS*HP*SENDER*RECEIVER*20190101*1200*1*X*005010X221A1~'
+    'ST*835*0001~'
+    'CLP*LOOSE*1*10*10**MC*ICN1~'
+    'LX*1~'
+    'CLP*INSIDE*1*20*20**MC*ICN2~'
+    'SE*5*0001~GE*1*1~IEA*1*000000001~'
+)
+
+
+class BigSampleIndexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(BIG_SAMPLE) as f:
+            cls.transaction_sets = TransactionSetBuilder().build_all(read_tokens(f))
+
+    def setUp(self):
+        self.index = ClaimIndex.build(BIG_SAMPLE)
+        self.addCleanup(self.index.close)
+
+    def test_every_loop_is_indexed(self):
+        self.assertEqual(len(self.index.interchanges), 1)
+        self.assertEqual(len(self.index.transaction_sets), 3)
+        self.assertEqual([claim.marker for claim in self.index.claims], ['77777777', '77777778', '77777779'])
+
+    def test_find_by_marker_and_by_icn(self):
+        by_marker, = self.index.find(marker='77777779')
+        by_icn, = self.index.find(icn='6666666666668')
+        self.assertEqual(by_marker, by_icn)
+        self.assertEqual(self.index.find(marker='missing'), [])
+
+    def test_read_claim_builds_what_the_whole_file_builds(self):
+        expected = self.transaction_sets[1].claims[1]
+        claim = self.index.read_claim(self.index.find(marker='77777779')[0])
+        self.assertEqual(claim.to_dict(), expected.to_dict())
+        self.assertEqual(claim.patient.last_name, 'HELD')
+
+    def test_claims_by_icn(self):
+        claim, = self.index.claims_by_icn('6666666666666')
+        self.assertEqual([adjustment.amount for adjustment in claim.adjustments], [50016.0, 22216.0])
+
+
+class SavedIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'remittance.835')
+        with open(self.path, 'w') as f:
+            f.write(WITHOUT_HEADER_NUMBER)
+
+    def test_claim_outside_an_lx_is_found_but_not_read(self):
+        with ClaimIndex.build(self.path) as index:
+            loose, = index.find(marker='LOOSE')
+            self.assertEqual(loose.header_number, NO_HEADER_NUMBER)
+            with self.assertRaises(ValueError):
+                index.read_claim(loose)
+
+            inside, = index.claims_by_marker('INSIDE')
+            self.assertEqual(inside.claim.icn, 'ICN2')
+
+    def test_open_reuses_the_saved_index_until_the_file_changes(self):
+        with ClaimIndex.open(self.path) as index:
+            entries = index.claims
+        self.assertTrue(os.path.exists(self.path + '.idx'))
+        with ClaimIndex.load(self.path) as index:
+            self.assertEqual(index.claims, entries)
+
+        with open(self.path, 'a') as f:
+            f.write('\n')
+        with self.assertRaises(ValueError):
+            ClaimIndex.load(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
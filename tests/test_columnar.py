@@ -0,0 +1,124 @@
+import csv
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from columnar import ADJUSTMENTS, CLAIM_LEVEL, CLAIMS, PROVIDER_ADJUSTMENTS, SERVICES, TABLES, ColumnarTables, export_columns
+from diagnostics import COMPONENT_SEPARATOR_MISMATCH
+from segment_reader import read_tokens
+from transaction_set_builder import TransactionSetBuilder
+
+DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SMALL_SAMPLE = os.path.join(DIRECTORY, 'EDI835input.txt')
+BIG_SAMPLE = os.path.join(DIRECTORY, 'EDI835BIG.txt')
+
+HEADER = [
+    ['ISA', '00', '', '00', '', 'ZZ', 'SENDER', 'ZZ', 'RECEIVER', '190101', '1200', '^', '00501', '1', '0', 'P', ':'],
+    ['ST', '835', '0001'],
+    ['BPR', 'I', '70', 'C', 'CHK'],
+    ['LX', '1'],
+    ['CLP', 'A', '1', '100', '70', '0', '12', 'ICN'],
+]
+
+
+def export(*segments):
+    return export_columns(iter(HEADER + [list(segment) for segment in segments])).columns
+
+
+class SampleTest(unittest.TestCase):
+
+    def test_procedure_is_split_with_the_separator_found(self):
+        with open(SMALL_SAMPLE) as f:
+            tables = export_columns(read_tokens(f))
+
+        services = tables.columns[SERVICES]
+        self.assertEqual((services['qualifier'], services['code']), (['HC'], ['99213']))
+
+        # ISA16 is '>' but the SVC uses ':', which the object model also reports
+        issue, = tables.diagnostics.summary()
+        self.assertEqual((issue.code, issue.location), (COMPONENT_SEPARATOR_MISMATCH, 'SVC.procedure'))
+
+    def test_rows_match_the_object_model(self):
+        with open(BIG_SAMPLE) as f:
+            transaction_sets = TransactionSetBuilder().build_all(read_tokens(f))
+        with open(BIG_SAMPLE) as f:
+            columns = export_columns(read_tokens(f)).columns
+
+        claims = [claim for transaction_set in transaction_sets for claim in transaction_set.claims]
+        self.assertEqual(columns[CLAIMS]['marker'], [claim.claim.marker for claim in claims])
+        self.assertEqual(columns[CLAIMS]['transaction_set_id'], [0, 1, 1])
+        self.assertEqual(columns[CLAIMS]['statement_period_start'], ['20180314', '20171001', '20180220'])
+        self.assertEqual(
+            len(columns[ADJUSTMENTS]['amount']), sum(len(claim.adjustments) for claim in claims)
+        )
+        self.assertEqual(set(columns[ADJUSTMENTS]['service_id']), {CLAIM_LEVEL})
+
+        provider_adjustment, = transaction_sets[2].provider_adjustments[0].adjustments
+        self.assertEqual(columns[PROVIDER_ADJUSTMENTS]['reason_code'], provider_adjustment.adjustment_reason_code)
+        self.assertEqual(columns[PROVIDER_ADJUSTMENTS]['transaction_set_id'], [2] * len(provider_adjustment.adjustment_reason_code))
+
+
+class ServiceUnitsTest(unittest.TestCase):
+
+    def test_missing_units_default_like_the_service_segment(self):
+        services = export(
+            ['SVC', 'HC:99213:25:59', '50', '50'],
+            ['SVC', 'HC:99214', '20', '0.00'],
+            ['SVC', 'HC:99215', '30', '20', '', '3'],
+            ['SVC', 'HC:99216', '30', '20', '', '3', '', '4'],
+        )[SERVICES]
+
+        self.assertEqual(services['allowed_units'], ['1', '0', '3', '3'])
+        self.assertEqual(services['billed_units'], ['1', '0', '3', '4'])
+        self.assertEqual(services['modifier'], ['25', '', '', ''])
+        self.assertEqual(services['claim_id'], [0, 0, 0, 0])
+
+
+class AdjustmentRowsTest(unittest.TestCase):
+
+    def test_one_row_per_triplet_and_empty_ones_skipped(self):
+        adjustments = export(
+            ['CAS', 'PR', '1', '10', '', '', '', '', '2', '5'],
+            ['SVC', 'HC:99213', '100', '70'],
+            ['CAS', 'CO', '45', '20', '1', '', '', '', '253', '', ''],
+        )[ADJUSTMENTS]
+
+        self.assertEqual(adjustments['service_id'], [CLAIM_LEVEL, CLAIM_LEVEL, 0, 0])
+        self.assertEqual(adjustments['group_code'], ['PR', 'PR', 'CO', 'CO'])
+        self.assertEqual(adjustments['reason_code'], ['1', '2', '45', '253'])
+        self.assertEqual(adjustments['amount'], ['10', '5', '20', ''])
+        self.assertEqual(adjustments['quantity'], ['', '', '1', ''])
+
+
+class OutputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tables = ColumnarTables().add(iter(HEADER + [['SVC', 'HC:99213', '100', '70'], ['DTM', '472', '20190105']]))
+
+    def test_write_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.tables.write_csv(directory)
+            self.assertEqual(sorted(os.listdir(directory)), sorted(table + '.csv' for table in TABLES))
+            with open(os.path.join(directory, SERVICES + '.csv'), newline='') as f:
+                row, = csv.DictReader(f)
+        self.assertEqual((row['code'], row['service_date'], row['allowed_units']), ('99213', '2019-01-05', '1'))
+
+    @unittest.skipIf(numpy is None, 'needs numpy')
+    def test_to_arrays(self):
+        dollars = self.tables.to_arrays()
+        cents = self.tables.to_arrays(cents=True)
+
+        self.assertEqual(dollars[CLAIMS]['paid_amount'].tolist(), [70.0])
+        self.assertEqual(cents[CLAIMS]['paid_amount'].dtype, numpy.int64)
+        self.assertEqual(cents[CLAIMS]['patient_responsibility_amount'].tolist(), [0])
+        self.assertTrue(numpy.isnat(dollars[CLAIMS]['statement_period_start'][0]))
+        self.assertEqual(str(dollars[SERVICES]['service_date'][0]), '2019-01-05')
+
+
+if __name__ == '__main__':
+    unittest.main()
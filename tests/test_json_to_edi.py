@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import unittest
+
+import synthetic
+from edi_to_json import edi_to_json
+from json_to_edi import EdiWriter, json_to_edi
+from segment_reader import read_tokens
+from synthetic import Shape
+from transaction_set_builder import TransactionSetBuilder
+
+DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SMALL_SAMPLE = os.path.join(DIRECTORY, 'EDI835input.txt')
+BIG_SAMPLE = os.path.join(DIRECTORY, 'EDI835BIG.txt')
+
+
+def split_segments(edi: str):
+    return [segment.split('*') for segment in edi.split('~') if segment]
+
+
+def to_json(edi: str) -> list:
+    transaction_sets = TransactionSetBuilder().build_all(read_tokens(io.StringIO(edi)))
+    return json.loads(json.dumps([transaction_set.to_dict() for transaction_set in transaction_sets]))
+
+
+def envelope(segments):
+    """For each ST..SE span: the SE01 written, the segments counted, and whether SE02 matches ST02."""
+    spans, start = [], None
+    for index, segment in enumerate(segments):
+        if segment[0] == 'ST':
+            start = index
+        elif segment[0] == 'SE':
+            spans.append((int(segment[1]), index - start + 1, segment[2] == segments[start][2]))
+    return spans
+
+
+class EnvelopeCountTest(unittest.TestCase):
+
+    def setUp(self):
+        with open(BIG_SAMPLE) as f:
+            self.transaction_sets = TransactionSetBuilder().build_all(read_tokens(f))
+
+    def write(self, transaction_sets):
+        output = io.StringIO()
+        with EdiWriter(output) as writer:
+            for transaction_set in transaction_sets:
+                writer.write_transaction_set(transaction_set)
+        return writer, split_segments(output.getvalue())
+
+    def test_se_counts_the_segments_from_st_to_se(self):
+        _, segments = self.write(self.transaction_sets)
+        for written, counted, same_control_number in envelope(segments):
+            self.assertEqual(written, counted)
+            self.assertTrue(same_control_number)
+
+    def test_one_group_for_the_transaction_sets_of_one_interchange(self):
+        writer, segments = self.write(self.transaction_sets)
+        identifiers = [segment[0] for segment in segments]
+
+        self.assertEqual(identifiers.count('ISA'), 1)
+        self.assertEqual(identifiers.count('ST'), 3)
+        self.assertEqual(segments[-2], ['GE', '3', '100000300'])
+        self.assertEqual(segments[-1], ['IEA', '1', '100000300'])
+        self.assertEqual(writer.segments, len(segments))
+
+    def test_a_new_interchange_closes_the_open_one(self):
+        first, second, third = [transaction_set.to_dict() for transaction_set in self.transaction_sets]
+        third['interchange']['interchange_control_number'] = '100000301'
+        _, segments = self.write([first, second, third])
+
+        closing = [segment for segment in segments if segment[0] in ('GE', 'IEA')]
+        self.assertEqual(closing, [
+            ['GE', '2', '100000300'],
+            ['IEA', '1', '100000300'],
+            ['GE', '1', '100000301'],
+            ['IEA', '1', '100000301'],
+        ])
+        self.assertEqual([segment[2] for segment in segments if segment[0] == 'ST'], ['0001', '0002', '0001'])
+
+    def test_writing_a_claim_outside_a_transaction_set_fails(self):
+        writer = EdiWriter(io.StringIO())
+        with self.assertRaises(ValueError):
+            writer.write_claim(self.transaction_sets[0].claims[0])
+
+
+class InterchangeRoundTripTest(unittest.TestCase):
+
+    def test_isa_fields_are_written_back(self):
+        edi = json_to_edi(edi_to_json(BIG_SAMPLE))
+        isa = split_segments(edi)[0]
+
+        self.assertEqual(isa[5:9], ['ZZ', 'NVMED          ', 'ZZ', '99999999       '])
+        self.assertEqual(isa[9:13], ['180613', '1230', '^', '00501'])
+        self.assertEqual(isa[13:16], ['100000300', '0', 'P'])
+
+    def test_gs08_follows_the_isa_version(self):
+        for path, version in ((BIG_SAMPLE, '005010X221A1'), (SMALL_SAMPLE, '004010X091A1')):
+            with self.subTest(path=os.path.basename(path)):
+                gs = split_segments(json_to_edi(edi_to_json(path)))[1]
+                self.assertEqual(gs[0], 'GS')
+                self.assertEqual(gs[8], version)
+
+    def test_synthetic_file_survives_the_round_trip(self):
+        output = io.StringIO()
+        synthetic.generate(output, Shape(interchanges=2, transaction_sets=2, claims=5), seed=3)
+
+        first = to_json(output.getvalue())
+        self.assertEqual(len(first), 4)
+        self.assertEqual(to_json(json_to_edi(json.dumps(first))), first)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import unittest
+
+from diagnostics import UNHANDLED_SEGMENT
+from loop_grammar import CLAIM, LOOPS, SERVICE, TRANSACTION_SET, compile_grammar
+from segment_reader import read_tokens
+from transaction_set_builder import TransactionSetBuilder
+
+DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SMALL_SAMPLE = os.path.join(DIRECTORY, 'EDI835input.txt')
+BIG_SAMPLE = os.path.join(DIRECTORY, 'EDI835BIG.txt')
+
+
+def build_all(path):
+    with open(path) as f:
+        return TransactionSetBuilder().build_all(read_tokens(f))
+
+
+class CompiledGrammarTest(unittest.TestCase):
+
+    def test_root_is_the_transaction_set(self):
+        root, transitions = compile_grammar(LOOPS)
+        self.assertEqual(root.name, TRANSACTION_SET)
+        self.assertIn(root.name, transitions)
+
+    def test_svc_opens_a_service_loop_from_a_claim(self):
+        _, transitions = compile_grammar(LOOPS)
+        transition = transitions[CLAIM]['SVC']
+        self.assertEqual(transition.loop.name, SERVICE)
+
+    def test_clp_closes_the_service_loop(self):
+        _, transitions = compile_grammar(LOOPS)
+        transition = transitions[SERVICE]['CLP']
+        self.assertEqual(transition.loop.name, CLAIM)
+        self.assertGreaterEqual(transition.close, 2)
+
+
+class SmallSampleTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.transaction_sets = build_all(SMALL_SAMPLE)
+
+    def test_one_transaction_set_with_one_claim(self):
+        self.assertEqual(len(self.transaction_sets), 1)
+        self.assertEqual([claim.claim.marker for claim in self.transaction_sets[0].claims], ['CLAIM123'])
+
+    def test_payer_and_payee(self):
+        transaction_set = self.transaction_sets[0]
+        self.assertEqual(transaction_set.payer.organization.name, 'PAYERNAME')
+        self.assertEqual(transaction_set.payee.organization.name, 'PAYEENAME')
+
+    def test_segments_after_svc_belong_to_the_service_line(self):
+        claim = self.transaction_sets[0].claims[0]
+        self.assertEqual(claim.adjustments, [])
+        self.assertEqual(len(claim.services), 1)
+
+        service = claim.services[0]
+        self.assertEqual(service.service.code, '99213')
+        self.assertEqual(len(service.dates), 1)
+        self.assertEqual([adjustment.amount for adjustment in service.adjustments], [25.0])
+
+    def test_patient_is_indexed_on_the_claim(self):
+        self.assertEqual(self.transaction_sets[0].claims[0].patient.identification_code, 'MEMBERID123')
+
+
+class BigSampleTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.transaction_sets = build_all(BIG_SAMPLE)
+
+    def test_every_transaction_set_keeps_its_own_claims(self):
+        self.assertEqual([len(transaction_set.claims) for transaction_set in self.transaction_sets], [1, 2, 0])
+        self.assertEqual(
+            [claim.claim.marker for claim in self.transaction_sets[1].claims], ['77777778', '77777779']
+        )
+
+    def test_cas_before_nm1_is_a_claim_adjustment(self):
+        claim = self.transaction_sets[0].claims[0]
+        self.assertEqual([adjustment.amount for adjustment in claim.adjustments], [50016.0, 22216.0])
+        self.assertEqual(claim.services, [])
+
+    def test_claim_dates_by_qualifier(self):
+        claim = self.transaction_sets[1].claims[1]
+        self.assertEqual(claim.claim_statement_period_start.date.strftime('%Y%m%d'), '20180220')
+        self.assertEqual(claim.claim_statement_period_end.date.strftime('%Y%m%d'), '20180221')
+
+    def test_provider_adjustment_in_the_last_transaction_set(self):
+        self.assertEqual([len(transaction_set.provider_adjustments) for transaction_set in self.transaction_sets], [0, 0, 1])
+
+    def test_each_transaction_set_has_the_interchange(self):
+        for transaction_set in self.transaction_sets:
+            self.assertEqual(transaction_set.interchange.interchange_control_number, '100000300')
+
+
+class UnhandledSegmentTest(unittest.TestCase):
+
+    def test_unmodeled_segment_in_a_claim_is_reported_once_per_location(self):
+        segments = [
+            ['ST', '835', '0001'],
+            ['LX', '1'],
+            ['CLP', 'A', '1', '10', '10', '0'],
+            ['MIA', '', '', '', '0'],
+            ['CLP', 'B', '1', '10', '10', '0'],
+            ['MIA', '', '', '', '0'],
+            ['SE', '6', '0001'],
+        ]
+        transaction_set = TransactionSetBuilder().build(iter(segments))
+
+        self.assertEqual(len(transaction_set.claims), 2)
+        issues = transaction_set.diagnostics.summary()
+        self.assertEqual([(issue.code, issue.location, issue.count) for issue in issues], [
+            (UNHANDLED_SEGMENT, f'{CLAIM} MIA', 2),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from claim_index import ClaimIndex
+from mapped_reader import _HEADER_PROBE, read_views
+from segment_reader import read_tokens
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'EDI835input.txt')
+
+
+def _straddling_sample() -> bytes:
+    """The sample with a payer name padded so that an 'é' straddles the end of the ISA probe."""
+    with open(SAMPLE_FILE, 'rb') as f:
+        data = f.read()
+
+    name = b'PAYERNAME'
+    position = data.index(name) + len(name)
+    padding = b'A' * (_HEADER_PROBE - 1 - position)
+    data = data[:position] + padding + 'é'.encode() + data[position:]
+    assert data[_HEADER_PROBE - 1:_HEADER_PROBE + 1] == 'é'.encode()
+    return data
+
+
+class MultibyteProbeBoundaryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = _straddling_sample()
+
+    def test_read_views(self):
+        with open(SAMPLE_FILE) as f:
+            expected = list(read_tokens(f))
+        views = [list(view) for view in read_views(self.data)]
+        self.assertEqual(len(views), len(expected))
+        self.assertTrue(any(element.endswith('é') for view in views for element in view))
+
+    def test_claim_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'straddling.835')
+            with open(path, 'wb') as f:
+                f.write(self.data)
+            with ClaimIndex.build(path) as index:
+                self.assertEqual(len(index.claims_by_marker('CLAIM123')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
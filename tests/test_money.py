@@ -0,0 +1,100 @@
+import threading
+import unittest
+
+from elements import lazy_decoding
+from elements.dollars import format_amount, format_cents, is_in_cents, money_in_cents, parse_cents
+from segments.claim import Claim
+from segments.provider_level_adjustment import ProviderLevelAdjustment
+
+CLAIM = ['CLP', 'CLAIM1', '1', '125.00', '99.995', '-10.5', '12', 'ICN1']
+PLB = ['PLB', '1234567890', '20190401', 'WO:ABC', '-1092.46', 'L6', '0.01']
+
+
+class ParseCentsTest(unittest.TestCase):
+
+    def test_whole_and_short_fractions(self):
+        self.assertEqual(parse_cents('125'), 12500)
+        self.assertEqual(parse_cents('125.5'), 12550)
+        self.assertEqual(parse_cents('.5'), 50)
+        self.assertEqual(parse_cents('0.01'), 1)
+
+    def test_negative_amounts(self):
+        self.assertEqual(parse_cents('-10.5'), -1050)
+        self.assertEqual(parse_cents('-0.5'), -50)
+        self.assertEqual(parse_cents('-7'), -700)
+
+    def test_rounds_half_away_from_zero(self):
+        self.assertEqual(parse_cents('1.005'), 101)
+        self.assertEqual(parse_cents('1.004'), 100)
+        self.assertEqual(parse_cents('-1.005'), -101)
+        self.assertEqual(parse_cents('-0.009'), -1)
+
+    def test_does_not_go_through_float(self):
+        # float('0.285') * 100 is 28.499999999999996
+        self.assertEqual(parse_cents('0.285'), 29)
+
+
+class FormatTest(unittest.TestCase):
+
+    def test_format_cents(self):
+        self.assertEqual(format_cents(12500), '125')
+        self.assertEqual(format_cents(-1050), '-10.5')
+        self.assertEqual(format_cents(1), '0.01')
+        self.assertEqual(format_cents(0), '0')
+
+    def test_format_amount_writes_both_modes_alike(self):
+        self.assertEqual(format_amount(-10.5), format_amount(-1050))
+        self.assertEqual(format_amount(-0.001), '0')
+        self.assertEqual(format_amount(None), '')
+
+
+class MoneyModeTest(unittest.TestCase):
+
+    def test_amounts_are_cents_inside_the_block(self):
+        with money_in_cents():
+            claim = Claim(CLAIM)
+        self.assertEqual((claim.charge_amount, claim.paid_amount, claim.patient_responsibility_amount), (12500, 10000, -1050))
+        self.assertEqual(Claim(CLAIM).charge_amount, 125.0)
+
+    def test_lazy_amounts_keep_the_mode_they_were_built_in(self):
+        with lazy_decoding(), money_in_cents():
+            claim = Claim(CLAIM)
+        self.assertFalse(is_in_cents())
+        self.assertEqual(claim.patient_responsibility_amount, -1050)
+
+    def test_to_dict_writes_dollars_in_both_modes(self):
+        segment = CLAIM[:4] + ['100.01'] + CLAIM[5:]
+        with money_in_cents():
+            in_cents = Claim(segment).to_dict()
+        self.assertEqual(in_cents['paid_amount'], 100.01)
+        self.assertEqual(in_cents, Claim(segment).to_dict())
+
+    def test_provider_adjustment_amounts(self):
+        with lazy_decoding(), money_in_cents():
+            adjustment = ProviderLevelAdjustment(PLB)
+        self.assertEqual(adjustment.adjustment_amount, [-109246, 1])
+        self.assertEqual(adjustment.to_dict()['adjustment_amount'], [-1092.46, 0.01])
+        self.assertEqual(adjustment.to_edi(), 'PLB*1234567890*20190401*WO:ABC*-1092.46*L6*0.01')
+
+    def test_mode_is_per_thread(self):
+        seen = []
+        started, release = threading.Event(), threading.Event()
+
+        def build_in_dollars():
+            started.set()
+            release.wait()
+            seen.append(Claim(CLAIM).charge_amount)
+
+        thread = threading.Thread(target=build_in_dollars)
+        with money_in_cents():
+            thread.start()
+            started.wait()
+            release.set()
+            thread.join()
+            seen.append(Claim(CLAIM).charge_amount)
+
+        self.assertEqual(seen, [125.0, 12500])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import unittest
+
+from edi_to_json import edi_to_json
+from elements import lazy_decoding
+from elements.dollars import money_in_cents
+from json_to_edi import json_to_edi
+from segments.claim import Claim
+from segments.date import Date
+from segments.entity import Entity
+from segments.financial_information import FinancialInformation
+from segments.interchange import Interchange
+from segments.provider_level_adjustment import ProviderLevelAdjustment
+from segments.service import Service
+from segments.service_adjustment import ServiceAdjustment
+from serialization import dumps, set_json_backend
+from transaction_set_builder import TransactionSet
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'EDI835input.txt')
+
+# one raw segment per class, with the elements that need more than a plain copy back
+SEGMENTS = [
+    (Interchange, 'ISA*00*          *00*          *ZZ*NVMED          *ZZ*99999999       '
+                  '*180613*1230*^*00501*100000300*0*P*:'),
+    (FinancialInformation, 'BPR*I*1812.27*C*CHK************20180727'),
+    (Claim, 'CLP*77777779*4*41231.04*0**MC*6666666666668'),
+    (Entity, 'NM1*QC*1*HELD*ALLEN****MR*77777777778'),
+    (Date, 'DTM*472*20120801'),
+    (Service, 'SVC*HC:99213:25:59:GT*125.5*100**2*HC:99214*3'),
+    (Service, 'SVC*HC:99213*125*0'),
+    (ServiceAdjustment, 'CAS*CO*45*10*1*253*1.5**59*2*3*94*0.25**B7*4*2*A1*5'),
+    (ProviderLevelAdjustment, 'PLB*8888888888*20181231*CT:888888*-1092.46*WO*-719.81*FB:ABC*0.5'),
+]
+
+
+def parse(segment_class, text):
+    return segment_class(text.split('*'))
+
+
+def round_trip(transaction_sets: list) -> list:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'round_trip.835')
+        with open(path, 'w') as f:
+            f.write(json_to_edi(json.dumps(transaction_sets)))
+        return json.loads(edi_to_json(path, array=True))
+
+
+class SegmentRoundTripTest(unittest.TestCase):
+
+    def test_from_dict_restores_what_to_dict_wrote(self):
+        for segment_class, text in SEGMENTS:
+            with self.subTest(segment=text[:3]):
+                data = parse(segment_class, text).to_dict()
+                restored = segment_class.from_dict(data)
+                self.assertIsNone(restored.segment)
+                self.assertEqual(restored.to_dict(), data)
+
+    def test_restored_segments_write_the_same_edi(self):
+        for segment_class, text in SEGMENTS:
+            with self.subTest(segment=text[:3]):
+                segment = parse(segment_class, text)
+                self.assertEqual(segment_class.from_dict(segment.to_dict()).to_edi(), segment.to_edi())
+
+    def test_to_dict_is_json_safe_and_the_same_in_every_mode(self):
+        for segment_class, text in SEGMENTS:
+            with self.subTest(segment=text[:3]):
+                eager = parse(segment_class, text).to_dict()
+                with lazy_decoding(), money_in_cents():
+                    lazy = parse(segment_class, text)
+                self.assertEqual(lazy.to_dict(), eager)
+                self.assertEqual(json.loads(json.dumps(eager)), eager)
+
+    def test_derived_fields(self):
+        service = parse(Service, 'SVC*HC:99213:25:59:GT*125.5*100**2*HC:99214*3').to_dict()
+        self.assertEqual((service['qualifier'], service['code'], service['modifier']), ('HC', '99213', '25'))
+        self.assertEqual(service['modifiers'], ['25', '59', 'GT'])
+        self.assertEqual((service['allowed_units'], service['billed_units']), (2, 3))
+
+        adjustment = parse(ServiceAdjustment, 'CAS*CO*45*10*1*253*1.5**59*2*3*94*0.25**B7*4*2*A1*5').to_dict()
+        self.assertEqual(len(adjustment['additional_adjustments']), 5)
+        self.assertEqual(adjustment['total_amount'], 22.75)
+
+    def test_private_slots_are_not_written(self):
+        for segment_class, text in SEGMENTS:
+            with self.subTest(segment=text[:3]):
+                data = parse(segment_class, text).to_dict()
+                self.assertFalse([name for name in data if name.startswith('_') or name == 'segment'])
+
+    def test_loops_are_not_restored(self):
+        with self.assertRaises(TypeError):
+            TransactionSet.from_dict({})
+
+
+class FileRoundTripTest(unittest.TestCase):
+
+    def test_json_written_back_reads_as_the_same_json(self):
+        first = json.loads(edi_to_json(SAMPLE_FILE, array=True))
+        second = round_trip(first)
+
+        # the envelope is written padded and with the writer's delimiters, the loops as they were
+        for name in ('financial_information', 'claims', 'provider_adjustments'):
+            self.assertEqual(second[0][name], first[0][name])
+        self.assertEqual(second[0]['interchange']['interchange_control_number'], '000000999')
+        self.assertEqual(round_trip(second), second)
+
+
+class JsonBackendTest(unittest.TestCase):
+
+    def tearDown(self):
+        set_json_backend('json')
+
+    def test_callable_backend(self):
+        set_json_backend(lambda obj, indent: 'custom')
+        self.assertEqual(parse(Date, 'DTM*472*20120801').to_json(), 'custom')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            set_json_backend('yaml')
+        self.assertEqual(dumps({'a': 1}), '{"a": 1}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,103 +1,262 @@
-from typing import List, Dict, Iterator, Optional, Tuple
-from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, List, Iterator, Optional, Tuple
 
-from loop_builder import LoopBuilder
+from diagnostics import DEFAULT_SAMPLES, UNHANDLED_SEGMENT, Diagnostics, activate
+from instrumentation import LOOP_BUILDING, Stats
+from loop_grammar import CLAIM, LOOPS, Loop, compile_grammar
 from segments.interchange import Interchange as InterchangeSegment
 from segments.financial_information import FinancialInformation as FinancialInformationSegment
-from utilities import find_identifier
+from utilities import DEFAULT_DELIMITERS, TrackedList
+from serialization import Serializable
 from loops.organization import Organization as OrganizationLoop
 from loops.claim import Claim as ClaimLoop
 from loops.provider_adjustment import ProviderAdjustment as ProviderAdjustmentLoop
 
-BuildAttributeResponse = namedtuple('BuildAttributeResponse', 'key value segment segments')
+TRANSACTION_SET_TRAILER = 'SE'
 
+ClaimHandler = Callable[['TransactionSet', ClaimLoop], None]
 
 class TransactionSetBuilder:
     """Constructs the complete EDI 835 transaction set."""
 
-    def __init__(self, segment_delimiter: str = "*"):
-        self.loop_builder = LoopBuilder(segment_delimiter)
+    def __init__(
+            self,
+            loops: Tuple[Loop, ...] = LOOPS,
+            keep_segments: bool = True,
+            stats: Optional[Stats] = None,
+            diagnostics: Optional[Diagnostics] = None,
+            diagnostic_samples: int = DEFAULT_SAMPLES,
+    ):
+        """
+        Args:
+            loops (Tuple[Loop, ...]): The loop grammar to build with.
+            keep_segments (bool): Keep each segment's tokens on its `segment` attribute. Turning
+                this off roughly halves the memory held per claim.
+            stats (Optional[Stats]): Records the time spent reading segments, building loops and
+                decoding elements, and the segments and objects seen, on every build. The
+                grammar is compiled with timed constructors only when given.
+            diagnostics (Optional[Diagnostics]): Collects the issues of every build, e.g. segments a
+                loop does not handle and dates that do not parse. By default each transaction set
+                gets its own collector on `TransactionSet.diagnostics`.
+            diagnostic_samples (int): How many values each default collector keeps per issue.
+        """
+        self.root, self.transitions = compile_grammar(loops if stats is None else stats.instrument(loops))
+        self.keep_segments = keep_segments
+        self.stats = stats
+        self.diagnostics = diagnostics
+        self.diagnostic_samples = diagnostic_samples
 
-    def build(self, segments: Iterator[str]) -> 'TransactionSet':
-        """Builds the EDI 835 transaction set from the segments.
+    def build(self, segments: Iterator[List[str]]) -> 'TransactionSet':
+        """Builds the EDI 835 transaction set from the segments in a single pass.
+
+        Each segment is looked up in the transition table of the innermost open
+        loop, which tells how many loops to close, which loop (if any) the
+        segment opens and where the segment is stored. Every ST/SE transaction set
+        in the segments is collected into the one returned; use `build_all` to
+        keep them apart.
 
         Args:
-            segments (Iterator[str]): An iterator of EDI segments.
+            segments (Iterator[List[str]]): An iterator of tokenized EDI segments, as
+                yielded by `segment_reader.read_tokens`.
 
         Returns:
             TransactionSet: The built transaction set.
         """
 
-        interchange = None
-        financial_information = None
-        claims = []
-        organizations = []
-        provider_adjustments = []  # Add a list to store provider adjustments
+        transaction_set, = self._run(segments, split=False)
+        return transaction_set
 
-        loop_structure = self.loop_builder.build(segments)
-        segments = iter(loop_structure)
-        segment = None
+    def build_all(self, segments: Iterator[List[str]]) -> List['TransactionSet']:
+        """Builds one TransactionSet per ST/SE transaction set, in file order.
 
-        while True:
-            response = self._build_attribute(segment, segments)
-            segment = response.segment
-            segments = response.segments
+        Each transaction set keeps the ISA of the interchange it was sent in.
 
-            if response.segments is None:
-                break
+        Args:
+            segments (Iterator[List[str]]): An iterator of tokenized EDI segments.
+
+        Returns:
+            List[TransactionSet]: The built transaction sets.
+        """
 
-            if response.key == 'interchange':
-                interchange = response.value
+        return list(self.iter_build(segments))
 
-            if response.key == 'financial information':
-                financial_information = response.value
+    def iter_build(
+            self,
+            segments: Iterator[List[str]],
+            on_claim: Optional[ClaimHandler] = None,
+    ) -> Iterator['TransactionSet']:
+        """Like `build_all`, but yields each transaction set as soon as its SE is read.
+
+        Args:
+            segments (Iterator[List[str]]): An iterator of tokenized EDI segments.
+            on_claim (Optional[ClaimHandler]): Called with the transaction set and each claim
+                as soon as the claim's loop is complete. Claims handed to it are not kept on
+                the transaction set, so memory no longer grows with the number of claims.
 
-            if response.key == 'organization':
-                organizations.append(response.value)
+        Yields:
+            TransactionSet: The built transaction sets.
+        """
 
-            if response.key == 'claim':
-                claims.append(response.value)
-            
-            if response.key == 'provider_adjustment':  # Handle provider adjustments
-                provider_adjustments.append(response.value)
+        return self._run(segments, split=True, on_claim=on_claim)
 
-        return TransactionSet(interchange, financial_information, claims, organizations, provider_adjustments)
+    def _run(
+            self,
+            segments: Iterator[List[str]],
+            split: bool,
+            on_claim: Optional[ClaimHandler] = None,
+    ) -> Iterator['TransactionSet']:
+        if self.stats is None:
+            return self._build(segments, split, on_claim)
+        return self._timed_build(segments, split, on_claim)
 
-    def _build_attribute(self, segment: Optional[Dict], segments: Iterator[List[Dict]]) -> BuildAttributeResponse:
-        if segment is None:
+    def _timed_build(
+            self,
+            segments: Iterator[List[str]],
+            split: bool,
+            on_claim: Optional[ClaimHandler] = None,
+    ) -> Iterator['TransactionSet']:
+        stats = self.stats
+        transaction_sets = self._build(stats.count_segments(segments), split, on_claim)
+        while True:
+            previous = stats.switch(LOOP_BUILDING)
             try:
-                segment = segments.__next__()
+                transaction_set = next(transaction_sets)
             except StopIteration:
-                return BuildAttributeResponse(None, None, None, None)
+                return
+            finally:
+                stats.switch(previous)
+            stats.objects[f'{__name__}.{TransactionSet.__qualname__}'] += 1
+            yield transaction_set
+
+    def _build(
+            self,
+            segments: Iterator[List[str]],
+            split: bool,
+            on_claim: Optional[ClaimHandler] = None,
+    ) -> Iterator['TransactionSet']:
+        transaction_set = TransactionSet(None, None, [], [], diagnostics=self._diagnostics())
+        component_separator = DEFAULT_DELIMITERS.component
+        # elements report parse issues to the active collector, which is only ours while this generator runs
+        previous_diagnostics = activate(transaction_set.diagnostics)
+
+        loops = [self.root]
+        containers = [transaction_set]
+        transitions = self.transitions[self.root.name]
+
+        try:
+            for segment in segments:
+                identifier = segment[0]
+                transition = transitions.get(identifier)
+
+                if type(transition) is dict:
+                    transition = transition.get(segment[1] if len(segment) > 1 else None)
+
+                if transition is None:
+                    if self.stats is not None:
+                        self.stats.unknown[loops[-1].name, identifier] += 1
+                    if loops[-1].strict:
+                        transaction_set.diagnostics.report(UNHANDLED_SEGMENT, f'{loops[-1].name} {identifier}', segment)
+                    continue
+
+                if transition.close:
+                    if on_claim is not None:
+                        _close_claims(transaction_set, loops, containers, transition.close, on_claim)
+                    del loops[-transition.close:]
+                    del containers[-transition.close:]
+
+                loop = transition.loop
+                if loop is not None:
+                    container = containers[-1]
+                    if loop.container is not None:
+                        container = loop.container()
+                        if on_claim is None or loop.name != CLAIM:
+                            _append(containers[-1], loop.attribute, container)
+
+                    loops.append(loop)
+                    containers.append(container)
+
+                if transition.close or loop is not None:
+                    transitions = self.transitions[loops[-1].name]
+
+                if split and identifier == TRANSACTION_SET_TRAILER:
+                    activate(previous_diagnostics)
+                    yield transaction_set
+                    transaction_set = TransactionSet(
+                        transaction_set.interchange, None, [], [], diagnostics=self._diagnostics()
+                    )
+                    containers[0] = transaction_set
+                    previous_diagnostics = activate(transaction_set.diagnostics)
+
+                route = transition.route
+                if route.segment is None:
+                    continue
+
+                if route.composite:
+                    value = route.segment(segment, component_separator)
+                else:
+                    value = route.segment(segment)
 
-        identifier = find_identifier(segment)
+                if not self.keep_segments:
+                    value.segment = None
 
-        if identifier == InterchangeSegment.identification:
-            interchange = InterchangeSegment(segment[identifier][0])
-            return BuildAttributeResponse('interchange', interchange, None, segments)
+                if route.repeats:
+                    _append(containers[-1], route.attribute, value)
+                    if route.index is not None:
+                        _add_to_index(containers[-1], route.index, getattr(value, route.key), value)
+                else:
+                    setattr(containers[-1], route.attribute, value)
 
-        if identifier == FinancialInformationSegment.identification:
-            financial_information = FinancialInformationSegment(segment[identifier][0])
-            return BuildAttributeResponse('financial information', financial_information, None, segments)
+                if identifier == InterchangeSegment.identification:
+                    component_separator = value.component_element_separator
 
-        if identifier == OrganizationLoop.initiating_identifier:
-            organization, segments, segment = OrganizationLoop.build(segment, segments)
-            return BuildAttributeResponse('organization', organization, segment, segments)
+            if on_claim is not None:
+                _close_claims(transaction_set, loops, containers, len(loops), on_claim)
+        finally:
+            activate(previous_diagnostics)
 
-        elif identifier == ClaimLoop.initiating_identifier:
-            claim, segments, segment = ClaimLoop.build(segment, segments)
-            return BuildAttributeResponse('claim', claim, segment, segments)
-        
-        elif identifier == ProviderAdjustmentLoop.initiating_identifier:  # Handle provider adjustments
-            provider_adjustment, segments, segment = ProviderAdjustmentLoop.build(segment, segments)
-            return BuildAttributeResponse('provider_adjustment', provider_adjustment, segment, segments)
+        if not split or not transaction_set.is_empty:
+            yield transaction_set
 
-        else:
-            return BuildAttributeResponse(None, None, segment, segments)
+    def _diagnostics(self) -> Diagnostics:
+        return self.diagnostics if self.diagnostics is not None else Diagnostics(self.diagnostic_samples)
 
 
-class TransactionSet:
-    """Represents a complete EDI 835 transaction set."""
+def _close_claims(
+        transaction_set: 'TransactionSet',
+        loops: List[Loop],
+        containers: list,
+        close: int,
+        on_claim: ClaimHandler,
+):
+    """Hands the claim among the innermost `close` open loops, if any, to `on_claim`."""
+    for loop, container in zip(loops[-close:], containers[-close:]):
+        if loop.name == CLAIM:
+            on_claim(transaction_set, container)
+
+
+def _append(container, attribute: str, value):
+    getattr(container, attribute).append(value)
+
+
+def _add_to_index(container, index: str, key, value):
+    """Adds to a keyed index, replacing the shared empty default with a dictionary."""
+    values = getattr(container, index)
+    if values:
+        values.setdefault(key, []).append(value)
+    else:
+        setattr(container, index, {key: [value]})
+
+
+class TransactionSet(Serializable):
+    """Represents a complete EDI 835 transaction set.
+
+    Claims can be looked up by CLP01, payer claim control number (CLP07) or
+    patient identification code (NM1*QC) through hash indexes that are built
+    on the first lookup. `claims` and `organizations` are `TrackedList`s: the
+    indexes are rebuilt after the lists are modified or replaced, but not when
+    a claim already in the list is edited; call `invalidate_indexes` then.
+    """
+    nested_fields = ('interchange', 'financial_information')
+    repeating_fields = ('organizations', 'claims', 'provider_adjustments')
 
     def __init__(
             self,
@@ -106,7 +265,10 @@ class TransactionSet:
             claims: List[ClaimLoop],
             organizations: List[OrganizationLoop],
             provider_adjustments: List[ProviderAdjustmentLoop] = None, # Add provider adjustments
+            diagnostics: Optional[Diagnostics] = None,
     ):
+        self._indexes: Dict[str, Tuple[int, Dict[Any, list]]] = {}
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
         self.interchange = interchange
         self.financial_information = financial_information
         self.claims = claims
@@ -114,19 +276,96 @@ class TransactionSet:
         self.provider_adjustments = provider_adjustments if provider_adjustments else [] # Add provider adjustments
 
     def __repr__(self):
-        return '\n'.join(str(item) for item in self.__dict__.items())
+        return '\n'.join(str((name, getattr(self, name))) for name in self.nested_fields + self.repeating_fields)
+
+    @property
+    def claims(self) -> List[ClaimLoop]:
+        return self._claims
+
+    @claims.setter
+    def claims(self, claims: List[ClaimLoop]):
+        self._claims = claims if type(claims) is TrackedList else TrackedList(claims)
+        self.invalidate_indexes()
+
+    @property
+    def organizations(self) -> List[OrganizationLoop]:
+        return self._organizations
+
+    @organizations.setter
+    def organizations(self, organizations: List[OrganizationLoop]):
+        self._organizations = organizations if type(organizations) is TrackedList else TrackedList(organizations)
+        self.invalidate_indexes()
+
+    @property
+    def is_empty(self) -> bool:
+        """True if no segment of an ST/SE transaction set has been stored yet."""
+        return (
+            self.financial_information is None
+            and not self.claims
+            and not self.organizations
+            and not self.provider_adjustments
+        )
 
     @property
     def payer(self) -> OrganizationLoop:
-        payer = [o for o in self.organizations if o.organization.type == 'payer']
+        payer = self._organizations_by_type().get('payer', ())
         assert len(payer) == 1
         return payer[0]
 
     @property
     def payee(self) -> OrganizationLoop:
-        payee = [o for o in self.organizations if o.organization.type == 'payee']
+        payee = self._organizations_by_type().get('payee', ())
         assert len(payee) == 1
         return payee[0]
 
+    def claims_by_marker(self, marker: str) -> List[ClaimLoop]:
+        """Returns the claims whose CLP01 (patient control number) is `marker`, in file order."""
+        return self._index('marker', self._claims, _claim_markers).get(marker, [])
+
+    def claims_by_icn(self, icn: str) -> List[ClaimLoop]:
+        """Returns the claims whose CLP07 (payer claim control number) is `icn`, in file order."""
+        return self._index('icn', self._claims, _claim_icns).get(icn, [])
+
+    def claims_by_patient(self, identification_code: str) -> List[ClaimLoop]:
+        """Returns the claims whose patient (NM1*QC) has the identification code, in file order."""
+        return self._index('patient', self._claims, _claim_patients).get(identification_code, [])
+
+    def invalidate_indexes(self):
+        """Drops the lookup indexes, they are rebuilt on the next lookup."""
+        self._indexes.clear()
+
+    def _organizations_by_type(self) -> Dict[str, List[OrganizationLoop]]:
+        return self._index('organization type', self._organizations, _organization_types)
+
+    def _index(self, name: str, values: TrackedList, keys: Callable[[Any], Iterable]) -> Dict[Any, list]:
+        built = self._indexes.get(name)
+        if built is not None and built[0] == values.version:
+            return built[1]
+
+        index = {}
+        for value in values:
+            for key in keys(value):
+                index.setdefault(key, []).append(value)
+
+        self._indexes[name] = (values.version, index)
+        return index
+
+
+def _claim_markers(claim: ClaimLoop) -> Iterable[str]:
+    return (claim.claim.marker,) if claim.claim is not None else ()
+
+
+def _claim_icns(claim: ClaimLoop) -> Iterable[str]:
+    return (claim.claim.icn,) if claim.claim is not None else ()
+
+
+def _claim_patients(claim: ClaimLoop) -> Iterable[str]:
+    return (entity.identification_code for entity in claim.entities_by_code.get('patient', ()))
+
+
+def _organization_types(organization: OrganizationLoop) -> Iterable[str]:
+    return (organization.organization.type,)
+
+
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -1,4 +1,88 @@
-from typing import List, Optional, Union 
+from typing import Any, Iterable, List, Mapping, NamedTuple, Optional, Union
+
+
+class Delimiters(NamedTuple):
+    """The separators declared by an interchange's ISA segment.
+
+    Attributes:
+        element (str): Separates the elements of a segment (ISA position 4).
+        component (str): Separates the components of a composite element (ISA16).
+        repetition (Optional[str]): Separates repeated elements (ISA11, 5010 and later only).
+        segment (str): Terminates each segment (the character after ISA16).
+    """
+    element: str = '*'
+    component: str = ':'
+    repetition: Optional[str] = '^'
+    segment: str = '~'
+
+
+DEFAULT_DELIMITERS = Delimiters()
+
+
+class TrackedList(list):
+    """A list that counts its modifications.
+
+    Indexes built over the list store the `version` they were built at and
+    are rebuilt once it has moved on.
+    """
+
+    __slots__ = ('version',)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.version = 0
+
+    def __reduce__(self):
+        return TrackedList, (list(self),)
+
+
+def _modifies(method):
+    def modify(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    modify.__name__ = method.__name__
+    return modify
+
+
+for _name in (
+        'append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+        '__setitem__', '__delitem__', '__iadd__', '__imul__',
+):
+    setattr(TrackedList, _name, _modifies(getattr(list, _name)))
+
+
+class _EmptyIndex(dict):
+    """The shared, read-only index of loops that have no segment of a kind yet."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('EMPTY_INDEX is shared and cannot be modified')
+
+    __setitem__ = __delitem__ = setdefault = update = pop = popitem = clear = _read_only
+
+    def __reduce__(self):
+        # unpickle to the module's own index so loops sent between processes share it again
+        return 'EMPTY_INDEX'
+
+
+EMPTY_INDEX: Mapping[Any, list] = _EmptyIndex()
+
+
+def index_by(values: Iterable, key: str) -> Mapping[Any, list]:
+    """Groups segments by one of their attributes (e.g. dates by qualifier), keeping file order.
+
+    Args:
+        values (Iterable): The segments.
+        key (str): The attribute to group by.
+
+    Returns:
+        Mapping[Any, list]: The segments keyed by the attribute, EMPTY_INDEX if there are none.
+    """
+
+    index = {}
+    for value in values:
+        index.setdefault(getattr(value, key), []).append(value)
+    return index or EMPTY_INDEX
 
 
 def split_segment(segment: str, segment_delimiter: str = "*") -> List[str]:
@@ -17,24 +101,46 @@ def split_segment(segment: str, segment_delimiter: str = "*") -> List[str]:
     return segment.split(segment_delimiter)
 
 
-def find_identifier(segment: Union[str, dict]) -> str:
+def join_segment(elements: Iterable[Optional[str]], segment_delimiter: str = "*") -> str:
+    """Joins elements (or the components of a composite element) into a segment.
+
+    The inverse of `split_segment`. Missing elements are written empty and
+    trailing empty elements are dropped, as X12 requires.
+
+    Args:
+        elements (Iterable[Optional[str]]): The elements, identifier first.
+        segment_delimiter (str): Delimiter between the elements. Defaults to '*'.
+
+    Returns:
+        str: The segment, without its terminator.
+    """
+
+    elements = ['' if element is None else element for element in elements]
+    while elements and not elements[-1]:
+        elements.pop()
+    return segment_delimiter.join(elements)
+
+
+def find_identifier(segment: Union[str, List[str], dict], segment_delimiter: str = "*") -> str:
     """
-    Extracts the segment identifier from an EDI segment string or dictionary.
+    Extracts the segment identifier from an EDI segment string, token list or dictionary.
 
     Args:
-        segment (Union[str, dict]): The EDI segment.
+        segment (Union[str, List[str], dict]): The EDI segment.
+        segment_delimiter (str): Delimiter between elements of a segment string. Defaults to '*'.
 
     Returns:
         str: The segment identifier.
     """
 
-    if isinstance(segment, str):
-        segment = split_segment(segment)
+    if isinstance(segment, list):
         return segment[0]
+    elif isinstance(segment, str):
+        return segment.partition(segment_delimiter)[0]
     elif isinstance(segment, dict):
-        return list(segment.keys())[0]
+        return next(iter(segment))
     else:
-        raise TypeError("Invalid segment type. Must be string or dictionary.")
+        raise TypeError("Invalid segment type. Must be string, list or dictionary.")
 
 def get_element(segment: List[str], index: int, default=None) -> Optional[str]:
     """Gets an element from a list, handling cases where the index might be out of range.